@@ -29,3 +29,6 @@ class Architecture(Base):
     """
 
     command_base = 'architecture'
+    cacheable_reads = True
+    reference_options = ('architecture',)
+    info_references = ('os',)
@@ -52,4 +52,5 @@ class Arfreport(Base):
         cls.command_sub = 'list'
 
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='list'),
+            output_format='csv')
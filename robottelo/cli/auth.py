@@ -26,18 +26,21 @@ class Auth(Base):
         """Set credentials"""
         cls.command_sub = 'login'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='login'),
+            output_format='csv')
 
     @classmethod
     def logout(cls, options=None):
         """Wipe credentials"""
         cls.command_sub = 'logout'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='logout'),
+            output_format='csv')
 
     @classmethod
     def status(cls, options=None):
         """Show login status"""
         cls.command_sub = 'status'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='status'),
+            output_format='csv')
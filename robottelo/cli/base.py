@@ -2,9 +2,11 @@
 """Generic base class for cli hammer commands."""
 import logging
 import re
+from functools import partial
 
 from robottelo import ssh
-from robottelo.cli import hammer
+from robottelo.cli import hammer, hammer_shell
+from robottelo.cli.cache import is_read_command, make_key, read_cache
 from robottelo.config import settings
 
 
@@ -61,6 +63,106 @@ class CLIDataBaseError(CLIBaseError):
     """
 
 
+class LazyInfo(dict):
+    """The record returned by :meth:`Base.create` when the info of the created
+    entity is fetched on demand.
+
+    It starts with the fields output by hammer when creating the entity,
+    usually ``id`` and ``name``. Accessing any other field, or using the
+    record as a whole (iterating, comparing, copying, serializing...), runs
+    ``fetch`` once and replaces those fields with the returned info, like
+    :meth:`Base.create` does right away otherwise.
+
+    :param dict fields: The fields output by the create command.
+    :param fetch: Callable returning the info of the created entity.
+    """
+
+    def __init__(self, fields=None, fetch=None):
+        super(LazyInfo, self).__init__(fields or {})
+        self._fetch = fetch
+
+    @property
+    def loaded(self):
+        """Whether the info of the entity has been fetched."""
+        return self._fetch is None
+
+    def load(self):
+        """Fetch the info of the entity, if not done yet."""
+        if self._fetch is not None:
+            info = self._fetch()
+            self._fetch = None
+            if len(info) > 0:
+                dict.clear(self)
+                dict.update(self, info)
+        return self
+
+    def __missing__(self, key):
+        if self.loaded:
+            raise KeyError(key)
+        return self.load()[key]
+
+    def __contains__(self, key):
+        return dict.__contains__(self.load(), key)
+
+    def __eq__(self, other):
+        return dict.__eq__(self.load(), other)
+
+    def __ne__(self, other):
+        return dict.__ne__(self.load(), other)
+
+    def __iter__(self):
+        return dict.__iter__(self.load())
+
+    def __len__(self):
+        return dict.__len__(self.load())
+
+    def __bool__(self):
+        # the record has at least the id, no need to fetch the info
+        return self._fetch is not None or dict.__len__(self) > 0
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return dict.__repr__(self.load())
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self.load(), key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self.load(), key)
+
+    def __reduce__(self):
+        # copies and pickles are plain dicts
+        return dict, (dict.copy(self.load()),)
+
+    def copy(self):
+        return dict.copy(self.load())
+
+    def get(self, key, default=None):
+        return dict.get(self.load(), key, default)
+
+    def items(self):
+        return dict.items(self.load())
+
+    def keys(self):
+        return dict.keys(self.load())
+
+    def values(self):
+        return dict.values(self.load())
+
+    def pop(self, *args):
+        return dict.pop(self.load(), *args)
+
+    def popitem(self):
+        return dict.popitem(self.load())
+
+    def setdefault(self, key, default=None):
+        return dict.setdefault(self.load(), key, default)
+
+    def update(self, *args, **kwargs):
+        dict.update(self.load(), *args, **kwargs)
+
+
 class Base(object):
     """
     @param command_base: base command of hammer.
@@ -126,6 +228,20 @@ class Base(object):
     command_base = None  # each inherited instance should define this
     command_sub = None  # specific to instance, like: create, update, etc
     command_requires_org = False  # True when command requires organization-id
+    # Commands not requiring organization-id even when command_requires_org
+    commands_without_org = ()
+    # Whether create fetches the entity info only when needed, see
+    # LazyInfo. None to use the lazy_create_info option of the cli section
+    lazy_create_info = None
+    # Whether info and list results are cached, see robottelo.cli.cache. Only
+    # for entities which rarely change
+    cacheable_reads = False
+    # Options other commands use to reference the entities, like
+    # 'operatingsystem' for --operatingsystem-ids
+    reference_options = ()
+    # command_base of the classes whose entities the info results list, like
+    # 'architecture' for the operating systems
+    info_references = ()
 
     logger = logging.getLogger('robottelo')
     _db_error_regex = re.compile(
@@ -176,7 +292,8 @@ class Base(object):
 
         cls.command_sub = 'add-operatingsystem'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='add-operatingsystem'))
 
         return result
 
@@ -184,6 +301,12 @@ class Base(object):
     def create(cls, options=None):
         """
         Creates a new record using the arguments passed via dictionary.
+
+        The new record is read with the ``info`` command. When
+        ``lazy_create_info`` is enabled, for the class or in the ``cli``
+        settings section, a :class:`LazyInfo` is returned instead, running
+        ``info`` only when a field not output by the create command is
+        accessed.
         """
 
         cls.command_sub = 'create'
@@ -192,7 +315,8 @@ class Base(object):
             options = {}
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='create'),
+            output_format='csv')
 
         # Extract new object ID if it was successfully created
         if len(result) > 0 and 'id' in result[0]:
@@ -201,12 +325,19 @@ class Base(object):
             # Fetch new object
             # Some Katello obj require the organization-id for subcommands
             info_options = {u'id': obj_id}
-            if cls.command_requires_org:
+            if cls._requires_org('create'):
                 if 'organization-id' not in options:
                     tmpl = 'organization-id option is required for {0}.create'
                     raise CLIError(tmpl.format(cls.__name__))
                 info_options[u'organization-id'] = options[u'organization-id']
 
+            if cls._is_create_info_lazy():
+                fields = {
+                    key: value for key, value in result[0].items()
+                    if key != 'message'
+                }
+                return LazyInfo(fields, partial(cls.info, info_options))
+
             new_obj = cls.info(info_options)
             # stdout should be a dictionary containing the object
             if len(new_obj) > 0:
@@ -214,12 +345,25 @@ class Base(object):
 
         return result
 
+    @classmethod
+    def _is_create_info_lazy(cls):
+        """Whether :meth:`create` should fetch the new record info lazily."""
+        if cls.lazy_create_info is not None:
+            return cls.lazy_create_info
+        return bool(settings.cli.lazy_create_info)
+
+    @classmethod
+    def _requires_org(cls, command_sub):
+        """Whether the ``command_sub`` command requires organization-id."""
+        return (cls.command_requires_org and
+                command_sub not in cls.commands_without_org)
+
     @classmethod
     def delete(cls, options=None):
         """Deletes existing record."""
         cls.command_sub = 'delete'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='delete'),
             ignore_stderr=True,
         )
 
@@ -231,7 +375,8 @@ class Base(object):
 
         cls.command_sub = 'delete-parameter'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='delete-parameter'))
 
         return result
 
@@ -243,7 +388,8 @@ class Base(object):
 
         cls.command_sub = 'dump'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='dump'))
 
         return result
 
@@ -277,14 +423,53 @@ class Base(object):
     def execute(cls, command, user=None, password=None, output_format=None,
                 timeout=None, ignore_stderr=None, return_raw_response=None,
                 connection_timeout=None):
-        """Executes the cli ``command`` on the server via ssh"""
+        """Executes the cli ``command`` on the server via ssh
+
+        When the ``hammer_backend`` option of the ``cli`` section is ``shell``
+        the command is run by the long running hammer process of the user, see
+        :mod:`robottelo.cli.hammer_shell`, unless the command needs a shell or
+        hammer performance is being measured.
+
+        Commands other than ``info`` and ``list`` drop the cached reads they
+        may change, see :mod:`robottelo.cli.cache`.
+        """
         user, password = cls._get_username_password(user, password)
         time_hammer = False
         if settings.performance:
             time_hammer = settings.performance.time_hammer
 
+        response = None
+        try:
+            if settings.cli.hammer_backend == 'shell' and not time_hammer:
+                response = cls._execute_in_hammer_shell(
+                    command, user, password, output_format, timeout)
+            if response is None:
+                cmd = cls._hammer_command(
+                    command, user, password, output_format, time_hammer)
+                response = ssh.command(
+                    cmd.encode('utf-8'),
+                    output_format=output_format,
+                    timeout=timeout,
+                    connection_timeout=connection_timeout,
+                )
+        finally:
+            if not is_read_command(cls.command_base, command):
+                # the command may have changed cached entities
+                read_cache.invalidate_for_command(cls.command_base, command)
+        if return_raw_response:
+            return response
+        else:
+            return cls._handle_response(
+                response,
+                ignore_stderr=ignore_stderr,
+            )
+
+    @classmethod
+    def _hammer_command(cls, command, user, password, output_format=None,
+                        time_hammer=False):
+        """Build the shell command running hammer with ``command``"""
         # add time to measure hammer performance
-        cmd = u'LANG={0} {1} hammer -v {2} {3} {4} {5}'.format(
+        return u'LANG={0} {1} hammer -v {2} {3} {4} {5}'.format(
             settings.locale,
             u'time -p' if time_hammer else '',
             u'-u {0}'.format(user) if user is not None
@@ -293,19 +478,29 @@ class Base(object):
             u'--output={0}'.format(output_format) if output_format else u'',
             command,
         )
-        response = ssh.command(
-            cmd.encode('utf-8'),
-            output_format=output_format,
-            timeout=timeout,
-            connection_timeout=connection_timeout,
-        )
-        if return_raw_response:
-            return response
+
+    @classmethod
+    def _execute_in_hammer_shell(cls, command, user, password,
+                                 output_format=None, timeout=None):
+        """Executes the cli ``command`` in a hammer shell session.
+
+        :return: SSHCommandResult or ``None`` when the command has to be run
+            in a new hammer process.
+        """
+        args = hammer_shell.split_command(command)
+        if args is None:
+            return None
+        options = [u'-v']
+        if user is not None:
+            options.extend([u'-u', user])
         else:
-            return cls._handle_response(
-                response,
-                ignore_stderr=ignore_stderr,
-            )
+            options.extend([u'--interactive', u'no'])
+        if password is not None:
+            options.extend([u'-p', password])
+        if output_format:
+            options.append(u'--output={0}'.format(output_format))
+        return hammer_shell.execute(
+            options + args, user, password, output_format, timeout)
 
     @classmethod
     def exists(cls, options=None, search=None):
@@ -341,20 +536,33 @@ class Base(object):
         if options is None:
             options = {}
 
-        if cls.command_requires_org and 'organization-id' not in options:
+        if cls._requires_org('info') and 'organization-id' not in options:
             raise CLIError(
                 'organization-id option is required for {0}.info'.format(
                     cls.__name__
                 )
             )
 
+        key = None
+        if not return_raw_response:
+            key = cls._read_cache_key('info', options, output_format)
+        if key is not None:
+            found, result = read_cache.get(key)
+            if found:
+                return result
+
         result = cls.execute(
-            command=cls._construct_command(options),
+            command=cls._construct_command(options, command_sub='info'),
             output_format=output_format,
             return_raw_response=return_raw_response,
         )
         if not return_raw_response and output_format != 'json':
             result = hammer.parse_info(result)
+        if key is not None:
+            read_cache.set(
+                key, result, settings.cli.read_cache_ttl,
+                cls.reference_options, cls.info_references
+            )
         return result
 
     @classmethod
@@ -372,18 +580,88 @@ class Base(object):
         if 'per-page' not in options and per_page:
             options[u'per-page'] = 10000
 
-        if cls.command_requires_org and 'organization-id' not in options:
+        if cls._requires_org('list') and 'organization-id' not in options:
             raise CLIError(
                 'organization-id option is required for {0}.list'.format(
                     cls.__name__
                 )
             )
 
+        key = cls._read_cache_key('list', options, output_format)
+        if key is not None:
+            found, result = read_cache.get(key)
+            if found:
+                return result
+
         result = cls.execute(
-            cls._construct_command(options), output_format=output_format)
+            cls._construct_command(options, command_sub='list'),
+            output_format=output_format)
 
+        if key is not None:
+            read_cache.set(
+                key, result, settings.cli.read_cache_ttl,
+                cls.reference_options, cls.info_references
+            )
         return result
 
+    @classmethod
+    def _read_cache_key(cls, command_sub, options, output_format=None):
+        """Return the read cache key of an ``info`` or ``list`` command, or
+        ``None`` if its result must not be cached.
+        """
+        if not cls.cacheable_reads or not settings.cli.read_cache_ttl:
+            return None
+        username, _ = cls._get_username_password()
+        return make_key(
+            cls.command_base, command_sub, options, output_format, username)
+
+    @classmethod
+    def clear_read_cache(cls):
+        """Drop the cached reads of the class."""
+        read_cache.invalidate(cls.command_base)
+
+    @classmethod
+    def iter_list(cls, options=None, per_page=True, output_format='csv'):
+        """Iterate over the listed records as they are read.
+
+        Accepts the same arguments as :meth:`list`, but yields each record as
+        soon as hammer outputs it instead of reading and parsing the whole
+        output first, keeping big lists out of memory. Only ``csv`` and
+        ``json`` output formats are supported. The command always runs in a
+        new hammer process.
+
+        :raises robottelo.cli.base.CLIReturnCodeError: If hammer fails, once
+            the output has been consumed.
+        """
+        cls.command_sub = 'list'
+
+        if options is None:
+            options = {}
+
+        if 'per-page' not in options and per_page:
+            options[u'per-page'] = 10000
+
+        if cls._requires_org('list') and 'organization-id' not in options:
+            raise CLIError(
+                'organization-id option is required for {0}.list'.format(
+                    cls.__name__
+                )
+            )
+
+        user, password = cls._get_username_password()
+        cmd = cls._hammer_command(
+            cls._construct_command(options, command_sub='list'),
+            user, password, output_format)
+        with ssh.stream_command(cmd.encode('utf-8')) as stream:
+            if output_format == 'json':
+                records = hammer.iter_json(stream)
+            else:
+                records = hammer.iter_csv(hammer.iter_output_lines(stream))
+            for record in records:
+                yield record
+        cls._handle_response(ssh.SSHCommandResult(
+            stderr=stream.stderr, return_code=stream.return_code))
+
     @classmethod
     def puppetclasses(cls, options=None):
         """
@@ -393,7 +671,8 @@ class Base(object):
         cls.command_sub = 'puppet-classes'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='puppet-classes'),
+            output_format='csv')
 
         return result
 
@@ -405,7 +684,9 @@ class Base(object):
 
         cls.command_sub = 'remove-operatingsystem'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(
+                options, command_sub='remove-operatingsystem'))
 
         return result
 
@@ -418,7 +699,8 @@ class Base(object):
         cls.command_sub = 'sc-params'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='sc-params'),
+            output_format='csv')
 
         return result
 
@@ -430,7 +712,8 @@ class Base(object):
 
         cls.command_sub = 'set-parameter'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='set-parameter'))
 
         return result
 
@@ -443,7 +726,7 @@ class Base(object):
         cls.command_sub = 'update'
 
         result = cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='update'),
             output_format='csv',
             return_raw_response=return_raw_response,
         )
@@ -465,8 +748,14 @@ class Base(object):
         return Wrapper
 
     @classmethod
-    def _construct_command(cls, options=None):
-        """Build a hammer cli command based on the options passed"""
+    def _construct_command(cls, options=None, command_sub=None):
+        """Build a hammer cli command based on the options passed.
+
+        ``command_sub`` defaults to the ``command_sub`` attribute. The methods
+        running a command pass it explicitly, so concurrent threads running
+        commands of the same class do not build each other's commands, see
+        :func:`robottelo.cli.factory.make_many`.
+        """
         tail = u''
 
         if options is None:
@@ -481,9 +770,11 @@ class Base(object):
                 if isinstance(val, list):
                     val = ','.join(str(el) for el in val)
                 tail += u' --{0}="{1}"'.format(key, val)
+        if command_sub is None:
+            command_sub = cls.command_sub
         cmd = u'{0} {1} {2}'.format(
             cls.command_base,
-            cls.command_sub,
+            command_sub,
             tail.strip()
         )
 
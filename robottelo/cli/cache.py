@@ -0,0 +1,211 @@
+# -*- encoding: utf-8 -*-
+"""Read-through cache of the ``info`` and ``list`` commands of the cli
+classes declaring ``cacheable_reads = True``.
+
+Those classes manage near-static entities, like architectures or operating
+systems, which factories look up over and over. The results are kept for
+``read_cache_ttl`` seconds, see the ``cli`` section of the settings, and are
+dropped when a command may have changed them:
+
+* any command of the same class other than ``info`` and ``list`` drops all
+  the cached results of the class.
+* any command of another class other than ``info`` and ``list`` passing one
+  of the ``reference_options`` of the class, alone or followed by one of the
+  ``REFERENCE_SUFFIXES``, like ``--operatingsystem-ids``, drops the cached
+  ``info`` results of the class, as they include the associations of the
+  entities. ``list`` results only include the entities own fields.
+* any command of a class listed in the ``info_references`` of the class other
+  than ``info`` and ``list``, like ``architecture delete`` for the operating
+  systems, drops the cached ``info`` results of the class for the same reason.
+
+Results are copied in and out of the cache, callers can change them freely.
+"""
+import copy
+import shlex
+import threading
+import time
+
+from collections import OrderedDict
+
+# Commands which do not change anything
+READ_COMMANDS = ('info', 'list')
+
+MAX_ENTRIES = 1024
+
+# Suffixes of the options referencing entities, after a reference option
+REFERENCE_SUFFIXES = (
+    '', '-id', '-ids', '-name', '-names', '-title', '-titles')
+
+
+def make_key(command_base, command_sub, options, output_format=None,
+             username=None):
+    """Build the cache key of a read.
+
+    Options are normalized like :meth:`robottelo.cli.base.Base.
+    _construct_command` builds them: the ones set to ``None`` or ``False``
+    are not passed, the others are compared by their text value, whatever
+    their order.
+    """
+    normalized = []
+    for key, value in (options or {}).items():
+        if value is None or value is False:
+            continue
+        if isinstance(value, list):
+            value = ','.join(str(item) for item in value)
+        elif value is not True:
+            value = u'{0}'.format(value)
+        normalized.append((key, value))
+    return (
+        command_base, command_sub, output_format, username,
+        tuple(sorted(normalized, key=lambda item: item[0]))
+    )
+
+
+def is_read_command(command_base, command):
+    """Whether ``command`` is one of the ``READ_COMMANDS`` of
+    ``command_base``.
+    """
+    for command_sub in READ_COMMANDS:
+        prefix = u'{0} {1}'.format(command_base, command_sub)
+        if command.startswith(prefix) and command[len(prefix):][:1] in (
+                u'', u' '):
+            return True
+    return False
+
+
+def get_option_names(command):
+    """Return the names of the options passed to ``command``, without their
+    leading dashes and values, like ``operatingsystem-ids`` for
+    ``--operatingsystem-ids="1,2"``.
+    """
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        # unbalanced quotes, or non ascii text on Python 2
+        tokens = command.split()
+    return set(
+        token[2:].split('=', 1)[0] for token in tokens
+        if token.startswith('--')
+    )
+
+
+class ReadCache(object):
+    """Thread safe TTL cache of cli read results, grouped by
+    ``command_base``.
+
+    :param int max_entries: The maximum number of results kept, the oldest
+        ones are dropped first.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._reference_options = {}
+        self._info_references = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, command_base, stat):
+        """Increase a stat of ``command_base``. Must be called with the lock
+        held.
+        """
+        stats = self._stats.setdefault(command_base, {
+            'hits': 0, 'misses': 0, 'expired': 0, 'invalidated': 0})
+        stats[stat] += 1
+
+    def get(self, key):
+        """Return a ``(found, result)`` tuple for ``key``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._count(key[0], 'expired')
+                entry = None
+            if entry is None:
+                self._count(key[0], 'misses')
+                return False, None
+            self._count(key[0], 'hits')
+        return True, copy.deepcopy(entry[1])
+
+    def set(self, key, result, ttl, reference_options=(),
+            info_references=()):
+        """Keep ``result`` for ``ttl`` seconds.
+
+        :param reference_options: The options of other commands referencing
+            the entities of ``key``, without the leading dashes and the
+            ``REFERENCE_SUFFIXES``.
+        :param info_references: The ``command_base`` of the classes whose
+            entities are listed by the ``info`` results of ``key[0]``.
+        """
+        entry = (time.time() + ttl, copy.deepcopy(result))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if reference_options:
+                self._reference_options[key[0]] = frozenset(
+                    option + suffix for option in reference_options
+                    for suffix in REFERENCE_SUFFIXES
+                )
+            if info_references:
+                self._info_references[key[0]] = frozenset(info_references)
+
+    def _drop(self, predicate):
+        """Drop the entries matching ``predicate``. Must be called with the
+        lock held.
+        """
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+            self._count(key[0], 'invalidated')
+
+    def invalidate(self, command_base=None):
+        """Drop the cached results of ``command_base``, or all of them."""
+        with self._lock:
+            self._drop(
+                lambda key: command_base is None or key[0] == command_base)
+
+    def invalidate_for_command(self, command_base, command):
+        """Drop the cached results a command may have changed.
+
+        :param str command_base: The ``command_base`` of the command class.
+        :param str command: The command with its options, as passed to hammer.
+        """
+        with self._lock:
+            if not self._entries:
+                return
+            option_names = get_option_names(command)
+            referenced = set(
+                name for name, options in self._reference_options.items()
+                if name != command_base and options & option_names
+            )
+            referenced.update(
+                name for name, references in self._info_references.items()
+                if command_base in references
+            )
+            self._drop(lambda key: key[0] == command_base or (
+                key[0] in referenced and key[1] == 'info'))
+
+    def stats(self):
+        """Return the hits, misses, expired and invalidated entries by
+        ``command_base``, along with their ``total``, and the number of
+        cached ``entries``.
+        """
+        with self._lock:
+            stats = {
+                name: dict(counts) for name, counts in self._stats.items()}
+            total = {'hits': 0, 'misses': 0, 'expired': 0, 'invalidated': 0}
+            for counts in stats.values():
+                for name, value in counts.items():
+                    total[name] += value
+            entries = len(self._entries)
+        return {'by_command': stats, 'total': total, 'entries': entries}
+
+    def reset_stats(self):
+        """Reset all the stats to zero."""
+        with self._lock:
+            self._stats = {}
+
+
+read_cache = ReadCache()
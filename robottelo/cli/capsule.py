@@ -38,7 +38,9 @@ class Capsule(Base):
         cls.command_sub = 'content add-lifecycle-environment'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='content add-lifecycle-environment'),
+            output_format='csv')
 
         return result
 
@@ -49,7 +51,10 @@ class Capsule(Base):
         cls.command_sub = 'content available-lifecycle-environments'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options,
+                command_sub='content available-lifecycle-environments'),
+            output_format='csv')
 
         return result
 
@@ -60,7 +65,8 @@ class Capsule(Base):
         cls.command_sub = 'content info'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='json')
+            cls._construct_command(options, command_sub='content info'),
+            output_format='json')
 
         return result
 
@@ -71,7 +77,9 @@ class Capsule(Base):
         cls.command_sub = 'content lifecycle-environments'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='content lifecycle-environments'),
+            output_format='csv')
 
         return result
 
@@ -82,7 +90,9 @@ class Capsule(Base):
         cls.command_sub = 'content remove-lifecycle-environment'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='content remove-lifecycle-environment'),
+            output_format='csv')
 
         return result
 
@@ -93,7 +103,9 @@ class Capsule(Base):
         cls.command_sub = 'content synchronization-status'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='content synchronization-status'),
+            output_format='csv')
 
         return result
 
@@ -104,7 +116,9 @@ class Capsule(Base):
         cls.command_sub = 'content synchronize'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='content synchronize'),
+            output_format='csv')
 
         return result
 
@@ -115,7 +129,8 @@ class Capsule(Base):
         cls.command_sub = 'import-classes'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='import-classes'),
+            output_format='csv')
 
         return result
 
@@ -126,6 +141,7 @@ class Capsule(Base):
         cls.command_sub = 'refresh-features'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='refresh-features'),
+            output_format='csv')
 
         return result
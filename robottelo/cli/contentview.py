@@ -58,7 +58,8 @@ class ContentViewFilterRule(Base):
             )
         cls.command_sub = 'create'
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='create'),
+            output_format='csv')
 
         # Extract new CV filter rule ID if it was successfully created
         if len(result) > 0 and 'id' in result[0]:
@@ -97,28 +98,31 @@ class ContentView(Base):
         """Associate repository to a selected CV."""
         cls.command_sub = 'add-repository'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-repository'),
+            output_format='csv')
 
     @classmethod
     def add_version(cls, options):
         """Associate version to a selected CV."""
         cls.command_sub = 'add-version'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-version'),
+            output_format='csv')
 
     @classmethod
     def copy(cls, options):
         """Copy existing content-view to a new one"""
         cls.command_sub = 'copy'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='copy'),
+            output_format='csv')
 
     @classmethod
     def publish(cls, options, timeout=1500):
         """Publishes a new version of content-view."""
         cls.command_sub = 'publish'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='publish'),
             ignore_stderr=True,
             timeout=timeout,
         )
@@ -132,7 +136,9 @@ class ContentView(Base):
             options = {}
 
         result = cls.execute(
-            cls._construct_command(options), output_format=output_format)
+            cls._construct_command(
+                options, command_sub='version info'),
+            output_format=output_format)
         if output_format != 'json':
             result = hammer.parse_info(result)
         return result
@@ -144,28 +150,34 @@ class ContentView(Base):
         if options is None:
             options = {}
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='version incremental-update'),
+            output_format='csv')
 
     @classmethod
     def puppet_module_add(cls, options):
         """Associate puppet_module to selected CV"""
         cls.command_sub = 'puppet-module add'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='puppet-module add'),
+            output_format='csv')
 
     @classmethod
     def puppet_module_list(cls, options):
         """List content view puppet modules"""
         cls.command_sub = 'puppet-module list'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='puppet-module list'),
+            output_format='csv')
 
     @classmethod
     def puppet_module_remove(cls, options):
         """Remove a puppet module from the content view"""
         cls.command_sub = 'puppet-module remove'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='puppet-module remove'),
+            output_format='csv')
 
     @classmethod
     def version_list(cls, options):
@@ -174,14 +186,15 @@ class ContentView(Base):
         if options is None:
             options = {}
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='version list'),
+            output_format='csv')
 
     @classmethod
     def version_promote(cls, options, timeout=600):
         """Promotes content-view version to next env."""
         cls.command_sub = 'version promote'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='version promote'),
             ignore_stderr=True,
             timeout=timeout
         )
@@ -191,7 +204,7 @@ class ContentView(Base):
         """Exports content-view version in given directory"""
         cls.command_sub = 'version export'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='version export'),
             ignore_stderr=True,
             timeout=timeout
         )
@@ -201,7 +214,7 @@ class ContentView(Base):
         """Imports content-view version from a given directory"""
         cls.command_sub = 'version import'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='version import'),
             ignore_stderr=True,
             timeout=timeout
         )
@@ -211,7 +224,7 @@ class ContentView(Base):
         """Removes content-view version."""
         cls.command_sub = 'version delete'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='version delete'),
             ignore_stderr=True,
         )
 
@@ -220,7 +233,8 @@ class ContentView(Base):
         """Remove content-view from an environment"""
         cls.command_sub = 'remove-from-environment'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(
+                options, command_sub='remove-from-environment'),
             ignore_stderr=True,
         )
 
@@ -231,7 +245,7 @@ class ContentView(Base):
         """
         cls.command_sub = 'remove'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='remove'),
             ignore_stderr=True,
         )
 
@@ -240,25 +254,29 @@ class ContentView(Base):
         """Remove a content view version from a composite view"""
         cls.command_sub = 'remove-version'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='remove-version'),
+            output_format='csv')
 
     @classmethod
     def remove_repository(cls, options):
         """Remove repository from content view"""
         cls.command_sub = 'remove-repository'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='remove-repository'),
+            output_format='csv')
 
     @classmethod
     def component_add(cls, options=None):
         """Add components to the content view"""
         cls.command_sub = 'component add'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='component add'),
+            output_format='csv')
 
     @classmethod
     def component_list(cls, options=None):
         """List components attached to the content view"""
         cls.command_sub = 'component list'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='component list'),
+            output_format='csv')
@@ -54,7 +54,8 @@ class CSV_(Base):
             -v, --verbose                 be verbose
         """
         cls.command_sub = 'activation-keys'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='activation-keys'))
 
     @classmethod
     def content_hosts(cls, options=None):
@@ -129,7 +130,8 @@ class CSV_(Base):
                                     for --itemized-subscriptions)
         """
         cls.command_sub = 'content-hosts'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='content-hosts'))
 
     @classmethod
     def subscriptions(cls, options=None):
@@ -152,4 +154,5 @@ class CSV_(Base):
             --search SEARCH               Only export search results
         """
         cls.command_sub = 'subscriptions'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='subscriptions'))
@@ -157,7 +157,7 @@ class DockerContainer(Base):
 
         """
         cls.command_sub = 'logs'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, command_sub='logs'))
 
     @classmethod
     def start(cls, options=None):
@@ -176,7 +176,8 @@ class DockerContainer(Base):
 
         """
         cls.command_sub = 'start'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='start'))
 
     @classmethod
     def status(cls, options=None):
@@ -195,7 +196,8 @@ class DockerContainer(Base):
 
         """
         cls.command_sub = 'status'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='status'))
 
     @classmethod
     def stop(cls, options=None):
@@ -214,7 +216,7 @@ class DockerContainer(Base):
 
         """
         cls.command_sub = 'stop'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, command_sub='stop'))
 
 
 class DockerManifest(Base):
@@ -32,4 +32,5 @@ class Environment(Base):
         """List all smart class parameters."""
         cls.command_sub = 'sc-params'
         return cls.execute(
-            cls._construct_command(options), output_format='json')
+            cls._construct_command(options, command_sub='sc-params'),
+            output_format='json')
@@ -10,6 +10,7 @@ import os
 import random
 import time
 
+from concurrent.futures import ThreadPoolExecutor
 from fauxfactory import (
     gen_alphanumeric,
     gen_choice,
@@ -20,8 +21,8 @@ from fauxfactory import (
     gen_string,
 )
 from os import chmod
-from robottelo import manifests, ssh
-from robottelo.api.utils import enable_rhrepo_and_fetchid
+from robottelo import constants, manifests, ssh
+from robottelo.cli import hammer_shell
 from robottelo.cli.activationkey import ActivationKey
 from robottelo.cli.architecture import Architecture
 from robottelo.cli.base import CLIReturnCodeError
@@ -80,7 +81,6 @@ from robottelo.constants import (
     DISTROS_MAJOR_VERSION,
     FAKE_1_YUM_REPO,
     FOREMAN_PROVIDERS,
-    OPERATING_SYSTEMS,
     PRDS,
     REPOS,
     REPOSET,
@@ -94,7 +94,8 @@ from robottelo.decorators import bz_bug_is_open, cacheable
 from robottelo.helpers import (
     update_dictionary, default_url_on_new_port, get_available_capsule_port
 )
-from robottelo.ssh import download_file, upload_file
+from robottelo.ssh import upload_file
+from six.moves import queue
 from tempfile import mkstemp
 from time import sleep
 
@@ -109,6 +110,27 @@ class CLIFactoryError(Exception):
     """Indicates an error occurred while creating an entity using hammer"""
 
 
+class CLIFactoryBatchError(CLIFactoryError):
+    """Indicates some of the entities requested to :func:`make_many` could
+    not be created.
+
+    :param str factory_name: The name of the factory function used.
+    :param list results: The created entities, in the requested order, with
+        ``None`` in place of the entities which could not be created.
+    :param dict errors: The exception raised while creating each entity which
+        could not be created, by index.
+    """
+
+    def __init__(self, factory_name, results, errors):
+        self.results = results
+        self.errors = errors
+        msg = u'Failed to create {0} of {1} entities with {2}:'.format(
+            len(errors), len(results), factory_name)
+        for index in sorted(errors):
+            msg += u'\n#{0}: {1}'.format(index, errors[index])
+        super(CLIFactoryBatchError, self).__init__(msg)
+
+
 def create_object(cli_object, options, values):
     """
     Creates <object> with dictionary of arguments.
@@ -151,6 +173,81 @@ def create_object(cli_object, options, values):
     return result
 
 
+def make_many(factory, count, options=None, lanes=None):
+    """Create ``count`` entities with ``factory`` concurrently.
+
+    The options of every entity are generated up front, then the entities are
+    created by ``lanes`` threads. Each thread runs its commands on its own
+    pooled ssh connection, or on its own hammer shell session when the
+    ``shell`` hammer backend is configured. Usage::
+
+        orgs = make_many(make_org, 10)
+        hosts = make_many(make_fake_host, 50, {u'organization-id': org_id})
+        repos = make_many(make_repository, len(urls), lambda index: {
+            u'product-id': product['id'],
+            u'url': urls[index],
+        })
+
+    :param factory: A factory function accepting the options of one entity,
+        like :func:`make_org`.
+    :param int count: The number of entities to create.
+    :param options: The options of the entities. Either a dict, copied for
+        every entity, a list with the options of each entity, or a callable
+        receiving the index of an entity and returning its options.
+    :param int lanes: The maximum number of entities created at the same
+        time. Defaults to the ``pool_max_size`` option of the ``ssh_client``
+        settings section, the number of connections kept open to the server.
+    :raise robottelo.cli.factory.CLIFactoryBatchError: If any entity could not
+        be created. All the other entities are created before raising and
+        can be found in its ``results``.
+    :rtype: list
+    :return: The created entities, in the requested order.
+
+    """
+    if callable(options):
+        entities_options = [options(index) for index in range(count)]
+    elif isinstance(options, (list, tuple)):
+        if len(options) != count:
+            raise ValueError(
+                'Got {0} options for {1} entities'.format(len(options), count))
+        entities_options = [dict(values or {}) for values in options]
+    else:
+        entities_options = [dict(options or {}) for _ in range(count)]
+    if lanes is None:
+        lanes = settings.ssh_client.pool_max_size
+    lanes = max(1, min(lanes, count))
+    # partials and other callables have no name
+    factory_name = getattr(factory, '__name__', repr(factory))
+
+    results = [None] * count
+    errors = {}
+    pending = queue.Queue()
+    for index in range(count):
+        pending.put(index)
+
+    def create_in_lane(number):
+        """Create the pending entities until there are no more."""
+        with hammer_shell.lane(number):
+            while True:
+                try:
+                    index = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    results[index] = factory(entities_options[index])
+                except Exception as err:
+                    logger.error(
+                        u'Failed to create entity #%s with %s: %s',
+                        index, factory_name, err)
+                    errors[index] = err
+
+    with ThreadPoolExecutor(max_workers=lanes) as executor:
+        list(executor.map(create_in_lane, range(lanes)))
+    if errors:
+        raise CLIFactoryBatchError(factory_name, results, errors)
+    return results
+
+
 def _entity_with_credentials(credentials, cli_entity_cls):
     """Create entity class using credentials. If credentials is None will
     return cli_entity_cls itself
@@ -792,7 +889,7 @@ def make_partition_table(options=None):
         u'operatingsystems': None,
         u'organization-ids': None,
         u'organizations': None,
-        u'os-family': random.choice(OPERATING_SYSTEMS),
+        u'os-family': random.choice(constants.OPERATING_SYSTEMS),
     }
 
     # Upload file to server
@@ -3737,6 +3834,8 @@ def setup_cdn_and_custom_repositories(
             raise CLIFactoryError(u'Custom repository with url not supplied')
         if cdn:
             if bz_bug_is_open(1655239):
+                # imported here to not import NailGun with the factories
+                from robottelo.api.utils import enable_rhrepo_and_fetchid
                 rh_repo_id = enable_rhrepo_and_fetchid(
                     repo.get('arch', DEFAULT_ARCHITECTURE),
                     org_id,
@@ -4057,15 +4156,10 @@ def virt_who_hypervisor_config(
         'id': config_id,
         'output': temp_virt_who_deploy_file_path
     })
-    download_file(
-        remote_file=temp_virt_who_deploy_file_path,
-        local_file=temp_virt_who_deploy_file_path,
-        hostname=settings.server.hostname
-    )
-    upload_file(
-        local_file=temp_virt_who_deploy_file_path,
-        remote_file=temp_virt_who_deploy_file_path,
-        hostname=virt_who_vm.ip_addr
+    ssh.transfer_file(
+        temp_virt_who_deploy_file_path,
+        source_hostname=settings.server.hostname,
+        destination_hostname=virt_who_vm.ip_addr
     )
     # ensure the virt-who config deploy script is executable
     result = virt_who_vm.run('chmod +x {0}'.format(
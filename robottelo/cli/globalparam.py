@@ -30,4 +30,4 @@ class GlobalParameter(Base):
     def set(cls, options=None):
         """ Set global parameter """
         cls.command_sub = 'set'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, command_sub='set'))
@@ -38,4 +38,5 @@ class GPGKey(Base):
         cls.command_sub = 'info'
 
         return cls.execute(
-            cls._construct_command(options), output_format='json')
+            cls._construct_command(options, command_sub='info'),
+            output_format='json')
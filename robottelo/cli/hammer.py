@@ -1,4 +1,5 @@
 """Helpers to interact with hammer command line utility."""
+import codecs
 import csv
 import json
 
@@ -28,15 +29,14 @@ def _csv_reader(output):
     :return: generator that will yield a list of unicode string values.
 
     """
-    data = '\n'.join(output)
     if six.PY2:
-        data = data.encode('utf8')
-    handler = StringIO(data)
-
-    for row in csv.reader(handler):  # pragma: no cover
-        if six.PY2:
+        data = '\n'.join(output).encode('utf8')
+        for row in csv.reader(StringIO(data)):  # pragma: no cover
             yield [value.decode('utf8') for value in row]
-        else:
+    else:
+        # the line endings are needed to keep the line breaks of multi-line
+        # values
+        for row in csv.reader(line + '\n' for line in output):
             yield row
 
 
@@ -68,13 +68,114 @@ def _normalize_obj(obj):
     return obj
 
 
-def parse_csv(output):
-    """Parse CSV output from Hammer CLI and convert it to python dictionary."""
+def iter_json(chunks):
+    """Parse JSON output from Hammer CLI while it is read.
+
+    When the output is a list, each one of its items is yielded as soon as it
+    has been completely read, otherwise the whole output is parsed and
+    yielded at once. Items are normalized like :func:`parse_json` does.
+
+    :param chunks: an iterable of bytes chunks of the command output, for
+        example a :class:`robottelo.ssh.SSHCommandStream`.
+    :return: generator of parsed JSON objects.
+    """
+    decoder = json.JSONDecoder()
+    data = _iter_decoded(chunks)
+    text = u''
+    for text in data:
+        text = text.lstrip()
+        if text:
+            break
+    if not text.startswith(u'['):
+        # not a list, nothing to yield before the whole output is read
+        text = u''.join([text] + list(data))
+        if text.strip():
+            yield parse_json(text)
+        return
+    text = text[1:]
+    while True:
+        # skip the separators and try to decode the next items
+        position = 0
+        while True:
+            while position < len(text) and text[position] in u' \t\r\n,':
+                position += 1
+            if position < len(text) and text[position] == u']':
+                return
+            try:
+                obj, end = decoder.raw_decode(text, position)
+            except ValueError:  # item not completely read yet
+                break
+            position = end
+            yield _normalize_obj(obj)
+        text = text[position:]
+        chunk = next(data, None)
+        if chunk is None:
+            raise ValueError(
+                'Unterminated JSON list: {0!r}'.format(text[:80]))
+        text += chunk
+
+
+def _iter_decoded(chunks):
+    """Decode UTF-8 bytes chunks, which may split multi-byte characters."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in chunks:
+        data = decoder.decode(chunk)
+        if data:
+            yield data
+    data = decoder.decode(b'', final=True)
+    if data:
+        yield data
+
+
+_COLOR_CODES_REGEX = re.compile(r'\x1b\[\d\d?m')
+
+
+def iter_output_lines(chunks):
+    """Split the output of a hammer command in lines while it is read.
+
+    The lines are cleaned up the same way :func:`robottelo.ssh.command` does
+    for hammer output: empty values (``""``), color codes and Rails traffic
+    lines are removed.
+
+    :param chunks: an iterable of bytes chunks of the command output, for
+        example a :class:`robottelo.ssh.SSHCommandStream`.
+    :return: generator of unicode lines, without line endings.
+    """
+    pending = u''
+    for data in _iter_decoded(chunks):
+        lines = (pending + data).split(u'\n')
+        pending = lines.pop()
+        for line in lines:
+            line = line.replace(u'""', u'')
+            if not line.startswith(u'['):
+                yield _COLOR_CODES_REGEX.sub(u'', line)
+    pending = pending.replace(u'""', u'')
+    if not pending.startswith(u'['):
+        yield _COLOR_CODES_REGEX.sub(u'', pending)
+
+
+def iter_csv(output):
+    """Parse CSV output from Hammer CLI and yield a python dictionary per
+    row as the rows are read.
+
+    :param output: an iterable of unicode lines, for example the output of
+        :func:`iter_output_lines`.
+    """
     reader = _csv_reader(output)
     # Generate the key names, spaces will be converted to dashes "-"
-    keys = [_normalize(header) for header in next(reader)]
+    headers = next(reader, None)
+    if headers is None:
+        return
+    keys = [_normalize(header) for header in headers]
     # For each entry, create a dict mapping each key with each value
-    return [dict(zip(keys, values)) for values in reader if len(values) > 0]
+    for values in reader:
+        if len(values) > 0:
+            yield dict(zip(keys, values))
+
+
+def parse_csv(output):
+    """Parse CSV output from Hammer CLI and convert it to python dictionary."""
+    return list(iter_csv(output))
 
 
 def parse_help(output):
@@ -149,16 +250,8 @@ def get_line_indentation_spaces(line, tab_spaces=4):
     """
     if not line or len(line) < tab_spaces:
         return 0
-    spaces = 0
-    for char in line:
-        if char not in (' ', '\t'):
-            break
-        if char == '\t':
-            spaces += tab_spaces
-        else:
-            spaces += 1
-
-    return spaces
+    indent = len(line) - len(line.lstrip(' \t'))
+    return indent + (tab_spaces - 1) * line.count('\t', 0, indent)
 
 
 def get_line_indentation_level(line, tab_spaces=4, indentation_spaces=4):
@@ -185,8 +278,26 @@ def get_line_indentation_level(line, tab_spaces=4, indentation_spaces=4):
         line, tab_spaces=tab_spaces)//indentation_spaces
 
 
+# Patterns used by parse_info, compiled once instead of on every line
+_INFO_NUMBERED_VALUE_REGEX = re.compile(r'\d+\)\s+(.+)$')
+_INFO_NUMBERED_KEY_REGEX = re.compile(r'(\d+)\)')
+_INFO_NUMBER_REGEX = re.compile(r'\d+\)')
+
+
 def parse_info(output):
-    """Parse the info output and returns a dict mapping the values."""
+    """Parse the info output and returns a dict mapping the values.
+
+    The output is parsed in a single pass, each line is classified as one of
+    the following tokens which updates the parsing state:
+
+    * ``Key: value``: a property.
+    * ``Key:``: a new group of sub-properties.
+    * `` Key: value`` or `` Key => value``: a sub-property of the last group,
+      or of a third level group when indented twice.
+    * `` 1) Key: value``: starts a new entry of a list of sub-properties.
+    * `` value`` or `` 1) value``: a value of a list of single values.
+
+    """
     # info dictionary
     contents = {}
     sub_prop = None  # stores name of the last group of sub-properties
@@ -197,96 +308,97 @@ def parse_info(output):
         # skip empty lines
         if line == '':
             continue
-        current_indent_level = get_line_indentation_level(line)
-        if current_indent_level <= 1:
+        # same as get_line_indentation_level, without the function calls
+        body = line.lstrip(' \t')
+        if len(line) < 4:
+            level = 0
+        else:
+            indent = len(line) - len(body)
+            level = (indent + 3 * line.count('\t', 0, indent)) // 4
+        if level <= 1:
             # we are entering or leaving a second level from lower/upper levels
             # clear the second level key
             second_level_key = None
-        if line.startswith(' '):  # sub-properties are indented
-            # values are separated by ':' or '=>', but not by '::' which can be
-            # entity name like 'test::params::keys'
-            if line.find(':') != -1 and not line.find('::') != -1:
-                key, value = line.lstrip().split(":", 1)
-            elif line.find('=>') != -1 and len(
-                    line.lstrip().split(" =>", 1)) == 2:
-                key, value = line.lstrip().split(" =>", 1)
-            else:
-                key = value = None
-
-            if key is None and value is None:
-                # Parse single attribute collection properties
-                # Template
-                #  1) template1
-                #  2) template2
-                #
-                # or
-                # Template
-                #  template1
-                #  template2
-                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
-
-                if match is None:
-                    match = re.match(r'(.*)$', line.lstrip())
-
-                value = match.group(1)
-
-                if isinstance(contents[sub_prop], dict):
-                    contents[sub_prop] = []
+        body = body.lstrip()
 
-                contents[sub_prop].append(value)
-            else:
-                # some properties have many numbered values
-                # Example:
-                # Content:
-                #  1) Repo Name: repo1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                #  2) Repo Name: puppet1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                starts_with_number = re.match(r'(\d+)\)', key)
-                if starts_with_number:
-                    sub_num = int(starts_with_number.group(1))
-                    # no. 1) we need to change dict() to list()
-                    if sub_num == 1:
-                        contents[sub_prop] = []
-                    # remove number from key
-                    key = re.sub(r'\d+\)', '', key)
-                    # append empty dict to array
-                    contents[sub_prop].append({})
-
-                key = key.lstrip().replace(' ', '-').lower()
-                value = value.lstrip()
-                # add value to dictionary
-                if sub_num is not None:
-                    contents[sub_prop][-1][key] = value
-                else:
-                    # a third level is always represented as a dictionary and
-                    # we need to detect if we are at third level
-                    # example:
-                    # Content Information:
-                    #     Content View:
-                    #         ID:   10
-                    #         Name: Default Organization View
-                    # the "ID" and "Name" are located at third indent level
-                    # "content view" is located at second indent level
-                    if current_indent_level == 2 and second_level_key:
-                        # we are at third level indentation
-                        if not contents[sub_prop][second_level_key]:
-                            contents[sub_prop][second_level_key] = {}
-                        contents[sub_prop][second_level_key][key] = value
-                    else:
-                        contents[sub_prop][key] = value
-                    if current_indent_level == 1 and not value:
-                        # always set the last possible second level key
-                        # that can form a third level
-                        second_level_key = key
-        else:
+        if line[0] != ' ':
+            # 'key: value' or 'key:' token
             sub_num = None  # new property implies no sub property
-            key, value = line.lstrip().split(":", 1)
-            key = key.lstrip().replace(' ', '-').lower()
-            if value.lstrip() == '':  # 'key:' no value, new sub-property
+            key, value = body.split(':', 1)
+            key = key.replace(' ', '-').lower()
+            value = value.lstrip()
+            if value == '':  # 'key:' no value, new sub-property
                 sub_prop = key
                 contents[sub_prop] = {}
             else:  # 'key: value' line
-                contents[key] = value.lstrip()
+                contents[key] = value
+            continue
+
+        # sub-properties are indented, values are separated by ':' or '=>', but
+        # not by '::' which can be entity name like 'test::params::keys'
+        if ':' in body and '::' not in body:
+            key, _, value = body.partition(':')
+        elif ' =>' in body:
+            key, _, value = body.partition(' =>')
+        else:
+            # Parse single attribute collection properties
+            # Template
+            #  1) template1
+            #  2) template2
+            #
+            # or
+            # Template
+            #  template1
+            #  template2
+            match = _INFO_NUMBERED_VALUE_REGEX.match(body)
+            if isinstance(contents[sub_prop], dict):
+                contents[sub_prop] = []
+            contents[sub_prop].append(match.group(1) if match else body)
+            continue
+
+        value = value.lstrip()
+        # some properties have many numbered values
+        # Example:
+        # Content:
+        #  1) Repo Name: repo1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        #  2) Repo Name: puppet1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        if key[:1].isdigit():
+            match = _INFO_NUMBERED_KEY_REGEX.match(key)
+            if match:
+                sub_num = int(match.group(1))
+                # no. 1) we need to change dict() to list()
+                if sub_num == 1:
+                    contents[sub_prop] = []
+                # remove number from key
+                key = _INFO_NUMBER_REGEX.sub('', key)
+                # append empty dict to array
+                contents[sub_prop].append({})
+        key = key.lstrip().replace(' ', '-').lower()
+        if sub_num is not None:
+            contents[sub_prop][-1][key] = value
+            continue
+        # a third level is always represented as a dictionary and we need to
+        # detect if we are at third level
+        # example:
+        # Content Information:
+        #     Content View:
+        #         ID:   10
+        #         Name: Default Organization View
+        # the "ID" and "Name" are located at third indent level
+        # "content view" is located at second indent level
+        properties = contents[sub_prop]
+        if level == 2 and second_level_key:
+            # we are at third level indentation
+            if not properties[second_level_key]:
+                properties[second_level_key] = {}
+            properties[second_level_key][key] = value
+        else:
+            properties[key] = value
+        if level == 1 and not value:
+            # always set the last possible second level key that can form a
+            # third level
+            second_level_key = key
 
     return contents
@@ -0,0 +1,336 @@
+# -*- encoding: utf-8 -*-
+"""Long running hammer processes to run hammer commands without paying the
+hammer startup time on every command.
+
+Every hammer call loads the Ruby interpreter, hammer and all its plugins
+before doing any work. A hammer shell session starts a single Ruby process on
+the server which loads hammer once and then runs each command sent to it in
+process, replying with the command stdout, stderr and exit status.
+
+The stock ``hammer shell`` can not be used for this as it discards the exit
+status of the commands and mixes its prompt with the command output, so the
+session runs a small Ruby loop around the hammer executable instead. A JSON
+document per line is used in both directions::
+
+    > {"args": ["-u", "admin", "-p", "changeme", "organization", "list"]}
+    < ROBOTTELO-HAMMER {"status": 0, "stdout": "...", "stderr": ""}
+
+Sessions are kept per process, server and hammer user, as hammer caches its
+API connection, and per lane, see :func:`lane`, so concurrent threads do not
+wait for each other's commands. Commands that rely on the remote shell (pipes,
+redirections, variable expansions) are never sent to a session.
+"""
+import json
+import logging
+import os
+import select
+import shlex
+import threading
+import time
+
+from contextlib import contextmanager
+from six.moves import shlex_quote
+
+from robottelo import ssh
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_MARKER = b'ROBOTTELO-HAMMER '
+
+DRIVER_SCRIPT = r'''
+require 'json'
+require 'stringio'
+STDOUT.sync = true
+reply = STDOUT.dup
+reply.sync = true
+hammer = ARGV.shift
+while (line = STDIN.gets)
+  out, err = StringIO.new, StringIO.new
+  $stdout, $stderr = out, err
+  begin
+    ARGV.replace(JSON.parse(line)['args'])
+    load hammer
+    status = 0
+  rescue SystemExit => e
+    status = e.status
+  rescue Exception => e
+    err.puts(e.message)
+    status = 70
+  ensure
+    $stdout, $stderr = STDOUT, STDERR
+  end
+  reply.puts('ROBOTTELO-HAMMER ' + JSON.generate(
+    'status' => status,
+    'stdout' => out.string.scrub,
+    'stderr' => err.string.scrub
+  ))
+end
+'''
+
+# Tokens that need a real shell to be interpreted
+SHELL_PUNCTUATION = '|&;<>()'
+SHELL_EXPANSION_CHARS = ('$', '`')
+
+READ_SIZE = 32768
+
+# Starting a session on a server where it failed is retried after
+# START_RETRY_DELAY seconds, doubled after each failure, and no longer tried
+# after START_ATTEMPTS failures
+START_ATTEMPTS = 3
+START_RETRY_DELAY = 30
+
+
+class HammerShellError(Exception):
+    """Raised when a hammer shell session can not be started or stops
+    responding.
+    """
+
+
+def split_command(command):
+    """Split a hammer command into arguments like the remote shell would.
+
+    :param str command: A hammer command, without the ``hammer`` executable.
+    :return: A list of arguments or ``None`` if the command needs a real
+        shell to be interpreted, for example when it has pipes or variable
+        expansions.
+    """
+    if any(char in command for char in SHELL_EXPANSION_CHARS):
+        return None
+    try:
+        args = shlex.split(command)
+        # punctuation is only split in its own tokens when not quoted
+        tokens = list(shlex.shlex(command, posix=True, punctuation_chars=True))
+    except ValueError:  # unbalanced quotes
+        return None
+    if any(not token.strip(SHELL_PUNCTUATION) for token in tokens):
+        return None
+    return args
+
+
+class HammerShell(object):
+    """A long running hammer process on the server.
+
+    :param str hostname: The server to run hammer on. Defaults to the server
+        configuration ``hostname``.
+    """
+
+    def __init__(self, hostname=None):
+        self.hostname = hostname or settings.server.hostname
+        self._client = None
+        self._channel = None
+        self._buffer = b''
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self):
+        """Whether the remote hammer process is running."""
+        return (
+            self._channel is not None and
+            not self._channel.closed and
+            not self._channel.exit_status_ready()
+        )
+
+    def start(self):
+        """Start the remote hammer process.
+
+        :raises HammerShellError: If the process can not be started or hammer
+            can not be loaded.
+        """
+        self.stop()
+        command = u'LANG={0} ruby -e {1} "$(command -v hammer)"'.format(
+            settings.locale, shlex_quote(DRIVER_SCRIPT))
+        try:
+            self._client = ssh.get_client(hostname=self.hostname)
+            self._channel = self._client.get_transport().open_session()
+            self._channel.exec_command(command)
+        except Exception as err:
+            self.stop()
+            raise HammerShellError(
+                'Failed to start hammer shell on {0}: {1}'.format(
+                    self.hostname, err))
+        # Make hammer load everything now and check it works at all
+        result = self.execute(['--version'])
+        if result.return_code != 0:
+            self.stop()
+            raise HammerShellError(
+                'Failed to load hammer on {0}: {1}'.format(
+                    self.hostname, result.stderr))
+        logger.debug('Started hammer shell on %s', self.hostname)
+
+    def stop(self):
+        """Stop the remote hammer process, if running."""
+        if self._client is not None:
+            self._client.close()
+            logger.debug('Stopped hammer shell on %s', self.hostname)
+        self._client = None
+        self._channel = None
+        self._buffer = b''
+
+    def _read_response(self, timeout):
+        """Read the next response sent by the remote process.
+
+        Any line not starting with ``RESPONSE_MARKER`` was written directly to
+        the process stdout by hammer and is added to the command stdout.
+        """
+        end_time = time.time() + timeout if timeout else None
+        extra_stdout = []
+        # chunks are only joined once a full line is available, responses
+        # carry the whole command output in a single line
+        pending = [self._buffer]
+        while True:
+            if b'\n' in pending[-1]:
+                lines = b''.join(pending).split(b'\n')
+                self._buffer = lines.pop()
+                pending = [self._buffer]
+                for index, line in enumerate(lines):
+                    if line.startswith(RESPONSE_MARKER):
+                        self._buffer = b'\n'.join(
+                            lines[index + 1:] + [self._buffer])
+                        response = json.loads(
+                            line[len(RESPONSE_MARKER):].decode('utf-8'))
+                        response['stdout'] = u''.join(
+                            extra_stdout + [response['stdout']])
+                        return response
+                    extra_stdout.append(ssh.decode_to_utf8(line + b'\n'))
+                continue
+            while self._channel.recv_stderr_ready():
+                logger.debug('hammer shell stderr: %s',
+                             self._channel.recv_stderr(READ_SIZE))
+            if self._channel.recv_ready():
+                data = self._channel.recv(READ_SIZE)
+                if data:
+                    pending.append(data)
+                    continue
+            if self._channel.eof_received or self._channel.closed:
+                raise HammerShellError('hammer shell exited unexpectedly')
+            remaining = None
+            if end_time is not None:
+                remaining = end_time - time.time()
+                if remaining <= 0:
+                    raise ssh.SSHCommandTimeoutError(
+                        'hammer shell did not respond in the predefined time '
+                        '(timeout={0})'.format(timeout)
+                    )
+            select.select([self._channel], [], [], remaining)
+
+    def execute(self, args, output_format=None, timeout=None):
+        """Run hammer with the given arguments in the remote process.
+
+        :param list args: The hammer arguments.
+        :param output_format: plain|json|csv|list valid only for hammer
+            commands
+        :param timeout: Time to wait for the command to finish.
+        :return: SSHCommandResult
+        :raises HammerShellError: If the remote process died while running
+            the command. The session is stopped and can be started again.
+        :raises robottelo.ssh.SSHCommandTimeoutError: If the command has not
+            finished after ``timeout`` seconds. The session is stopped as its
+            hammer process is still busy with the command.
+        """
+        if timeout is None:
+            timeout = settings.ssh_client.command_timeout
+        request = json.dumps({'args': args}) + '\n'
+        with self._lock:
+            try:
+                self._channel.sendall(request.encode('utf-8'))
+                response = self._read_response(timeout)
+            except Exception:
+                self.stop()
+                raise
+        return ssh.build_command_result(
+            response['stdout'], response['stderr'], response['status'],
+            output_format
+        )
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_sessions_pid = None
+# hostname: (number of failed starts, time before which not to retry)
+_start_failures = {}
+_lanes = threading.local()
+
+
+@contextmanager
+def lane(number):
+    """Run the hammer commands of the current thread in the sessions of lane
+    ``number`` instead of the sessions of lane ``0``.
+
+    Each lane has its own sessions, which are kept for later uses of the
+    same lane.
+    """
+    previous = getattr(_lanes, 'number', 0)
+    _lanes.number = number
+    try:
+        yield
+    finally:
+        _lanes.number = previous
+
+
+def get_session(username, password, hostname=None):
+    """Return the hammer shell session of this process and of the current
+    lane for ``username`` on ``hostname``, starting it if needed.
+
+    :return: A running HammerShell or ``None`` if a session can not be
+        started on ``hostname``. After a failure starting is retried with a
+        backoff, up to ``START_ATTEMPTS`` times.
+    """
+    global _sessions_pid
+    hostname = hostname or settings.server.hostname
+    key = (hostname, username, password, getattr(_lanes, 'number', 0))
+    # The lock is held while starting so two threads asking for the same
+    # session do not each start a remote process
+    with _sessions_lock:
+        if _sessions_pid != os.getpid():
+            # sessions inherited from a parent process are not usable
+            _sessions.clear()
+            _start_failures.clear()
+            _sessions_pid = os.getpid()
+        failures, retry_time = _start_failures.get(hostname, (0, 0))
+        if failures >= START_ATTEMPTS or time.time() < retry_time:
+            return None
+        session = _sessions.get(key)
+        if session is None or not session.alive:
+            session = HammerShell(hostname)
+            try:
+                session.start()
+            except (HammerShellError, ssh.SSHCommandTimeoutError) as err:
+                logger.warning(
+                    'Not using hammer shell, falling back to a hammer '
+                    'process per command: %s', err)
+                _start_failures[hostname] = (
+                    failures + 1,
+                    time.time() + START_RETRY_DELAY * 2 ** failures,
+                )
+                return None
+            _start_failures.pop(hostname, None)
+            _sessions[key] = session
+        return session
+
+
+def execute(args, username, password, output_format=None, timeout=None,
+            hostname=None):
+    """Run a hammer command in the hammer shell session of this process.
+
+    :param list args: The hammer arguments, including the ``-u`` and ``-p``
+        options for ``username`` and ``password``.
+    :param username: The hammer user the session is for.
+    :param password: The password of the hammer user.
+    :return: SSHCommandResult or ``None`` if no session is available and the
+        command must be run in a hammer process instead.
+    """
+    session = get_session(username, password, hostname)
+    if session is None:
+        return None
+    logger.info('>>> hammer shell: %s', u' '.join(args))
+    try:
+        return session.execute(args, output_format, timeout)
+    except HammerShellError as err:
+        # The command may have run, so it is not safe to run it again
+        logger.error('hammer shell died while running the command: %s', err)
+        return ssh.SSHCommandResult(
+            stderr=u'hammer shell died while running the command: {0}'.format(
+                err),
+            return_code=255,
+        )
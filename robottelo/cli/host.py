@@ -67,28 +67,32 @@ class Host(Base):
         """
         cls.command_sub = 'enc-dump'
         return cls.execute(
-            cls._construct_command(options), output_format='yaml')
+            cls._construct_command(options, command_sub='enc-dump'),
+            output_format='yaml')
 
     @classmethod
     def errata_apply(cls, options):
         """Schedule errata for installation"""
         cls.command_sub = 'errata apply'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='errata apply'),
+            output_format='csv')
 
     @classmethod
     def errata_info(cls, options):
         """Retrieve a single errata for a system"""
         cls.command_sub = 'errata info'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='errata info'),
+            output_format='csv')
 
     @classmethod
     def errata_list(cls, options):
         """List errata available for the content host."""
         cls.command_sub = 'errata list'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='errata list'),
+            output_format='csv')
 
     @classmethod
     def facts(cls, options=None):
@@ -112,7 +116,8 @@ class Host(Base):
         cls.command_sub = 'facts'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='facts'),
+            output_format='csv')
 
         facts = []
 
@@ -126,49 +131,59 @@ class Host(Base):
         """Install packages remotely."""
         cls.command_sub = 'package install'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='package install'),
+            output_format='csv')
 
     @classmethod
     def package_list(cls, options):
         """List packages installed on the host."""
         cls.command_sub = 'package list'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='package list'),
+            output_format='csv')
 
     @classmethod
     def package_remove(cls, options):
         """Uninstall packages remotely."""
         cls.command_sub = 'package remove'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='package remove'),
+            output_format='csv')
 
     @classmethod
     def package_upgrade(cls, options):
         """Update packages remotely."""
         cls.command_sub = 'package upgrade'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='package upgrade'),
+            output_format='csv')
 
     @classmethod
     def package_upgrade_all(cls, options):
         """Update all packages remotely."""
         cls.command_sub = 'package upgrade-all'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='package upgrade-all'),
+            output_format='csv')
 
     @classmethod
     def package_group_install(cls, options):
         """Install package groups remotely."""
         cls.command_sub = 'package-group install'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='package-group install'),
+            output_format='csv')
 
     @classmethod
     def package_group_remove(cls, options):
         """Uninstall package groups remotely."""
         cls.command_sub = 'package-group remove'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='package-group remove'),
+            output_format='csv')
 
     @classmethod
     def puppetrun(cls, options=None):
@@ -188,7 +203,8 @@ class Host(Base):
 
         cls.command_sub = 'puppetrun'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='puppetrun'))
 
         return result
 
@@ -210,7 +226,8 @@ class Host(Base):
 
         cls.command_sub = 'reboot'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='reboot'))
 
         return result
 
@@ -237,7 +254,8 @@ class Host(Base):
         cls.command_sub = 'reports'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='reports'),
+            output_format='csv')
 
         reports = []
 
@@ -264,7 +282,8 @@ class Host(Base):
 
         cls.command_sub = 'start'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='start'))
 
         return result
 
@@ -286,7 +305,8 @@ class Host(Base):
 
         cls.command_sub = 'status'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='status'))
 
         return result
 
@@ -309,7 +329,8 @@ class Host(Base):
 
         cls.command_sub = 'stop'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='stop'))
 
         return result
 
@@ -368,7 +389,9 @@ class Host(Base):
         """
         cls.command_sub = 'subscription register'
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='subscription register'),
+            output_format='csv')
         if isinstance(result, list):
             result = result[0]
         return result
@@ -387,7 +410,9 @@ class Host(Base):
             --host-id HOST_ID             Host ID
         """
         cls.command_sub = 'subscription unregister'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(
+                options, command_sub='subscription unregister'))
 
     @classmethod
     def subscription_attach(cls, options=None):
@@ -406,7 +431,8 @@ class Host(Base):
             --subscription-id SUBSCRIPTION_ID ID of subscription
         """
         cls.command_sub = 'subscription attach'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='subscription attach'))
 
     @classmethod
     def subscription_remove(cls, options=None):
@@ -426,7 +452,8 @@ class Host(Base):
             --subscription-id SUBSCRIPTION_ID   ID of subscription
         """
         cls.command_sub = 'subscription remove'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='subscription remove'))
 
     @classmethod
     def subscription_auto_attach(cls, options=None):
@@ -443,7 +470,9 @@ class Host(Base):
             -h, --help                    print help
         """
         cls.command_sub = 'subscription auto-attach'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(
+                options, command_sub='subscription auto-attach'))
 
     @classmethod
     def sc_params(cls, options=None):
@@ -464,7 +493,8 @@ class Host(Base):
         """
         cls.command_sub = 'sc-params'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='sc-params'),
+            output_format='csv')
 
     @classmethod
     def smart_variables(cls, options=None):
@@ -485,7 +515,8 @@ class Host(Base):
         """
         cls.command_sub = 'smart-variables'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='smart-variables'),
+            output_format='csv')
 
 
 class HostInterface(Base):
@@ -507,4 +538,6 @@ class HostInterface(Base):
     def create(cls, options=None):
         """Create new network interface for host"""
         cls.command_sub = 'create'
-        cls.execute(cls._construct_command(options), output_format='csv')
+        cls.execute(
+            cls._construct_command(options, command_sub='create'),
+            output_format='csv')
@@ -51,7 +51,8 @@ class HostGroup(Base):
         """
         cls.command_sub = 'sc-params'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='sc-params'),
+            output_format='csv')
 
     @classmethod
     def smart_variables(cls, options=None):
@@ -73,4 +74,5 @@ class HostGroup(Base):
         """
         cls.command_sub = 'smart-variables'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='smart-variables'),
+            output_format='csv')
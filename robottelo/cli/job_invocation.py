@@ -30,4 +30,4 @@ class JobInvocation(Base):
         """Get output of the job invocation"""
         cls.command_sub = 'output'
         return cls.execute(
-            cls._construct_command(options))
+            cls._construct_command(options, command_sub='output'))
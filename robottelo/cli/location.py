@@ -53,7 +53,9 @@ class Location(Base):
 
         cls.command_sub = 'add-compute-resource'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(
+                options, command_sub='add-compute-resource'))
 
     @classmethod
     def add_config_template(cls, options=None):
@@ -61,7 +63,8 @@ class Location(Base):
 
         cls.command_sub = 'add-config-template'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='add-config-template'))
 
     @classmethod
     def add_domain(cls, options=None):
@@ -69,7 +72,8 @@ class Location(Base):
 
         cls.command_sub = 'add-domain'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='add-domain'))
 
     @classmethod
     def add_environment(cls, options=None):
@@ -77,7 +81,8 @@ class Location(Base):
 
         cls.command_sub = 'add-environment'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='add-environment'))
 
     @classmethod
     def add_hostgroup(cls, options=None):
@@ -85,7 +90,8 @@ class Location(Base):
 
         cls.command_sub = 'add-hostgroup'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='add-hostgroup'))
 
     @classmethod
     def add_medium(cls, options=None):
@@ -93,7 +99,8 @@ class Location(Base):
 
         cls.command_sub = 'add-medium'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='add-medium'))
 
     @classmethod
     def add_organization(cls, options=None):
@@ -101,7 +108,8 @@ class Location(Base):
 
         cls.command_sub = 'add-organization'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='add-organization'))
 
     @classmethod
     def add_smart_proxy(cls, options=None):
@@ -109,7 +117,8 @@ class Location(Base):
 
         cls.command_sub = 'add-smart-proxy'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='add-smart-proxy'))
 
     @classmethod
     def add_subnet(cls, options=None):
@@ -117,7 +126,8 @@ class Location(Base):
 
         cls.command_sub = 'add-subnet'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='add-subnet'))
 
     @classmethod
     def add_user(cls, options=None):
@@ -125,7 +135,8 @@ class Location(Base):
 
         cls.command_sub = 'add-user'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='add-user'))
 
     @classmethod
     def remove_compute_resource(cls, options=None):
@@ -133,7 +144,9 @@ class Location(Base):
 
         cls.command_sub = 'remove-compute-resource'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(
+                options, command_sub='remove-compute-resource'))
 
     @classmethod
     def remove_config_template(cls, options=None):
@@ -141,7 +154,9 @@ class Location(Base):
 
         cls.command_sub = 'remove-config-template'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(
+                options, command_sub='remove-config-template'))
 
     @classmethod
     def remove_domain(cls, options=None):
@@ -149,7 +164,8 @@ class Location(Base):
 
         cls.command_sub = 'remove-domain'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='remove-domain'))
 
     @classmethod
     def remove_environment(cls, options=None):
@@ -157,7 +173,8 @@ class Location(Base):
 
         cls.command_sub = 'remove-environment'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='remove-environment'))
 
     @classmethod
     def remove_hostgroup(cls, options=None):
@@ -165,7 +182,8 @@ class Location(Base):
 
         cls.command_sub = 'remove-hostgroup'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='remove-hostgroup'))
 
     @classmethod
     def remove_medium(cls, options=None):
@@ -173,7 +191,8 @@ class Location(Base):
 
         cls.command_sub = 'remove-medium'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='remove-medium'))
 
     @classmethod
     def remove_organization(cls, options=None):
@@ -181,7 +200,8 @@ class Location(Base):
 
         cls.command_sub = 'remove-organization'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='remove-organization'))
 
     @classmethod
     def remove_smart_proxy(cls, options=None):
@@ -189,7 +209,8 @@ class Location(Base):
 
         cls.command_sub = 'remove-smart-proxy'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='remove-smart-proxy'))
 
     @classmethod
     def remove_subnet(cls, options=None):
@@ -197,7 +218,8 @@ class Location(Base):
 
         cls.command_sub = 'remove-subnet'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='remove-subnet'))
 
     @classmethod
     def remove_user(cls, options=None):
@@ -205,4 +227,5 @@ class Location(Base):
 
         cls.command_sub = 'remove-user'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='remove-user'))
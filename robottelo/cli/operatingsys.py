@@ -38,6 +38,9 @@ class OperatingSys(Base):
     """
 
     command_base = 'os'
+    cacheable_reads = True
+    reference_options = ('operatingsystem',)
+    info_references = ('architecture', 'medium', 'partition-table', 'template')
 
     @classmethod
     def add_architecture(cls, options=None):
@@ -47,7 +50,8 @@ class OperatingSys(Base):
 
         cls.command_sub = 'add-architecture'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='add-architecture'))
 
         return result
 
@@ -59,7 +63,9 @@ class OperatingSys(Base):
 
         cls.command_sub = 'add-config-template '
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(
+                options, command_sub='add-config-template '))
 
         return result
 
@@ -71,7 +77,8 @@ class OperatingSys(Base):
 
         cls.command_sub = 'add-ptable'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='add-ptable'))
 
         return result
 
@@ -83,7 +90,8 @@ class OperatingSys(Base):
 
         cls.command_sub = 'remove-architecture'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='remove-architecture'))
 
         return result
 
@@ -95,7 +103,9 @@ class OperatingSys(Base):
 
         cls.command_sub = 'remove-config-template'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(
+                options, command_sub='remove-config-template'))
 
         return result
 
@@ -107,6 +117,7 @@ class OperatingSys(Base):
 
         cls.command_sub = 'remove-ptable '
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='remove-ptable '))
 
         return result
@@ -30,3 +30,6 @@ class PartitionTable(Base):
     """
 
     command_base = 'partition-table'
+    cacheable_reads = True
+    reference_options = ('partition-table', 'ptable')
+    info_references = ('os',)
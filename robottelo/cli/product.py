@@ -40,7 +40,8 @@ class Product(Base):
 
         cls.command_sub = 'remove-sync-plan'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='remove-sync-plan'))
 
         return result
 
@@ -52,7 +53,8 @@ class Product(Base):
 
         cls.command_sub = 'set-sync-plan'
 
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, command_sub='set-sync-plan'))
 
         return result
 
@@ -61,6 +63,6 @@ class Product(Base):
         """Synchronize a product."""
         cls.command_sub = 'synchronize'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='synchronize'),
             ignore_stderr=True,
         )
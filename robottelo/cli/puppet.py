@@ -43,7 +43,7 @@ class Puppet(Base):
         """
         cls.command_sub = 'sc-params'
         return cls.execute(
-                cls._construct_command(options),
+                cls._construct_command(options, command_sub='sc-params'),
                 output_format='csv'
         )
 
@@ -63,6 +63,6 @@ class Puppet(Base):
          """
         cls.command_sub = 'smart-variables'
         return cls.execute(
-                cls._construct_command(options),
+                cls._construct_command(options, command_sub='smart-variables'),
                 output_format='csv'
         )
@@ -31,47 +31,25 @@ class Repository(Base):
 
     command_base = 'repository'
     command_requires_org = True
-
-    @classmethod
-    def create(cls, options=None):
-        """Create a custom repository"""
-        cls.command_requires_org = False
-
-        try:
-            result = super(Repository, cls).create(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
+    # custom repositories are created and read by id
+    commands_without_org = ('create', 'info')
 
     @classmethod
     def export(cls, options=None):
         """Export a repository"""
         cls.command_sub = 'export'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='export'),
             output_format='csv',
             ignore_stderr=True,
         )
 
-    @classmethod
-    def info(cls, options=None):
-        """Show a custom repository"""
-        cls.command_requires_org = False
-
-        try:
-            result = super(Repository, cls).info(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
-
     @classmethod
     def synchronize(cls, options, return_raw_response=None, timeout=3600):
         """Synchronizes a repository."""
         cls.command_sub = 'synchronize'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='synchronize'),
             output_format='csv',
             ignore_stderr=True,
             return_raw_response=return_raw_response,
@@ -83,7 +61,7 @@ class Repository(Base):
         """Remove content from a repository"""
         cls.command_sub = 'remove-content'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='remove-content'),
             output_format='csv',
             ignore_stderr=True,
         )
@@ -93,7 +71,7 @@ class Repository(Base):
         """Upload content to repository."""
         cls.command_sub = 'upload-content'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='upload-content'),
             output_format='csv',
             ignore_stderr=True,
         )
@@ -36,14 +36,16 @@ class RepositorySet(Base):
         """Enables a repository."""
         cls.command_sub = 'enable'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='enable'),
+            output_format='csv')
 
     @classmethod
     def disable(cls, options):
         """Disables a repository."""
         cls.command_sub = 'disable'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='disable'),
+            output_format='csv')
 
     @classmethod
     def available_repositories(cls, options):
@@ -73,4 +75,6 @@ class RepositorySet(Base):
         """
         cls.command_sub = 'available-repositories'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='available-repositories'),
+            output_format='csv')
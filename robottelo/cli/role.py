@@ -31,14 +31,16 @@ class Role(Base):
         """List all filters"""
         cls.command_sub = 'filters'
         return cls.execute(
-            cls._construct_command(options), output_format='json')
+            cls._construct_command(options, command_sub='filters'),
+            output_format='json')
 
     @classmethod
     def clone(cls, options):
         """Clone a role"""
         cls.command_sub = 'clone'
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='clone'),
+            output_format='csv')
         # Fetch new role
         if len(result) > 0 and 'id' in result[0]:
             new_role = cls.info({'id': result[0]['id']})
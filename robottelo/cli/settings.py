@@ -28,4 +28,4 @@ class Settings(Base):
         """Update a setting"""
         cls.command_sub = 'set'
 
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, command_sub='set'))
@@ -58,7 +58,8 @@ class SmartVariable(Base):
         """
         cls.command_sub = 'add-override-value'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-override-value'),
+            output_format='csv')
 
     @classmethod
     def remove_override_value(cls, options=None):
@@ -77,4 +78,6 @@ class SmartVariable(Base):
         """
         cls.command_sub = 'remove-override-value'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='remove-override-value'),
+            output_format='csv')
@@ -38,7 +38,7 @@ class Subscription(Base):
         if bz_bug_is_open(1669186) and (timeout is None or timeout < 1500):
             timeout = 1500
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='upload'),
             ignore_stderr=True,
             timeout=timeout,
         )
@@ -50,7 +50,7 @@ class Subscription(Base):
         if bz_bug_is_open(1669186) and (timeout is None or timeout < 1500):
             timeout = 1500
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='delete-manifest'),
             ignore_stderr=True,
             timeout=timeout,
         )
@@ -62,7 +62,7 @@ class Subscription(Base):
         if bz_bug_is_open(1669186) and (timeout is None or timeout < 1500):
             timeout = 1500
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='refresh-manifest'),
             ignore_stderr=True,
             timeout=timeout,
         )
@@ -71,4 +71,5 @@ class Subscription(Base):
     def manifest_history(cls, options=None):
         """Provided history for subscription manifest"""
         cls.command_sub = 'manifest-history'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='manifest-history'))
@@ -37,8 +37,9 @@ class Task(Base):
             --name NAME                   Name to search by
         """
         cls.command_sub = 'progress'
-        return cls.execute(cls._construct_command(options),
-                           return_raw_response=return_raw_response)
+        return cls.execute(
+            cls._construct_command(options, command_sub='progress'),
+            return_raw_response=return_raw_response)
 
     @classmethod
     def resume(cls, options=None):
@@ -53,4 +54,5 @@ class Task(Base):
             --tasks TASK_NAMES            Comma separated list of values.
         """
         cls.command_sub = 'resume'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(
+            cls._construct_command(options, command_sub='resume'))
@@ -40,7 +40,8 @@ class Template(Base):
         cls.command_sub = 'kinds'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='kinds'),
+            output_format='csv')
 
         kinds = []
         if result:
@@ -54,7 +55,9 @@ class Template(Base):
         cls.command_sub = 'add-operatingsystem'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='add-operatingsystem'),
+            output_format='csv')
 
         return result
 
@@ -64,7 +67,9 @@ class Template(Base):
         cls.command_sub = 'remove-operatingsystem'
 
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='remove-operatingsystem'),
+            output_format='csv')
 
         return result
 
@@ -73,11 +78,13 @@ class Template(Base):
         """Clone provided provisioning template"""
         cls.command_sub = 'clone'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='clone'),
+            output_format='csv')
 
     @classmethod
     def build_pxe_default(cls, options=None):
         """Build PXE default template"""
         cls.command_sub = 'build-pxe-default'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='build-pxe-default'),
+            output_format='csv')
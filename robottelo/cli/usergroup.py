@@ -44,7 +44,8 @@ class UserGroup(Base):
         """
         cls.command_sub = 'add-role'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-role'),
+            output_format='csv')
 
     @classmethod
     def add_user(cls, options=None):
@@ -61,7 +62,8 @@ class UserGroup(Base):
         """
         cls.command_sub = 'add-user'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-user'),
+            output_format='csv')
 
     @classmethod
     def add_user_group(cls, options=None):
@@ -78,7 +80,8 @@ class UserGroup(Base):
         """
         cls.command_sub = 'add-user-group'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-user-group'),
+            output_format='csv')
 
     @classmethod
     def remove_role(cls, options=None):
@@ -95,7 +98,8 @@ class UserGroup(Base):
         """
         cls.command_sub = 'remove-role'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='remove-role'),
+            output_format='csv')
 
     @classmethod
     def remove_user(cls, options=None):
@@ -112,7 +116,8 @@ class UserGroup(Base):
         """
         cls.command_sub = 'remove-user'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='remove-user'),
+            output_format='csv')
 
     @classmethod
     def remove_user_group(cls, options=None):
@@ -129,7 +134,8 @@ class UserGroup(Base):
         """
         cls.command_sub = 'remove-user-group'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='remove-user-group'),
+            output_format='csv')
 
 
 class UserGroupExternal(Base):
@@ -152,14 +158,16 @@ class UserGroupExternal(Base):
     def refresh(cls, options=None):
         cls.command_sub = 'refresh'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='refresh'),
+            output_format='csv')
 
     @classmethod
     def create(cls, options=None):
         """Create external user group"""
         cls.command_sub = 'create'
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='create'),
+            output_format='csv')
         # External user group can only be fetched by specifying both id and
         # user group id it is linked to
         if len(result) > 0 and 'id' in result[0]:
@@ -5,6 +5,8 @@ import logging.config
 
 import os
 import six
+import sys
+import threading
 
 from functools import partial
 
@@ -15,10 +17,6 @@ from six.moves.configparser import (
     ConfigParser
 )
 
-import airgun.settings
-
-from nailgun import entities, entity_mixins
-from nailgun.config import ServerConfig
 from robottelo.config import casts
 
 LOGGER = logging.getLogger(__name__)
@@ -33,6 +31,83 @@ class ImproperlyConfigured(Exception):
     """
 
 
+class _PostImportLoader(object):
+    """Loader running the callbacks of a :class:`_PostImportHook` once
+    ``loader`` has executed the module.
+    """
+
+    def __init__(self, hook, loader):
+        self.hook = hook
+        self.loader = loader
+
+    def create_module(self, spec):
+        create_module = getattr(self.loader, 'create_module', None)
+        return None if create_module is None else create_module(spec)
+
+    def exec_module(self, module):
+        # hand the module back to its own loader
+        module.__loader__ = module.__spec__.loader = self.loader
+        self.loader.exec_module(module)
+        self.hook._run_callbacks(module.__name__)
+
+
+class _PostImportHook(object):
+    """Import hook calling functions once a module is imported.
+
+    Lets the settings configure third party packages, like NailGun or
+    AirGun, only when the tests use them. The hook is in ``sys.meta_path``
+    only while some callbacks wait for their module.
+    """
+
+    def __init__(self):
+        self._callbacks = {}
+        self._lock = threading.RLock()
+
+    def register(self, module_name, callback):
+        """Call ``callback`` once ``module_name`` is imported, right away if
+        it already is.
+        """
+        with self._lock:
+            if module_name not in sys.modules:
+                self._callbacks.setdefault(module_name, []).append(callback)
+                if self not in sys.meta_path:
+                    sys.meta_path.insert(0, self)
+                return
+        callback()
+
+    def _run_callbacks(self, fullname):
+        """Call the callbacks of ``fullname`` and leave ``sys.meta_path`` if
+        no other module is waited for.
+        """
+        with self._lock:
+            callbacks = self._callbacks.pop(fullname, [])
+            if not self._callbacks and self in sys.meta_path:
+                sys.meta_path.remove(self)
+        for callback in callbacks:
+            callback()
+
+    def find_spec(self, fullname, path=None, target=None):
+        with self._lock:
+            if fullname not in self._callbacks:
+                return None
+        # let the other finders find it
+        for finder in list(sys.meta_path):
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is None or not hasattr(spec.loader, 'exec_module'):
+            return spec
+        spec.loader = _PostImportLoader(self, spec.loader)
+        return spec
+
+
+_post_import_hook = _PostImportHook()
+
+
 def get_project_root():
     """Return the path to the Robottelo project root directory.
 
@@ -270,10 +345,12 @@ class CapsuleSettings(FeatureSettings):
         self.instance_name = None
         self.hash = None
         self.ddns_package_url = None
+        self.golden_image = None
 
     def read(self, reader):
         """Read clients settings."""
         self.instance_name = reader.get('capsule', 'instance_name')
+        self.golden_image = reader.get('capsule', 'golden_image', False, bool)
 
     @property
     def hostname(self):
@@ -329,6 +406,53 @@ class CertsSettings(FeatureSettings):
         return validation_errors
 
 
+class CLISettings(FeatureSettings):
+    """Hammer CLI settings definitions."""
+    def __init__(self, *args, **kwargs):
+        super(CLISettings, self).__init__(*args, **kwargs)
+        self._hammer_backend = None
+        self._lazy_create_info = None
+        self._read_cache_ttl = None
+
+    @property
+    def hammer_backend(self):
+        return self._hammer_backend if (
+            self._hammer_backend is not None) else 'process'
+
+    @property
+    def lazy_create_info(self):
+        return self._lazy_create_info if (
+            self._lazy_create_info is not None) else False
+
+    @property
+    def read_cache_ttl(self):
+        return self._read_cache_ttl if (
+            self._read_cache_ttl is not None) else 300
+
+    def read(self, reader):
+        """Read Hammer CLI settings."""
+        self._hammer_backend = reader.get('cli', 'hammer_backend', 'process')
+        self._lazy_create_info = reader.get(
+            'cli', 'lazy_create_info', False, bool)
+        self._read_cache_ttl = reader.get('cli', 'read_cache_ttl', 300, int)
+
+    def validate(self):
+        """Validate Hammer CLI settings."""
+        validation_errors = []
+        hammer_backends = ('process', 'shell')
+        if self.hammer_backend not in hammer_backends:
+            validation_errors.append(
+                '[cli] hammer_backend should be one of {0}.'
+                .format(', '.join(hammer_backends))
+            )
+        if self.read_cache_ttl < 0:
+            validation_errors.append(
+                '[cli] read_cache_ttl should not be a negative number of '
+                'seconds.'
+            )
+        return validation_errors
+
+
 class ClientsSettings(FeatureSettings):
     """Clients settings definitions."""
     def __init__(self, *args, **kwargs):
@@ -336,12 +460,16 @@ class ClientsSettings(FeatureSettings):
         self.image_dir = None
         self.provisioning_server = None
         self.distros = None
+        self.pool_size = None
+        self.pool_distros = None
 
     def read(self, reader):
         """Read clients settings."""
         self.image_dir = reader.get('clients', 'image_dir')
         self.provisioning_server = reader.get('clients', 'provisioning_server')
         self.distros = [x.strip() for x in reader.get('clients', 'distros', "rhel7").split(",")]
+        self.pool_size = reader.get('clients', 'pool_size', 0, int)
+        self.pool_distros = reader.get('clients', 'pool_distros', self.distros, list)
 
     def validate(self):
         """Validate clients settings."""
@@ -349,6 +477,9 @@ class ClientsSettings(FeatureSettings):
         if self.provisioning_server is None:
             validation_errors.append(
                 '[clients] provisioning_server option must be provided.')
+        if self.pool_size < 0:
+            validation_errors.append(
+                '[clients] pool_size option must not be negative.')
         return validation_errors
 
 
@@ -900,6 +1031,10 @@ class SSHClientSettings(FeatureSettings):
         super(SSHClientSettings, self).__init__(*args, **kwargs)
         self._command_timeout = None
         self._connection_timeout = None
+        self._connection_pool = None
+        self._pool_max_size = None
+        self._pool_max_idle_time = None
+        self._keepalive_interval = None
 
     @property
     def command_timeout(self):
@@ -911,16 +1046,48 @@ class SSHClientSettings(FeatureSettings):
         return self._connection_timeout if (
             self._connection_timeout is not None) else 10
 
+    @property
+    def connection_pool(self):
+        return self._connection_pool if (
+            self._connection_pool is not None) else True
+
+    @property
+    def pool_max_size(self):
+        return self._pool_max_size if (
+            self._pool_max_size is not None) else 4
+
+    @property
+    def pool_max_idle_time(self):
+        return self._pool_max_idle_time if (
+            self._pool_max_idle_time is not None) else 300
+
+    @property
+    def keepalive_interval(self):
+        return self._keepalive_interval if (
+            self._keepalive_interval is not None) else 30
+
     def read(self, reader):
         """Read SSHClient settings."""
         self._command_timeout = reader.get(
             'ssh_client', 'command_timeout', default=300, cast=int)
         self._connection_timeout = reader.get(
             'ssh_client', 'connection_timeout', default=10, cast=int)
+        self._connection_pool = reader.get(
+            'ssh_client', 'connection_pool', default=True, cast=bool)
+        self._pool_max_size = reader.get(
+            'ssh_client', 'pool_max_size', default=4, cast=int)
+        self._pool_max_idle_time = reader.get(
+            'ssh_client', 'pool_max_idle_time', default=300, cast=int)
+        self._keepalive_interval = reader.get(
+            'ssh_client', 'keepalive_interval', default=30, cast=int)
 
     def validate(self):
         """Validate SSHClient settings."""
-        return []
+        validation_errors = []
+        if self.pool_max_size < 0:
+            validation_errors.append(
+                '[ssh_client] pool_max_size must not be negative')
+        return validation_errors
 
 
 class VlanNetworkSettings(FeatureSettings):
@@ -1005,6 +1172,8 @@ class SharedFunctionSettings(FeatureSettings):
         self.redis_db = None
         self.redis_password = None
         self.call_retries = None
+        self.file_encoding = None
+        self.sqlite_path = None
 
     def read(self, reader):
         """Read shared settings."""
@@ -1026,16 +1195,28 @@ class SharedFunctionSettings(FeatureSettings):
             'shared_function', 'redis_password', None)
         self.call_retries = reader.get(
             'shared_function', 'call_retries', 2, int)
+        self.file_encoding = reader.get(
+            'shared_function', 'file_encoding', 'json')
+        self.sqlite_path = reader.get(
+            'shared_function', 'sqlite_path', None)
 
     def validate(self):
         """Validate the shared settings"""
         validation_errors = []
-        supported_storage_handlers = ['file', 'redis']
+        supported_storage_handlers = ['file', 'redis', 'sqlite']
         if self.storage not in supported_storage_handlers:
             validation_errors.append(
                 '[shared] storage must be one of {}'
                 .format(supported_storage_handlers)
             )
+        supported_file_encodings = ['json', 'zlib']
+        if self.file_encoding is None:
+            self.file_encoding = 'json'
+        if self.file_encoding not in supported_file_encodings:
+            validation_errors.append(
+                '[shared] file_encoding must be one of {}'
+                .format(supported_file_encodings)
+            )
         if self.storage == 'redis':
             try:
                 importlib.import_module('redis')
@@ -1053,13 +1234,77 @@ class SharedFunctionSettings(FeatureSettings):
         return validation_errors
 
 
+class _FeatureSection(object):
+    """A feature settings section of :class:`Settings`.
+
+    Once the settings are configured, the section is read and validated when
+    first accessed. Validation errors are kept, and raised on every access.
+    """
+
+    def __init__(self, name, settings_class):
+        self.name = name
+        self.settings_class = settings_class
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._get_section(self.name)
+
+    def __set__(self, instance, value):
+        instance._set_section(self.name, value)
+
+    def __delete__(self, instance):
+        instance._delete_section(self.name)
+
+
 class Settings(object):
-    """Robottelo's settings representation."""
+    """Robottelo's settings representation.
+
+    :meth:`configure` reads the general settings and the ``server`` section,
+    the other feature sections are read and validated when first used. NailGun
+    and AirGun are configured once imported.
+    """
+
+    bugzilla = _FeatureSection('bugzilla', BugzillaSettings)
+    server = _FeatureSection('server', ServerSettings)
+    # Features
+    capsule = _FeatureSection('capsule', CapsuleSettings)
+    certs = _FeatureSection('certs', CertsSettings)
+    cli = _FeatureSection('cli', CLISettings)
+    clients = _FeatureSection('clients', ClientsSettings)
+    compute_resources = _FeatureSection(
+        'compute_resources', LibvirtHostSettings)
+    discovery = _FeatureSection('discovery', DiscoveryISOSettings)
+    distro = _FeatureSection('distro', DistroSettings)
+    docker = _FeatureSection('docker', DockerSettings)
+    ec2 = _FeatureSection('ec2', EC2Settings)
+    fake_capsules = _FeatureSection('fake_capsules', FakeCapsuleSettings)
+    fake_manifest = _FeatureSection('fake_manifest', FakeManifestSettings)
+    ldap = _FeatureSection('ldap', LDAPSettings)
+    ipa = _FeatureSection('ipa', LDAPIPASettings)
+    oscap = _FeatureSection('oscap', OscapSettings)
+    ostree = _FeatureSection('ostree', OstreeSettings)
+    osp = _FeatureSection('osp', OSPSettings)
+    performance = _FeatureSection('performance', PerformanceSettings)
+    rhai = _FeatureSection('rhai', RHAISettings)
+    rhev = _FeatureSection('rhev', RHEVSettings)
+    ssh_client = _FeatureSection('ssh_client', SSHClientSettings)
+    shared_function = _FeatureSection(
+        'shared_function', SharedFunctionSettings)
+    vlan_networking = _FeatureSection('vlan_networking', VlanNetworkSettings)
+    upgrade = _FeatureSection('upgrade', UpgradeSettings)
+    vmware = _FeatureSection('vmware', VmWareSettings)
 
     def __init__(self):
         self._all_features = None
         self._configured = False
         self._validation_errors = []
+        # the feature sections by name, with the names of the ones read and
+        # the validation errors of the invalid ones
+        self._sections = {}
+        self._read_sections = set()
+        self._section_errors = {}
+        self._sections_lock = threading.RLock()
         self.browser = None
         self.cdn = None
         self.locale = None
@@ -1078,7 +1323,6 @@ class Settings(object):
         self.tmp_dir = None
         self.saucelabs_key = None
         self.saucelabs_user = None
-        self.server = ServerSettings()
         self.run_one_datapoint = None
         self.upstream = None
         self.verbosity = None
@@ -1087,32 +1331,6 @@ class Settings(object):
         self.webdriver_desired_capabilities = None
         self.command_executor = None
 
-        self.bugzilla = BugzillaSettings()
-        # Features
-        self.capsule = CapsuleSettings()
-        self.certs = CertsSettings()
-        self.clients = ClientsSettings()
-        self.compute_resources = LibvirtHostSettings()
-        self.discovery = DiscoveryISOSettings()
-        self.distro = DistroSettings()
-        self.docker = DockerSettings()
-        self.ec2 = EC2Settings()
-        self.fake_capsules = FakeCapsuleSettings()
-        self.fake_manifest = FakeManifestSettings()
-        self.ldap = LDAPSettings()
-        self.ipa = LDAPIPASettings()
-        self.oscap = OscapSettings()
-        self.ostree = OstreeSettings()
-        self.osp = OSPSettings()
-        self.performance = PerformanceSettings()
-        self.rhai = RHAISettings()
-        self.rhev = RHEVSettings()
-        self.ssh_client = SSHClientSettings()
-        self.shared_function = SharedFunctionSettings()
-        self.vlan_networking = VlanNetworkSettings()
-        self.upgrade = UpgradeSettings()
-        self.vmware = VmWareSettings()
-
     def configure(self):
         """Read the settings file and parse the configuration.
 
@@ -1134,18 +1352,11 @@ class Settings(object):
         self._validation_errors.extend(
             self._validate_robottelo_settings())
 
-        attrs = map(
-            lambda attr_name: (attr_name, getattr(self, attr_name)),
-            dir(self)
-        )
-        feature_settings = filter(
-            lambda tpl: isinstance(tpl[1], FeatureSettings),
-            attrs
-        )
-        for name, settings in feature_settings:
-            if self.reader.has_section(name) or name == 'server':
-                settings.read(self.reader)
-                self._validation_errors.extend(settings.validate())
+        # the server section is used by most of the tests, read it now to
+        # report its errors along with the general ones
+        self._read_section('server')
+        self._validation_errors.extend(
+            self._section_errors.get('server', []))
 
         if self._validation_errors:
             raise ImproperlyConfigured(
@@ -1155,9 +1366,73 @@ class Settings(object):
 
         self._configure_logging()
         self._configure_third_party_logging()
-        self._configure_entities()
-        self._configure_airgun()
         self._configured = True
+        # any NailGun module may be used first, like nailgun.config by
+        # robottelo.helpers.get_nailgun_config
+        _post_import_hook.register('nailgun', self._configure_entities)
+        _post_import_hook.register('airgun.settings', self._configure_airgun)
+
+    def _read_section(self, name):
+        """Read and validate the feature section ``name`` from the settings
+        file, if not read yet. The server section is always read, the other
+        ones when present in the file.
+        """
+        with self._sections_lock:
+            if name in self._read_sections:
+                return
+            self._read_sections.add(name)
+            if not self.reader.has_section(name) and name != 'server':
+                return
+            section = self._get_section_object(name)
+            section.read(self.reader)
+            errors = section.validate()
+            if errors:
+                self._section_errors[name] = errors
+
+    def _get_section_object(self, name):
+        """Return the feature section ``name``, created if needed, read or
+        not.
+        """
+        with self._sections_lock:
+            section = self._sections.get(name)
+            if section is None:
+                section = self._sections[name] = getattr(
+                    type(self), name).settings_class()
+        return section
+
+    def _get_section(self, name):
+        """Return the feature section ``name``, reading it first when the
+        settings are configured.
+
+        :raises: ImproperlyConfigured if the section is not valid.
+        """
+        with self._sections_lock:
+            section = self._get_section_object(name)
+            if self._configured and name not in self._read_sections:
+                self._read_section(name)
+        if name in self._section_errors:
+            raise ImproperlyConfigured(
+                'Failed to validate the [{0}] configuration, check the '
+                'message(s):\n{1}'.format(
+                    name, '\n'.join(self._section_errors[name]))
+            )
+        return section
+
+    def _set_section(self, name, value):
+        """Replace the feature section ``name``, it is not read anymore"""
+        with self._sections_lock:
+            self._sections[name] = value
+            self._read_sections.add(name)
+            self._section_errors.pop(name, None)
+
+    def _delete_section(self, name):
+        """Drop the feature section ``name``, it is read again when next
+        accessed.
+        """
+        with self._sections_lock:
+            self._sections.pop(name, None)
+            self._read_sections.discard(name)
+            self._section_errors.pop(name, None)
 
     def _read_robottelo_settings(self):
         """Read Robottelo's general settings."""
@@ -1259,8 +1534,8 @@ class Settings(object):
         """List all expected feature settings sections."""
         if self._all_features is None:
             self._all_features = [
-                name for name, value in vars(self).items()
-                if isinstance(value, FeatureSettings)
+                name for name in dir(type(self))
+                if isinstance(getattr(type(self), name), _FeatureSection)
             ]
         return self._all_features
 
@@ -1282,6 +1557,9 @@ class Settings(object):
         if either ``docker.internal_url`` or ``docker.external_url`` is set in
         the configuration file.
         """
+        from nailgun import entities, entity_mixins
+        from nailgun.config import ServerConfig
+
         entity_mixins.CREATE_MISSING = True
         entity_mixins.DEFAULT_SERVER_CONFIG = ServerConfig(
             self.server.get_url(),
@@ -1319,6 +1597,8 @@ class Settings(object):
 
     def _configure_airgun(self):
         """Pass required settings to AirGun"""
+        import airgun.settings
+
         airgun.settings.configure({
             'airgun': {
                 'verbosity': logging.getLevelName(self.verbosity),
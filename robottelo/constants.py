@@ -1,6 +1,10 @@
 # -*- encoding: utf-8 -*-
-"""Defines various constants"""
-from nailgun import entities
+"""Defines various constants
+
+The constants using NailGun entities are built when first used, see
+:mod:`robottelo.lazy`, to not import NailGun with the constants.
+"""
+from robottelo.lazy import lazy_attributes
 
 LOCALES = (
     'ca', 'de', 'en', 'en_GB', 'es', 'fr', 'gl', 'it', 'ja', 'ko',
@@ -90,8 +94,6 @@ HTML_TAGS = [
     'SUP', 'TABLE', 'TBODY', 'TD', 'TEXTAREA', 'TFOOT', 'TH',
     'THEAD', 'TITLE', 'TR', 'TT', 'U', 'UL', 'VAR']
 
-OPERATING_SYSTEMS = entities._OPERATING_SYSTEMS
-
 TEMPLATE_TYPES = [
     'finish',
     'iPXE',
@@ -1694,122 +1696,135 @@ ROLES_LOCKED = [
     'Viewer',
 ]
 
-BOOKMARK_ENTITIES = [
-    {'name': 'ActivationKey', 'controller': 'katello_activation_keys'},
-    {'name': 'Dashboard', 'controller': 'dashboard', 'skip_for_ui': True},
-    {'name': 'Fact', 'controller': 'fact_values', 'skip_for_ui': True},
-    {'name': 'Audit', 'controller': 'audits', 'skip_for_ui': True},
-    {'name': 'Report', 'controller': 'config_reports', 'skip_for_ui': True},
-    {'name': 'Task', 'controller': 'foreman_tasks_tasks', 'skip_for_ui': True},
-    {
-        'name': 'Subscriptions', 'controller': 'katello_subscriptions',
-        'skip_for_ui': True,
-    },
-    {'name': 'Product', 'controller': 'katello_products'},
-    {
-        'name': 'Repository', 'controller': 'katello_repositories',
-        'skip_for_ui': True
-    },
-    {
-        'name': 'ContentCredential', 'controller': 'katello_gpg_keys',
-        'skip_for_ui': ('bugzilla', 1638781)
-    },
-    {'name': 'SyncPlan', 'controller': 'katello_sync_plans'},
-    {'name': 'ContentView', 'controller': 'katello_content_views'},
-    {'name': 'Errata', 'controller': 'katello_errata', 'skip_for_ui': True},
-    {
-        'name': 'Package', 'controller': 'katello_erratum_packages',
-        'skip_for_ui': True
-    },
-    {
-        'name': 'PuppetModule', 'controller': 'katello_puppet_modules',
-        'skip_for_ui': True
-    },
-    {
-        'name': 'ContainerImageTag', 'controller': 'katello_docker_tags',
-        'skip_for_ui': True
-    },
-    {
-        'name': 'Registry', 'controller': 'docker_registries',
-        'skip_for_ui': ('redmine', 13436)
-    },
-    {'name': 'Host', 'controller': 'hosts', 'setup': entities.Host},
-    {
-        'name': 'ContentHost', 'controller': 'hosts',
-        'skip_for_ui': True
-    },
-    {'name': 'HostCollection', 'controller': 'katello_host_collections'},
-    {'name': 'Architecture', 'controller': 'architectures'},
-    {
-        'name': 'HardwareModel', 'controller': 'models',
-        'setup': entities.Model, 'skip_for_ui': True
-    },
-    {
-        'name': 'InstallationMedia', 'controller': 'media',
-        'setup': entities.Media, 'skip_for_ui': True
-    },
-    {'name': 'OperatingSystem', 'controller': 'operatingsystems'},
-    {
-        'name': 'PartitionTable', 'controller': 'ptables',
-        'setup': entities.PartitionTable, 'skip_for_ui': False
-    },
-    {'name': 'ProvisioningTemplate', 'controller': 'provisioning_templates'},
-    {
-        'name': 'HostGroup', 'controller': 'hostgroups',
-        'setup': entities.HostGroup, 'skip_for_ui': True
-    },
-    {
-        'name': 'DiscoveryRule', 'controller': 'discovery_rules',
-        'skip_for_ui': ('bugzilla', 1387569), 'setup': entities.DiscoveryRule
-    },
-    {
-        'name': 'GlobalParameter', 'controller': 'common_parameters',
-        'setup': entities.CommonParameter, 'skip_for_ui': True
-    },
-    {
-        'name': 'ConfigGroup', 'controller': 'config_groups',
-        'setup': entities.ConfigGroup, 'skip_for_ui': True
-    },
-    {
-        'name': 'PuppetEnvironment', 'controller': 'environments',
-        'setup': entities.Environment
-    },
-    {
-        'name': 'PuppetClass', 'controller': 'puppetclasses',
-        'setup': entities.PuppetClass
-    },
-    {
-        'name': 'SmartVariable', 'controller': 'lookup_keys',
-        'setup': entities.SmartVariable, 'skip_for_ui': True
-    },
-    {'name': 'SmartProxy', 'controller': 'smart_proxies', 'skip_for_ui': True},
-    {
-        'name': 'ComputeResource', 'controller': 'compute_resources',
-        'setup': entities.DockerComputeResource
-    },
-    {
-        'name': 'ComputeProfile', 'controller': 'compute_profiles',
-        'setup': entities.ComputeProfile
-    },
-    {
-        'name': 'Subnet', 'controller': 'subnets',
-        'setup': entities.Subnet
-    },
-    {'name': 'Domain', 'controller': 'domains', 'setup': entities.Domain},
-    {
-        'name': 'Realm', 'controller': 'realms', 'setup': entities.Realm,
-        'skip_for_ui': True
-    },
-    {'name': 'Location', 'controller': 'locations'},
-    {'name': 'Organization', 'controller': 'organizations'},
-    {'name': 'User', 'controller': 'users'},
-    {
-        'name': 'UserGroup', 'controller': 'usergroups',
-        'setup': entities.UserGroup
-    },
-    {'name': 'Role', 'controller': 'roles'},
-    {'name': 'Settings', 'controller': 'settings', 'skip_for_ui': True},
-]
+
+def _get_operating_systems():
+    """Return the operating system families known by NailGun"""
+    from nailgun import entities
+    return entities._OPERATING_SYSTEMS
+
+
+def _get_bookmark_entities():
+    """Return the entities supporting bookmarks, with the NailGun entity
+    classes to create for setting them up
+    """
+    from nailgun import entities
+    return [
+        {'name': 'ActivationKey', 'controller': 'katello_activation_keys'},
+        {'name': 'Dashboard', 'controller': 'dashboard', 'skip_for_ui': True},
+        {'name': 'Fact', 'controller': 'fact_values', 'skip_for_ui': True},
+        {'name': 'Audit', 'controller': 'audits', 'skip_for_ui': True},
+        {'name': 'Report', 'controller': 'config_reports', 'skip_for_ui': True},
+        {'name': 'Task', 'controller': 'foreman_tasks_tasks', 'skip_for_ui': True},
+        {
+            'name': 'Subscriptions', 'controller': 'katello_subscriptions',
+            'skip_for_ui': True,
+        },
+        {'name': 'Product', 'controller': 'katello_products'},
+        {
+            'name': 'Repository', 'controller': 'katello_repositories',
+            'skip_for_ui': True
+        },
+        {
+            'name': 'ContentCredential', 'controller': 'katello_gpg_keys',
+            'skip_for_ui': ('bugzilla', 1638781)
+        },
+        {'name': 'SyncPlan', 'controller': 'katello_sync_plans'},
+        {'name': 'ContentView', 'controller': 'katello_content_views'},
+        {'name': 'Errata', 'controller': 'katello_errata', 'skip_for_ui': True},
+        {
+            'name': 'Package', 'controller': 'katello_erratum_packages',
+            'skip_for_ui': True
+        },
+        {
+            'name': 'PuppetModule', 'controller': 'katello_puppet_modules',
+            'skip_for_ui': True
+        },
+        {
+            'name': 'ContainerImageTag', 'controller': 'katello_docker_tags',
+            'skip_for_ui': True
+        },
+        {
+            'name': 'Registry', 'controller': 'docker_registries',
+            'skip_for_ui': ('redmine', 13436)
+        },
+        {'name': 'Host', 'controller': 'hosts', 'setup': entities.Host},
+        {
+            'name': 'ContentHost', 'controller': 'hosts',
+            'skip_for_ui': True
+        },
+        {'name': 'HostCollection', 'controller': 'katello_host_collections'},
+        {'name': 'Architecture', 'controller': 'architectures'},
+        {
+            'name': 'HardwareModel', 'controller': 'models',
+            'setup': entities.Model, 'skip_for_ui': True
+        },
+        {
+            'name': 'InstallationMedia', 'controller': 'media',
+            'setup': entities.Media, 'skip_for_ui': True
+        },
+        {'name': 'OperatingSystem', 'controller': 'operatingsystems'},
+        {
+            'name': 'PartitionTable', 'controller': 'ptables',
+            'setup': entities.PartitionTable, 'skip_for_ui': False
+        },
+        {'name': 'ProvisioningTemplate', 'controller': 'provisioning_templates'},
+        {
+            'name': 'HostGroup', 'controller': 'hostgroups',
+            'setup': entities.HostGroup, 'skip_for_ui': True
+        },
+        {
+            'name': 'DiscoveryRule', 'controller': 'discovery_rules',
+            'skip_for_ui': ('bugzilla', 1387569), 'setup': entities.DiscoveryRule
+        },
+        {
+            'name': 'GlobalParameter', 'controller': 'common_parameters',
+            'setup': entities.CommonParameter, 'skip_for_ui': True
+        },
+        {
+            'name': 'ConfigGroup', 'controller': 'config_groups',
+            'setup': entities.ConfigGroup, 'skip_for_ui': True
+        },
+        {
+            'name': 'PuppetEnvironment', 'controller': 'environments',
+            'setup': entities.Environment
+        },
+        {
+            'name': 'PuppetClass', 'controller': 'puppetclasses',
+            'setup': entities.PuppetClass
+        },
+        {
+            'name': 'SmartVariable', 'controller': 'lookup_keys',
+            'setup': entities.SmartVariable, 'skip_for_ui': True
+        },
+        {'name': 'SmartProxy', 'controller': 'smart_proxies', 'skip_for_ui': True},
+        {
+            'name': 'ComputeResource', 'controller': 'compute_resources',
+            'setup': entities.DockerComputeResource
+        },
+        {
+            'name': 'ComputeProfile', 'controller': 'compute_profiles',
+            'setup': entities.ComputeProfile
+        },
+        {
+            'name': 'Subnet', 'controller': 'subnets',
+            'setup': entities.Subnet
+        },
+        {'name': 'Domain', 'controller': 'domains', 'setup': entities.Domain},
+        {
+            'name': 'Realm', 'controller': 'realms', 'setup': entities.Realm,
+            'skip_for_ui': True
+        },
+        {'name': 'Location', 'controller': 'locations'},
+        {'name': 'Organization', 'controller': 'organizations'},
+        {'name': 'User', 'controller': 'users'},
+        {
+            'name': 'UserGroup', 'controller': 'usergroups',
+            'setup': entities.UserGroup
+        },
+        {'name': 'Role', 'controller': 'roles'},
+        {'name': 'Settings', 'controller': 'settings', 'skip_for_ui': True},
+    ]
+
 
 STRING_TYPES = [
     u'alpha', u'numeric', u'alphanumeric',
@@ -2399,3 +2414,10 @@ FOREMAN_TEMPLATE_IMPORT_URL = (
 FOREMAN_TEMPLATE_TEST_TEMPLATE = (
     'https://raw.githubusercontent.com/SatelliteQE/foreman_templates/example/'
     'example_template.erb')
+
+
+__getattr__ = lazy_attributes(
+    __name__,
+    BOOKMARK_ENTITIES=_get_bookmark_entities,
+    OPERATING_SYSTEMS=_get_operating_systems,
+)
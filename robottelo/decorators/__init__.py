@@ -1,10 +1,17 @@
 # -*- encoding: utf-8 -*-
 """Implements various decorators"""
+import hashlib
+import importlib
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from functools import partial, wraps
 
 import os
 import pytest
+import sys
 import unittest2
 from robozilla.decorators import (  # noqa
     bz_bug_is_open, rm_bug_is_open,  # noqa
@@ -19,7 +26,15 @@ from robottelo.constants import NOT_IMPLEMENTED
 from robottelo.host_info import get_host_sat_version
 
 LOGGER = logging.getLogger(__name__)
-OBJECT_CACHE = {}
+
+# Defaults of the cacheable decorator: the maximum number of cached objects,
+# the least recently used ones are dropped first, the number of seconds an
+# object is kept (None to keep it until the end of the session) and the scope
+# of the cached objects, 'worker' or 'shared' between all the xdist workers
+CACHE_MAX_ENTRIES = 256
+CACHE_TIMEOUT = None
+CACHE_SCOPE = 'worker'
+CACHE_SCOPES = ('worker', 'shared')
 
 # Test Tier Decorators
 # CRUD tests
@@ -43,6 +58,31 @@ parametrize = pytest.mark.parametrize
 fixture = pytest.fixture
 
 
+def get_caller_class_name(depth=2, stack_level=1):
+    """Return the dotted names of the classes, or functions, in which the
+    caller of the function calling this one is running, like
+    ``'OuterClass.InnerClass'`` for a decorator applied in a class body.
+
+    Only the frame objects are walked, no source is read, so this is cheap
+    enough to run at decoration time.
+
+    :param int depth: The maximum number of names returned, the innermost
+        ones are kept.
+    :param int stack_level: The number of frames between the function calling
+        this one and the frame of the innermost name.
+    """
+    frame = sys._getframe(stack_level + 1)
+    names = []
+    while frame is not None and len(names) < depth:
+        name = frame.f_code.co_name
+        if name == '<module>':
+            break
+        names.append(name)
+        frame = frame.f_back
+    names.reverse()
+    return '.'.join(names)
+
+
 def setting_is_set(option):
     """Return either ``True`` or ``False`` if a Robottelo section setting is
     set or not respectively.
@@ -175,24 +215,173 @@ def stubbed(reason=None):
     return wrapper
 
 
-def cacheable(func):
-    """Decorator that makes an optional object cache available"""
+class ObjectCache(OrderedDict):
+    """Thread safe LRU cache of the objects created by the ``cacheable``
+    factories, mapping the object keys to the objects.
 
-    @wraps(func)
-    def cacheable_function(options=None, cached=False):
+    Besides the ``max_entries`` bound, each object can have its own timeout.
+    Hits, misses, expired and evicted objects are counted by factory name,
+    see :meth:`stats`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.max_entries = kwargs.pop('max_entries', CACHE_MAX_ENTRIES)
+        self._expires = {}
+        self._stats = {}
+        self._lock = threading.RLock()
+        super(ObjectCache, self).__init__(*args, **kwargs)
+
+    def _count(self, object_key, stat):
+        """Increase a stat of the factory of ``object_key``."""
+        stats = self._stats.setdefault(object_key.split('.')[0], {
+            'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0})
+        stats[stat] += 1
+
+    def lookup(self, object_key):
+        """Return a ``(found, object)`` tuple for ``object_key``."""
+        with self._lock:
+            if object_key in self:
+                expires = self._expires.get(object_key)
+                if expires is not None and expires <= time.time():
+                    del self[object_key]
+                    self._count(object_key, 'expired')
+                else:
+                    # move it to the end, as the most recently used
+                    value = self.pop(object_key)
+                    self[object_key] = value
+                    if expires is not None:
+                        self._expires[object_key] = expires
+                    self._count(object_key, 'hits')
+                    return True, value
+            self._count(object_key, 'misses')
+            return False, None
+
+    def store(self, object_key, value, timeout=None):
+        """Cache ``value`` for ``timeout`` seconds, or until evicted when
+        ``timeout`` is ``None``.
         """
-        This is the function being returned.
-        Requires input function's name start with 'make_'
+        with self._lock:
+            self.pop(object_key, None)
+            self._expires.pop(object_key, None)
+            self[object_key] = value
+            if timeout is not None:
+                self._expires[object_key] = time.time() + timeout
+            while self.max_entries and len(self) > self.max_entries:
+                evicted_key = next(iter(self))
+                del self[evicted_key]
+                self._count(evicted_key, 'evicted')
+
+    def __delitem__(self, object_key):
+        super(ObjectCache, self).__delitem__(object_key)
+        self._expires.pop(object_key, None)
+
+    def stats(self):
+        """Return the hits, misses, expired and evicted objects by factory
+        name.
         """
-        object_key = func.__name__.replace('make_', '')
-        if cached is True and object_key in OBJECT_CACHE:
-            return OBJECT_CACHE[object_key]
-        new_object = func(options)
-        if cached is True:
-            OBJECT_CACHE[object_key] = new_object
-        return new_object
-
-    return cacheable_function
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def reset_stats(self):
+        """Reset all the stats to zero."""
+        with self._lock:
+            self._stats = {}
+
+
+OBJECT_CACHE = ObjectCache()
+
+
+def _get_object_key(func, options=None):
+    """Return the cache key of the object created by the factory ``func``
+    with ``options``: the factory name without the ``make_`` prefix, followed
+    by a digest of the options when there are some.
+
+    Options set to ``None`` are ignored, as factories do not pass them.
+    """
+    object_key = func.__name__.replace('make_', '')
+    options = {
+        key: value for key, value in (options or {}).items()
+        if value is not None
+    }
+    if options:
+        text = json.dumps(options, sort_keys=True, default=str)
+        object_key = '{0}.{1}'.format(
+            object_key, hashlib.md5(text.encode('utf-8')).hexdigest())
+    return object_key
+
+
+def _create_shared_object(object_key, func, options, timeout=None):
+    """Create the object in only one of the xdist workers, the other ones
+    wait for it and get it from the storage of the shared functions.
+
+    The object is created right away when the shared functions are disabled.
+    """
+    # imported here as func_shared depends on this module, the module is
+    # shadowed by the shared decorator in the func_shared package
+    shared = importlib.import_module(
+        'robottelo.decorators.func_shared.shared')
+    return shared.call_shared(
+        object_key, func, args=(options,), timeout=timeout,
+        scope_context='cacheable')
+
+
+def cacheable(func=None, timeout=None, scope=None):
+    """Decorator that makes an optional object cache available.
+
+    The decorated factory accepts a ``cached`` argument, when ``True`` the
+    object created by the factory is cached, and returned by the next cached
+    calls with the same options instead of creating a new one::
+
+        @cacheable
+        def make_org(options=None):
+            ...
+
+        org = make_org({'name': 'foo'}, cached=True)
+        assert make_org({'name': 'foo'}, cached=True) is org
+
+        @cacheable(timeout=3600, scope='shared')
+        def make_content_view(options=None):
+            ...
+
+    :param int timeout: The number of seconds the objects are cached,
+        defaults to ``CACHE_TIMEOUT``.
+    :param str scope: ``worker`` to cache the objects in each xdist worker or
+        ``shared`` to create the objects only once for all the xdist workers
+        of the session, through the storage of the shared functions, see
+        :mod:`robottelo.decorators.func_shared.shared`. Defaults to
+        ``CACHE_SCOPE``. Shared objects must be json compatible.
+    """
+    if scope is not None and scope not in CACHE_SCOPES:
+        raise ValueError('scope should be one of {0}'.format(
+            ', '.join(CACHE_SCOPES)))
+
+    def decorator(func):
+        @wraps(func)
+        def cacheable_function(options=None, cached=False):
+            """
+            This is the function being returned.
+            Requires input function's name start with 'make_'
+            """
+            if cached is not True:
+                return func(options)
+            object_key = _get_object_key(func, options)
+            found, new_object = OBJECT_CACHE.lookup(object_key)
+            if found:
+                return new_object
+            object_timeout = CACHE_TIMEOUT if timeout is None else timeout
+            if (scope or CACHE_SCOPE) == 'shared':
+                new_object = _create_shared_object(
+                    object_key, func, options, object_timeout)
+            else:
+                new_object = func(options)
+            OBJECT_CACHE.store(object_key, new_object, object_timeout)
+            return new_object
+
+        return cacheable_function
+
+    if func is not None:
+        return decorator(func)
+    return decorator
 
 
 class ProjectModeError(Exception):
@@ -1,5 +1,5 @@
 # -*- encoding: utf-8 -*-
-"""Implements test function locking, using pytest_services file locking
+"""Implements test function locking, using ``fcntl.flock`` file locking
 
 Usage::
 
@@ -39,18 +39,40 @@ Usage::
        def test_that_conflict_with_test_to_lock(self)
             with locking_function(self.test_to_lock):
                 # do some operations that conflict with test_to_lock
+
+
+    # some functions only need to be isolated from the functions changing
+    # what they read, or can run in a limited number of workers at once
+    class SomeTestCase(TestCase):
+
+        @lock_function(scope_context='subscriptions', mode='shared')
+        def test_read_subscriptions(self):
+            # runs along with the other shared holders
+            pass
+
+        @lock_function(scope_context='subscriptions')
+        def test_change_subscriptions(self):
+            # waits for the shared holders, which wait for it
+            pass
+
+        @lock_function(max_holders=2)
+        def test_heavy_sync(self):
+            # at most 2 workers run it at once
+            pass
 """
+import errno
+import fcntl
 import functools
-import inspect
 import logging
 import os
 import tempfile
+import threading
+import time
 
 from contextlib import contextmanager
 
-from pytest_services.locks import file_lock
-
 from robottelo.config import settings
+from robottelo.decorators import get_caller_class_name
 
 logger = logging.getLogger(__name__)
 
@@ -60,9 +82,30 @@ LOCK_DIR = None
 LOCK_DEFAULT_TIMEOUT = 1800  # 30 minutes
 LOCK_FILE_NAME_EXT = 'lock'
 LOCK_DEFAULT_SCOPE = None
+# how often a waiting process checks whether the lock holder is still running
+LOCK_STALE_CHECK_INTERVAL = 30
+# the bounds of the interval between the polls of the slots of the locks
+# allowing several holders
+LOCK_POLL_MIN_INTERVAL = 0.05
+LOCK_POLL_MAX_INTERVAL = 1
+
+LOCK_MODE_EXCLUSIVE = 'exclusive'
+LOCK_MODE_SHARED = 'shared'
+_LOCK_OPERATIONS = {
+    LOCK_MODE_EXCLUSIVE: fcntl.LOCK_EX,
+    LOCK_MODE_SHARED: fcntl.LOCK_SH,
+}
 
 _DEFAULT_CLASS_NAME_DEPTH = 3
 
+# the lock file paths locked by this process, with the locking thread ident
+_held_locks = {}
+_held_locks_lock = threading.Lock()
+
+# the contention statistics of this process by locked function name
+_lock_stats = {}
+_lock_stats_lock = threading.Lock()
+
 
 class FunctionLockerError(Exception):
     """the default function locker error"""
@@ -166,25 +209,43 @@ def _get_function_name_lock_path(function_name, scope=None, scope_kwargs=None,
     )
 
 
-def _check_deadlock(lock_file_path, process_id):
-    """To prevent process deadlock, raise exception if the file content is the
-    same as process_id
+def _get_slot_paths(lock_file_path, max_holders):
+    """Return the paths of the slot files of a lock allowing max_holders"""
+    return ['{0}.{1}'.format(lock_file_path, index)
+            for index in range(max_holders)]
+
+
+def _check_lock_mode(mode, max_holders):
+    """Raise exception if mode and max_holders are not a valid lock mode
+
+    :type mode: str
+    :type max_holders: int
+    """
+    if mode not in _LOCK_OPERATIONS:
+        raise FunctionLockerError(
+            'unknown lock mode {0}, expected one of: {1}'.format(
+                mode, ', '.join(sorted(_LOCK_OPERATIONS))))
+    if max_holders is None:
+        return
+    if not isinstance(max_holders, int) or max_holders < 1:
+        raise FunctionLockerError(
+            'max_holders must be a positive integer, got {0}'.format(
+                max_holders))
+    if max_holders > 1 and mode != LOCK_MODE_EXCLUSIVE:
+        raise FunctionLockerError(
+            'max_holders can not be combined with the {0} mode'.format(mode))
+
+
+def _check_deadlock(lock_file_path):
+    """To prevent process deadlock, raise exception if the lock file is
+    already locked by the current thread
 
     note: this function is called before the lock
 
     :type lock_file_path: str
-    :type process_id: str
     """
-    if os.path.exists(lock_file_path):
-        try:
-            lock_file_handler = open(lock_file_path, 'r')
-            lock_file_content = lock_file_handler.read()
-        except (OSError, IOError) as exp:
-            # do nothing, but anyway log the exception
-            logger.exception(exp)
-            lock_file_content = None
-
-        if lock_file_content and lock_file_content == process_id:
+    with _held_locks_lock:
+        if _held_locks.get(lock_file_path) == threading.current_thread().ident:
             raise FunctionLockerError(
                 'recursion detected: the function file already '
                 'locked by the same process'
@@ -200,8 +261,298 @@ def _write_content(handler, content):
     handler.flush()
 
 
+def _is_process_running(pid):
+    """Return whether the process ``pid`` is running on this host"""
+    try:
+        os.kill(pid, 0)
+    except OSError as err:
+        # running, but owned by another user
+        return err.errno == errno.EPERM
+    return True
+
+
+def _is_current_file(handler, lock_file_path):
+    """Return whether ``handler`` is still the file at ``lock_file_path``, it
+    may have been replaced when reclaimed from a stale holder
+    """
+    try:
+        path_stat = os.stat(lock_file_path)
+    except OSError:
+        return False
+    file_stat = os.fstat(handler.fileno())
+    return (path_stat.st_ino, path_stat.st_dev) == (
+        file_stat.st_ino, file_stat.st_dev)
+
+
+def _get_holder(handler):
+    """Return the process id written in the lock file and since when it
+    holds the lock, the file being written when the lock is acquired
+    """
+    handler.seek(0)
+    content = handler.read().strip()
+    pid = int(content) if content.isdigit() else None
+    return pid, os.fstat(handler.fileno()).st_mtime
+
+
+def _reclaim_stale_lock(handler, lock_file_path):
+    """Remove the lock file if the process which locked it is not running
+    anymore, the lock being still held by processes it forked. Return whether
+    it was removed.
+    """
+    pid, _ = _get_holder(handler)
+    if pid is None or _is_process_running(pid):
+        return False
+    if not _is_current_file(handler, lock_file_path):
+        return True
+    logger.warning('reclaiming lock file {0} of process {1}'.format(
+        lock_file_path, pid))
+    try:
+        os.unlink(lock_file_path)
+    except OSError:
+        pass
+    return True
+
+
+def _open_lock_file(lock_file_path):
+    """Open the lock file, creating it if needed"""
+    return os.fdopen(
+        os.open(lock_file_path, os.O_RDWR | os.O_CREAT, 0o666), 'r+')
+
+
+def _try_lock(handler, operation):
+    """Lock the opened lock file without waiting, return whether it was
+    locked
+    """
+    try:
+        fcntl.flock(handler.fileno(), operation | fcntl.LOCK_NB)
+    except (IOError, OSError) as err:
+        if err.errno not in (errno.EAGAIN, errno.EACCES):
+            raise
+        return False
+    return True
+
+
+def _wait_lock_file(handler, lock_file_path, deadline,
+                    operation=fcntl.LOCK_EX):
+    """Wait for the lock in the kernel, in a thread, until the deadline.
+
+    :return: ``True`` once locked, ``False`` if the lock file was reclaimed
+        from a stale holder, the handler is then closed by the waiting thread.
+    :raises FunctionLockerError: at the deadline.
+    """
+    acquired = threading.Event()
+    state_lock = threading.Lock()
+    state = {'cancelled': False}
+
+    def wait():
+        try:
+            fcntl.flock(handler.fileno(), operation)
+        except (IOError, OSError) as exp:
+            logger.exception(exp)
+            return
+        with state_lock:
+            if not state['cancelled']:
+                acquired.set()
+                return
+        # nobody is waiting anymore
+        handler.close()
+
+    waiter = threading.Thread(
+        target=wait, name='wait lock {0}'.format(lock_file_path))
+    waiter.daemon = True
+    waiter.start()
+    while True:
+        remaining = deadline - time.time()
+        if acquired.wait(max(0, min(remaining, LOCK_STALE_CHECK_INTERVAL))):
+            return True
+        reclaimed = _reclaim_stale_lock(handler, lock_file_path)
+        if not reclaimed and time.time() < deadline:
+            continue
+        with state_lock:
+            if acquired.is_set():
+                return True
+            state['cancelled'] = True
+        if reclaimed:
+            return False
+        pid, since = _get_holder(handler)
+        raise FunctionLockerError(
+            'Not able to acquire lock file {0} in time, locked by process '
+            '{1} for {2:.0f} seconds'.format(
+                lock_file_path, pid, time.time() - since)
+        )
+
+
+def _acquire_lock_file(lock_file_path, timeout, operation=fcntl.LOCK_EX):
+    """Open and lock the lock file, exclusively by default.
+
+    :return: a tuple of the opened lock file and whether another process
+        was holding the lock.
+    """
+    deadline = time.time() + timeout
+    contended = False
+    while True:
+        handler = _open_lock_file(lock_file_path)
+        try:
+            locked = _try_lock(handler, operation)
+        except (IOError, OSError):
+            handler.close()
+            raise
+        if not locked:
+            contended = True
+            if not _wait_lock_file(
+                    handler, lock_file_path, deadline, operation):
+                continue
+        if _is_current_file(handler, lock_file_path):
+            return handler, contended
+        # locked a reclaimed lock file, lock the new one
+        handler.close()
+
+
+def _acquire_lock_slot(lock_file_path, max_holders, timeout):
+    """Open and exclusively lock one of the max_holders slot files of the
+    lock file, polling them until one is free.
+
+    :return: a tuple of the opened slot file and whether max_holders other
+        holders were holding the slots.
+    """
+    slot_paths = _get_slot_paths(lock_file_path, max_holders)
+    # each process starts from a different slot, to not all poll the same
+    first = os.getpid() % max_holders
+    slot_paths = slot_paths[first:] + slot_paths[:first]
+    deadline = time.time() + timeout
+    next_stale_check = time.time() + LOCK_STALE_CHECK_INTERVAL
+    interval = LOCK_POLL_MIN_INTERVAL
+    contended = False
+    while True:
+        check_stale = time.time() >= next_stale_check
+        for slot_path in slot_paths:
+            handler = _open_lock_file(slot_path)
+            try:
+                if _try_lock(handler, fcntl.LOCK_EX):
+                    if _is_current_file(handler, slot_path):
+                        return handler, contended
+                elif check_stale:
+                    _reclaim_stale_lock(handler, slot_path)
+            except (IOError, OSError):
+                handler.close()
+                raise
+            handler.close()
+        if check_stale:
+            next_stale_check = time.time() + LOCK_STALE_CHECK_INTERVAL
+        contended = True
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise FunctionLockerError(
+                'Not able to acquire one of the {0} slots of lock file {1} in '
+                'time'.format(max_holders, lock_file_path)
+            )
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, LOCK_POLL_MAX_INTERVAL)
+
+
+def _record_lock_stats(function_name, wait_time, hold_time=None,
+                       contended=False):
+    """Add a lock acquisition to the stats of function_name, without hold
+    time when it timed out
+    """
+    with _lock_stats_lock:
+        stats = _lock_stats.setdefault(function_name, {
+            'count': 0, 'waiters': 0, 'timeouts': 0, 'wait_time': 0,
+            'max_wait_time': 0, 'hold_time': 0, 'max_hold_time': 0,
+        })
+        stats['count'] += 1
+        stats['waiters'] += int(contended)
+        stats['wait_time'] += wait_time
+        stats['max_wait_time'] = max(stats['max_wait_time'], wait_time)
+        if hold_time is None:
+            stats['timeouts'] += 1
+        else:
+            stats['hold_time'] += hold_time
+            stats['max_hold_time'] = max(stats['max_hold_time'], hold_time)
+
+
+def get_lock_stats():
+    """Return the contention statistics of the functions locked by this
+    process, by function name: the number of acquisitions, how many waited
+    for another process and timed out, and the total and maximum wait and
+    hold times in seconds.
+    """
+    with _lock_stats_lock:
+        return {name: dict(stats) for name, stats in _lock_stats.items()}
+
+
+def reset_lock_stats():
+    """Reset the contention statistics"""
+    with _lock_stats_lock:
+        _lock_stats.clear()
+
+
+def format_lock_stats():
+    """Return the contention statistics as text lines, the functions which
+    waited the most first
+    """
+    stats = get_lock_stats()
+    lines = []
+    for name in sorted(
+            stats, key=lambda name: stats[name]['wait_time'], reverse=True):
+        lines.append(
+            '{0}: {count} locks, {waiters} waited, {timeouts} timed out, '
+            'wait {wait_time:.1f}s (max {max_wait_time:.1f}s), '
+            'hold {hold_time:.1f}s (max {max_hold_time:.1f}s)'.format(
+                name, **stats[name])
+        )
+    return lines
+
+
+@contextmanager
+def _lock_file(function_name, lock_file_path, timeout,
+               mode=LOCK_MODE_EXCLUSIVE, max_holders=None):
+    """Lock the lock file of function_name, or one of its slot files when
+    allowing more than one holder.
+
+    Exclusive holders write their process id into the locked file while
+    locked, shared holders leave it empty.
+    """
+    # to prevent dead lock when recursively calling this function
+    # check if the same thread is trying to acquire the lock
+    _check_deadlock(lock_file_path)
+    exclusive = mode == LOCK_MODE_EXCLUSIVE
+    start = time.time()
+    try:
+        if max_holders and max_holders > 1:
+            handler, contended = _acquire_lock_slot(
+                lock_file_path, max_holders, timeout)
+        else:
+            handler, contended = _acquire_lock_file(
+                lock_file_path, timeout, _LOCK_OPERATIONS[mode])
+    except FunctionLockerError:
+        _record_lock_stats(function_name, time.time() - start, contended=True)
+        raise
+    acquired = time.time()
+    with _held_locks_lock:
+        _held_locks[lock_file_path] = threading.current_thread().ident
+    try:
+        if exclusive:
+            # write the process id that locked this function
+            _write_content(handler, str(os.getpid()))
+        yield handler
+    finally:
+        with _held_locks_lock:
+            _held_locks.pop(lock_file_path, None)
+        try:
+            if exclusive:
+                # clear the file
+                _write_content(handler, None)
+        finally:
+            fcntl.flock(handler.fileno(), fcntl.LOCK_UN)
+            handler.close()
+            _record_lock_stats(function_name, acquired - start,
+                               time.time() - acquired, contended)
+
+
 def lock_function(function=None, scope=_get_default_scope, scope_context=None,
-                  scope_kwargs=None, timeout=LOCK_DEFAULT_TIMEOUT):
+                  scope_kwargs=None, timeout=LOCK_DEFAULT_TIMEOUT,
+                  mode=LOCK_MODE_EXCLUSIVE, max_holders=None):
     """Generic function locker, lock any decorated function. Any parallel
      pytest xdist worker will wait for this function to finish
 
@@ -210,6 +561,8 @@ def lock_function(function=None, scope=_get_default_scope, scope_context=None,
     :type scope_kwargs: dict
     :type scope_context: str
     :type timeout: int
+    :type mode: str
+    :type max_holders: int
 
     :param function: the function that is intended to be locked
     :param scope: this parameter will define the namespace of locking
@@ -217,23 +570,21 @@ def lock_function(function=None, scope=_get_default_scope, scope_context=None,
            lock in combination with scope and function.
     :param scope_kwargs: kwargs to be passed to scope if is a callable
     :param timeout: the time in seconds to wait for acquiring the lock
+    :param mode: ``'exclusive'`` to run alone, or ``'shared'`` to run along
+           with the other shared holders of the same lock, while no
+           exclusive holder runs.
+    :param max_holders: the number of workers allowed to run the function at
+           once, exclusive mode only.
     """
-    class_names = []
-    class_name = None
-    index = 1
-    while class_name != '<module>' and index <= _DEFAULT_CLASS_NAME_DEPTH:
-        if class_name:
-            class_names.append(class_name)
-        class_name = inspect.getouterframes(inspect.currentframe())[index][3]
-        index += 1
-
-    class_names.reverse()
-    class_name = '.'.join(class_names)
+    _check_lock_mode(mode, max_holders)
+    class_name = get_caller_class_name(depth=_DEFAULT_CLASS_NAME_DEPTH - 1)
 
     def main_wrapper(func):
 
         setattr(func, '__class_name__', class_name)
         setattr(func, '__function_locked__', True)
+        setattr(func, '__lock_mode__', mode)
+        setattr(func, '__lock_max_holders__', max_holders)
 
         @functools.wraps(func)
         def function_wrapper(*args, **kwargs):
@@ -244,27 +595,14 @@ def lock_function(function=None, scope=_get_default_scope, scope_context=None,
                 scope_kwargs=scope_kwargs,
                 scope_context=scope_context
                 )
-            process_id = str(os.getpid())
-            # to prevent dead lock when recursively calling this function
-            # check if the same process is trying to acquire the lock
-            _check_deadlock(lock_file_path, process_id)
-
-            with file_lock(lock_file_path, remove=False,
-                           timeout=timeout) as handler:
+            with _lock_file(function_name, lock_file_path, timeout,
+                            mode=mode, max_holders=max_holders):
                 logger.info(
-                    'process id: {0} lock function using file path: {1}'
-                    .format(process_id, lock_file_path)
+                    'process id: {0} lock function in {1} mode using file '
+                    'path: {2}'.format(os.getpid(), mode, lock_file_path)
                 )
-                # write the process id that locked this function
-                _write_content(handler, process_id)
                 # call the locked function
-                try:
-                    res = func(*args, **kwargs)
-                finally:
-                    # clear the file
-                    _write_content(handler, None)
-
-            return res
+                return func(*args, **kwargs)
 
         return function_wrapper
 
@@ -279,7 +617,8 @@ def lock_function(function=None, scope=_get_default_scope, scope_context=None,
 
 @contextmanager
 def locking_function(function, scope=_get_default_scope, scope_context=None,
-                     scope_kwargs=None, timeout=LOCK_DEFAULT_TIMEOUT):
+                     scope_kwargs=None, timeout=LOCK_DEFAULT_TIMEOUT,
+                     mode=None, max_holders=None):
     """Lock a function in combination with a scope and scope_context.
     Any parallel pytest xdist worker will wait for this function to finish.
 
@@ -288,6 +627,8 @@ def locking_function(function, scope=_get_default_scope, scope_context=None,
     :type scope_kwargs: dict
     :type scope_context: str
     :type timeout: int
+    :type mode: str
+    :type max_holders: int
 
     :param function: the function that is intended to be locked
     :param scope: this parameter will define the namespace of locking
@@ -295,10 +636,23 @@ def locking_function(function, scope=_get_default_scope, scope_context=None,
            lock in combination with scope and function.
     :param scope_kwargs: kwargs to be passed to scope if is a callable
     :param timeout: the time in seconds to wait for acquiring the lock
+    :param mode: the lock mode, see :func:`lock_function`
+    :param max_holders: the number of holders allowed at once, see
+           :func:`lock_function`. When not given, the one the function is
+           locked with is used, so only the exclusive mode can be requested
+           for a function locked with max_holders.
     """
     if not getattr(function, '__function_locked__', False):
         raise FunctionLockerError(
             'Cannot ensure locking when using a non locked function')
+    if mode is None:
+        if max_holders is None:
+            mode = getattr(function, '__lock_mode__', LOCK_MODE_EXCLUSIVE)
+        else:
+            mode = LOCK_MODE_EXCLUSIVE
+    if max_holders is None:
+        max_holders = getattr(function, '__lock_max_holders__', None)
+    _check_lock_mode(mode, max_holders)
     class_name = getattr(function, '__class_name__', None)
     function_name = _get_function_name(function, class_name=class_name)
     lock_file_path = _get_function_name_lock_path(
@@ -307,21 +661,11 @@ def locking_function(function, scope=_get_default_scope, scope_context=None,
         scope_kwargs=scope_kwargs,
         scope_context=scope_context
     )
-    process_id = str(os.getpid())
-    # to prevent dead lock when recursively calling this function
-    # check if the same process is trying to acquire the lock
-    _check_deadlock(lock_file_path, process_id)
-
-    with file_lock(lock_file_path, remove=False, timeout=timeout) as handler:
+    with _lock_file(function_name, lock_file_path, timeout, mode=mode,
+                    max_holders=max_holders) as handler:
         logger.info(
-            'process id: {0} - lock function name:{1}  - using file path: {2}'
-            .format(process_id, function_name, lock_file_path)
+            'process id: {0} - lock function name:{1} - {2} mode - using file '
+            'path: {3}'.format(os.getpid(), function_name, mode, lock_file_path)
         )
-        # write the process id that locked this function
-        _write_content(handler, process_id)
         # let the locked code run
-        try:
-            yield handler
-        finally:
-            # clear the file
-            _write_content(handler, None)
+        yield handler
@@ -27,3 +27,7 @@ class BaseStorageHandler(object):
     def set(self, key, value):
         """Write the value of key to storage"""
         raise NotImplementedError
+
+    def delete(self, key):
+        """Remove the value of key from storage"""
+        raise NotImplementedError
@@ -1,7 +1,10 @@
 # -*- encoding: utf-8 -*-
+import json
 import logging
 import os
 import tempfile
+import threading
+import zlib
 
 from pytest_services.locks import file_lock
 
@@ -16,6 +19,40 @@ logger = logging.getLogger(__name__)
 
 LOCK_TIMEOUT = 7200
 
+# The encoding of the written values: 'json' text or 'zlib' compressed json,
+# more compact for large values. Values of both encodings can be read.
+ENCODING = 'json'
+ENCODINGS = ('json', 'zlib')
+_ZLIB_MAGIC = b'RZ1'
+
+# The json text of the values read by this process, by key file path, along
+# with the file signature they were read from
+_read_cache = {}
+_read_cache_lock = threading.Lock()
+
+
+def _get_file_signature(stat):
+    """Return what identifies a version of a key file: as values are written
+    to new files renamed to the key file, the inode changes on each write.
+    """
+    return (stat.st_ino, getattr(stat, 'st_mtime_ns', stat.st_mtime),
+            stat.st_size)
+
+
+def _fsync_dir(dir_path):
+    """Make the renaming of a file in ``dir_path`` durable"""
+    try:
+        dir_handle = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        # not supported on this platform
+        return
+    try:
+        os.fsync(dir_handle)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_handle)
+
 
 def get_temp_dir():
     tmp_dir = settings.tmp_dir
@@ -46,9 +83,15 @@ def _get_root_dir(create=True):
 
 
 class FileStorageHandler(BaseStorageHandler):
-    """Key value file storage handler."""
+    """Key value file storage handler.
+
+    Values are written atomically: to a temporary file, synced to disk then
+    renamed to the key file. The values read are cached by the process until
+    the key file changes, checking it costs a ``stat`` call.
+    """
 
-    def __init__(self, root_dir=None, create=True, lock_timeout=LOCK_TIMEOUT):
+    def __init__(self, root_dir=None, create=True, lock_timeout=LOCK_TIMEOUT,
+                 encoding=None):
 
         if root_dir is None:
             root_dir = _get_root_dir()
@@ -56,12 +99,19 @@ class FileStorageHandler(BaseStorageHandler):
         if create and not os.path.exists(root_dir):
             os.makedirs(root_dir)
 
+        if encoding is None:
+            encoding = ENCODING
+        if encoding not in ENCODINGS:
+            raise ValueError('encoding must be one of {0}'.format(
+                ', '.join(ENCODINGS)))
+
         self._lock_timeout = lock_timeout
         self._root_dir = root_dir
+        self._encoding = encoding
 
     @property
     def root_dir(self):
-        return self.root_dir()
+        return self._root_dir
 
     def get_key_file_path(self, key):
         return os.path.join(self._root_dir, key)
@@ -79,27 +129,86 @@ class FileStorageHandler(BaseStorageHandler):
         handler.write(str(os.getpid()))
         handler.flush()
 
+    def encode(self, data):
+        """Return the file content of ``data``"""
+        text = json.dumps(data).encode('utf-8')
+        if self._encoding == 'zlib':
+            return _ZLIB_MAGIC + zlib.compress(text)
+        return text
+
+    @staticmethod
+    def _get_json_text(content):
+        """Return the json text of a file content, of any encoding"""
+        if content.startswith(_ZLIB_MAGIC):
+            content = zlib.decompress(content[len(_ZLIB_MAGIC):])
+        return content.decode('utf-8')
+
+    def decode(self, content):
+        """Return the data of a file content, of any encoding"""
+        return json.loads(self._get_json_text(content))
+
     def get(self, key):
         """Return the key value
         :type key: str
         """
-        value = None
         key_file_path = self.get_key_file_path(key)
-        if os.path.exists(key_file_path):
-            with open(key_file_path, 'r') as file_handler:
-                value = file_handler.read()
-
-        if value is not None:
-            value = self.decode(value)
-        return value
+        try:
+            signature = _get_file_signature(os.stat(key_file_path))
+        except OSError:
+            with _read_cache_lock:
+                _read_cache.pop(key_file_path, None)
+            return None
+        with _read_cache_lock:
+            cached = _read_cache.get(key_file_path)
+        if cached is None or cached[0] != signature:
+            try:
+                with open(key_file_path, 'rb') as file_handler:
+                    # the key file may have been replaced since the stat
+                    signature = _get_file_signature(
+                        os.fstat(file_handler.fileno()))
+                    content = file_handler.read()
+            except (OSError, IOError):
+                return None
+            cached = (signature, self._get_json_text(content))
+            with _read_cache_lock:
+                _read_cache[key_file_path] = cached
+        # decoding the cached text is faster than copying a cached decoded
+        # value, and callers can not alter the values of each other
+        return json.loads(cached[1])
 
     def set(self, key, value):
-        """Write the value of key
+        """Write the value of key, atomically
 
         :type key: str
         :type value: object
         """
         value = self.encode(value)
         key_file_path = self.get_key_file_path(key)
-        with open(key_file_path, 'w') as file_handler:
-            file_handler.write(value)
+        # write to a temporary file renamed to the key file, so readers not
+        # holding the lock never read a partially written value
+        handle, temp_file_path = tempfile.mkstemp(
+            dir=self._root_dir, prefix='.{0}.'.format(key))
+        try:
+            with os.fdopen(handle, 'wb') as file_handler:
+                file_handler.write(value)
+                file_handler.flush()
+                os.fsync(file_handler.fileno())
+            os.rename(temp_file_path, key_file_path)
+        except Exception:
+            os.remove(temp_file_path)
+            raise
+        _fsync_dir(self._root_dir)
+
+    def delete(self, key):
+        """Remove the key file
+
+        :type key: str
+        """
+        key_file_path = self.get_key_file_path(key)
+        with _read_cache_lock:
+            _read_cache.pop(key_file_path, None)
+        try:
+            os.remove(key_file_path)
+        except OSError:
+            return
+        _fsync_dir(self._root_dir)
@@ -1,4 +1,12 @@
 # -*- encoding: utf-8 -*-
+import logging
+import os
+import threading
+import time
+import uuid
+
+from contextlib import contextmanager
+
 try:
     import redis
 except ImportError:
@@ -11,51 +19,208 @@ REDIS_PORT = 6379
 REDIS_DB = 0
 REDIS_PASSWORD = None
 LOCK_TIMEOUT = 7200
+# the maximum time waiting for a notification before trying to acquire a
+# lock again, in case a notification was missed
+NOTIFICATION_TIMEOUT = 5
+
+logger = logging.getLogger(__name__)
+
+# Take the lock, and when taken read the key value in the same round-trip
+_ACQUIRE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return {1, redis.call('GET', KEYS[2])}
+end
+return {0}
+"""
+
+# Write the key value and notify the waiting workers of its state
+_SET_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1])
+redis.call('PUBLISH', KEYS[2], ARGV[2])
+"""
+
+# Release the lock if still owned and notify the waiting workers
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    redis.call('PUBLISH', KEYS[2], 'RELEASED')
+    return 1
+end
+return 0
+"""
+
+# connection pools by connection parameters and process, connections can not
+# be shared with forked processes
+_connection_pools = {}
+_connection_pools_lock = threading.Lock()
+
+_lock_wait_stats = {}
+_lock_wait_stats_lock = threading.Lock()
+
+
+class RedisStorageLockError(Exception):
+    """Raised when a storage lock can not be acquired in time"""
+
+
+def _get_connection_pool(host, port, db, password):
+    """Return the connection pool of this process for the connection
+    parameters
+    """
+    pool_key = (host, port, db, password, os.getpid())
+    with _connection_pools_lock:
+        pool = _connection_pools.get(pool_key)
+        if pool is None:
+            pool = _connection_pools[pool_key] = redis.ConnectionPool(
+                host=host, port=port, db=db, password=password)
+    return pool
+
+
+def _record_lock_wait(wait_time, acquired):
+    """Add a lock wait to the stats"""
+    with _lock_wait_stats_lock:
+        stats = _lock_wait_stats
+        stats['count'] = stats.get('count', 0) + 1
+        stats['total_time'] = stats.get('total_time', 0) + wait_time
+        stats['max_time'] = max(stats.get('max_time', 0), wait_time)
+        if not acquired:
+            stats['timeouts'] = stats.get('timeouts', 0) + 1
+
+
+def get_lock_wait_stats():
+    """Return the number of lock acquisitions of this process, with the
+    total and maximum time in seconds spent waiting for the locks and the
+    number of acquisitions that timed out.
+    """
+    with _lock_wait_stats_lock:
+        stats = dict(count=0, total_time=0, max_time=0, timeouts=0)
+        stats.update(_lock_wait_stats)
+    return stats
+
+
+def reset_lock_wait_stats():
+    """Reset the lock wait stats to zero"""
+    with _lock_wait_stats_lock:
+        _lock_wait_stats.clear()
 
 
 class RedisStorageHandler(BaseStorageHandler):
-    """Redis Key value storage handler"""
+    """Redis Key value storage handler
+
+    The clients of a process share a connection pool. Lock owners publish
+    the state of the values they write and the release of their locks on the
+    ``<key>.notify`` channel, so the waiting workers try to acquire the lock
+    again right away.
+    """
 
-    def __init__(self, host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB,
-                 password=REDIS_PASSWORD, lock_timeout=LOCK_TIMEOUT):
+    def __init__(self, host=None, port=None, db=None, password=None,
+                 lock_timeout=None):
 
+        if lock_timeout is None:
+            lock_timeout = LOCK_TIMEOUT
         self._lock_timeout = lock_timeout
-        self._client = redis.StrictRedis(
-            host=host, port=port, db=db, password=password)
+        self._client = redis.StrictRedis(connection_pool=_get_connection_pool(
+            REDIS_HOST if host is None else host,
+            REDIS_PORT if port is None else port,
+            REDIS_DB if db is None else db,
+            REDIS_PASSWORD if password is None else password,
+        ))
+        self._acquire_script = self._client.register_script(_ACQUIRE_SCRIPT)
+        self._set_script = self._client.register_script(_SET_SCRIPT)
+        self._release_script = self._client.register_script(_RELEASE_SCRIPT)
+        # the values read when acquiring the locks, by key
+        self._prefetched = {}
 
     @property
     def client(self):
         return self._client
 
+    @staticmethod
+    def get_channel(key):
+        """Return the notifications channel of key"""
+        return '{}.notify'.format(key)
+
+    def _acquire(self, key, lock_key, token):
+        """Try to acquire the lock, return whether it was acquired"""
+        result = self._acquire_script(
+            keys=[lock_key, key], args=[token, max(1, int(self._lock_timeout))])
+        if not result[0]:
+            return False
+        self._prefetched[key] = result[1] if len(result) > 1 else None
+        return True
+
+    @contextmanager
     def lock(self, key, timeout=None):
         """Return the storage locker context manager"""
         if timeout is None:
             timeout = self._lock_timeout
 
         lock_key = '{}.lock'.format(key)
-        # If acquired the lock will be acquired until release
-        return self.client.lock(
-            lock_key, timeout=None, blocking_timeout=timeout)
+        token = uuid.uuid4().hex
+        start = time.time()
+        deadline = start + timeout
+        pubsub = None
+        try:
+            while not self._acquire(key, lock_key, token):
+                if pubsub is None:
+                    # subscribe, then retry at once, to not miss a release
+                    pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(self.get_channel(key))
+                    continue
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    _record_lock_wait(time.time() - start, False)
+                    raise RedisStorageLockError(
+                        'Not able to acquire lock {0} in {1} seconds'.format(
+                            lock_key, timeout))
+                pubsub.get_message(
+                    timeout=min(remaining, NOTIFICATION_TIMEOUT))
+        finally:
+            if pubsub is not None:
+                pubsub.close()
+        wait_time = time.time() - start
+        _record_lock_wait(wait_time, True)
+        logger.debug('acquired lock {0} in {1:.3f} seconds'.format(
+            lock_key, wait_time))
+        try:
+            yield token
+        finally:
+            self._prefetched.pop(key, None)
+            self._release_script(
+                keys=[lock_key, self.get_channel(key)], args=[token])
 
     def when_lock_acquired(self, lock_object):
         # do nothing
         pass
 
     def get(self, key):
-        """Return the key value
+        """Return the key value, read when acquiring its lock if held
 
         :type key: str
         """
-        value = self.client.get(key)
+        if key in self._prefetched:
+            value = self._prefetched.pop(key)
+        else:
+            value = self.client.get(key)
         if value is not None:
             value = self.decode(value)
         return value
 
     def set(self, key, value):
-        """Write the value of key
+        """Write the value of key and publish its state
 
         :type key: str
         :type value: object
         """
-        value = self.encode(value)
-        self.client.set(key, value)
+        state = value.get('state') if isinstance(value, dict) else None
+        self._set_script(
+            keys=[key, self.get_channel(key)],
+            args=[self.encode(value), state or 'SET']
+        )
+
+    def delete(self, key):
+        """Remove the value of key
+
+        :type key: str
+        """
+        self._prefetched.pop(key, None)
+        self.client.delete(key)
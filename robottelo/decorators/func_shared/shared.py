@@ -84,32 +84,57 @@ Usage::
             # create a virtual machine
 
             return dict(org=cls.org, repo=cls.repo}
+
+    # results which are long to compute, and can be a bit outdated, can still
+    # be served for stale_timeout seconds after their timeout, while one
+    # worker computes them again in the background
+
+    class SomeTestCase3(TestCase):
+
+        @classmethod
+        @shared(timeout=3600, stale_timeout=1800)
+        def _shared_sync(cls):
+            return sync_repositories()
+
+    # the stored results can be dropped, or computed in the background before
+    # the tests need them, for example at the start of the session
+
+    shared.invalidate(SomeTestCase3._shared_sync)
+    shared.prewarm(module_level_shared, dict(value=1))
+
+    # any function can be called only once for all the workers, under a
+    # storage key of its own
+
+    org = shared.call_shared('default_org', make_org, args=({'name': 'x'},))
 """
 import datetime
 import functools
 import hashlib
 import import_string
-import inspect
 import logging
 import os
 import sys
+import threading
 import traceback
 import uuid
 
-from nailgun.entities import Entity
-
 from robottelo.config import settings
-from robottelo.decorators import setting_is_set
+from robottelo.decorators import get_caller_class_name, setting_is_set
 from robottelo.decorators.func_shared import file_storage
 from robottelo.decorators.func_shared import redis_storage
+from robottelo.decorators.func_shared import sqlite_storage
 from robottelo.decorators.func_shared.file_storage import FileStorageHandler
 from robottelo.decorators.func_shared.redis_storage import RedisStorageHandler
+from robottelo.decorators.func_shared.sqlite_storage import (
+    SqliteStorageHandler
+)
 
 logger = logging.getLogger(__name__)
 
 _storage_handlers = {
     'file': FileStorageHandler,
-    'redis': RedisStorageHandler
+    'redis': RedisStorageHandler,
+    'sqlite': SqliteStorageHandler,
 }
 
 DEFAULT_STORAGE_HANDLER = 'file'
@@ -128,6 +153,10 @@ _DEFAULT_CLASS_NAME_DEPTH = 3
 _STATE_READY = 'READY'
 _STATE_FAILED = 'FAILED'
 
+# The version of the format of the stored values, values of other versions
+# are only read with the storage lock held
+_RECORD_VERSION = 1
+
 _DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
 
 _SERVER_CERT_MD5 = None
@@ -152,7 +181,10 @@ def _check_config():
         SHARE_DEFAULT_TIMEOUT = settings.shared_function.share_timeout
         DEFAULT_CALL_RETRIES = settings.shared_function.call_retries
         file_storage.LOCK_TIMEOUT = settings.shared_function.lock_timeout
+        file_storage.ENCODING = settings.shared_function.file_encoding
         redis_storage.LOCK_TIMEOUT = settings.shared_function.lock_timeout
+        sqlite_storage.LOCK_TIMEOUT = settings.shared_function.lock_timeout
+        sqlite_storage.DB_PATH = settings.shared_function.sqlite_path
         redis_storage.REDIS_HOST = settings.shared_function.redis_host
         redis_storage.REDIS_PORT = settings.shared_function.redis_port
         redis_storage.REDIS_DB = settings.shared_function.redis_db
@@ -215,7 +247,7 @@ class _SharedFunction(object):
     def __init__(self, function_key, function, args=None, kwargs=None,
                  retries=DEFAULT_CALL_RETRIES, storage_handler=None,
                  timeout=SHARE_DEFAULT_TIMEOUT,
-                 inject=False, injected_kw='_inject'):
+                 inject=False, injected_kw='_inject', stale_timeout=None):
 
         if storage_handler is None:
             storage_handler = _get_default_storage_handler()
@@ -238,6 +270,7 @@ class _SharedFunction(object):
         self._max_retries = retries
         self._transaction = uuid.uuid4().hex
         self._share_timeout = timeout
+        self._stale_timeout = stale_timeout or 0
 
     @property
     def storage(self):
@@ -253,9 +286,11 @@ class _SharedFunction(object):
 
     def _encode_result_kwargs(self, kwargs):
         """look for some special kwargs and convert them"""
-        if kwargs and isinstance(kwargs, dict):
+        # no value can be a NailGun entity when NailGun is not imported
+        entities = sys.modules.get('nailgun.entities')
+        if entities and kwargs and isinstance(kwargs, dict):
             for key, value in kwargs.items():
-                if isinstance(value, Entity):
+                if isinstance(value, entities.Entity):
                     kwargs[key] = value.to_json_dict()
 
         return kwargs
@@ -300,7 +335,158 @@ class _SharedFunction(object):
 
         return False
 
+    def _is_result_stale(self, creation_datetime):
+        """Return whether an expired result can still be served while it is
+        refreshed
+        """
+        stale_datetime = creation_datetime + datetime.timedelta(
+            seconds=self._share_timeout + self._stale_timeout)
+        return (self._has_result_expired(creation_datetime)
+                and datetime.datetime.utcnow() < stale_datetime)
+
+    def _read_ready_value(self):
+        """Return the stored value if it is ready, expired or not, without
+        taking the storage lock, otherwise return ``None``.
+
+        The storage handlers write the values atomically, a reader gets
+        either the previous or the new value.
+        """
+        try:
+            value = self.storage.get(self.key)
+        except ValueError:
+            # not decodable, let the locked path handle it
+            return None
+        if (not isinstance(value, dict)
+                or value.get('record_version') != _RECORD_VERSION
+                or value.get('state') != _STATE_READY):
+            return None
+        return value
+
+    def _get_ready_value(self):
+        """Return the stored value if it is ready and not expired, without
+        taking the storage lock, otherwise return ``None``.
+        """
+        value = self._read_ready_value()
+        if value is None:
+            return None
+        creation_datetime = datetime.datetime.strptime(
+            value['creation_datetime'], _DATETIME_FORMAT)
+        if self._has_result_expired(creation_datetime):
+            return None
+        return value
+
+    def _get_stale_value(self):
+        """Return the stored value if it is ready and stale, refreshing it in
+        the background unless another worker already does, otherwise return
+        ``None``.
+        """
+        if not self._stale_timeout:
+            return None
+        value = self._read_ready_value()
+        if value is None:
+            return None
+        creation_datetime = datetime.datetime.strptime(
+            value['creation_datetime'], _DATETIME_FORMAT)
+        if not self._is_result_stale(creation_datetime):
+            return None
+        if not value.get('refresh_id'):
+            self._start_refresh()
+        return value
+
+    def _start_refresh(self):
+        """Mark the stored value as being refreshed by this worker, if still
+        stale and not refreshed by another one, and refresh it in a
+        background thread.
+
+        A refresh abandoned by a worker which exited is retried once the
+        value is no longer stale, by the callers waiting for the lock.
+        """
+        with self.storage.lock(self.key) as data:
+            self.storage.when_lock_acquired(data)
+            value = self._read_ready_value()
+            if value is None or value.get('refresh_id'):
+                return
+            creation_datetime = datetime.datetime.strptime(
+                value['creation_datetime'], _DATETIME_FORMAT)
+            if not self._is_result_stale(creation_datetime):
+                return
+            value['refresh_id'] = self.transaction
+            value['refresh_pid'] = os.getpid()
+            self.storage.set(self.key, value)
+        logger.info('refreshing stale shared function result: {0}'.format(
+            self.key))
+        thread = threading.Thread(
+            target=self._refresh, name='refresh {0}'.format(self.key))
+        thread.daemon = True
+        thread.start()
+
+    def _refresh(self):
+        """Call the function and replace the stale value by its result. When
+        the call fails the stale value is kept, and can be refreshed again.
+        """
+        result, exp, traceback_text = self._call_function()
+        with self.storage.lock(self.key) as data:
+            self.storage.when_lock_acquired(data)
+            value = self._read_ready_value()
+            if value is None or value.get('refresh_id') != self.transaction:
+                # invalidated or replaced meanwhile
+                return
+            if exp:
+                logger.error(
+                    'refreshing shared function result {0} failed, keeping '
+                    'the stale result'.format(self.key))
+                value.pop('refresh_id', None)
+                value.pop('refresh_pid', None)
+            else:
+                value = self._make_value(result, exp, traceback_text)
+            self.storage.set(self.key, value)
+
+    def _make_value(self, result, exp, traceback_text):
+        """Return the value to store for a function call"""
+        creation_datetime = datetime.datetime.utcnow().strftime(
+            _DATETIME_FORMAT)
+        if exp:
+            return dict(state=_STATE_FAILED,
+                        record_version=_RECORD_VERSION,
+                        id=self.transaction,
+                        result=None,
+                        error=str(exp) or 'error occurred',
+                        error_class_name='{0}.{1}'.format(
+                            exp.__class__.__module__, exp.__class__.__name__),
+                        traceback=traceback_text,
+                        pid=os.getpid(),
+                        creation_datetime=creation_datetime
+                        )
+        return dict(state=_STATE_READY,
+                    record_version=_RECORD_VERSION,
+                    id=self.transaction,
+                    result=self._encode_result_kwargs(result),
+                    error=None,
+                    pid=os.getpid(),
+                    creation_datetime=creation_datetime
+                    )
+
+    def _inject_result(self, result):
+        """Recall the function with the stored result as kwargs"""
+        # note: to be able to use this functionality the result must be a
+        # dict
+        if self._injected_kw:
+            # update the kwargs with a kw to notify the function that the
+            # kwargs are injected from saved data
+            result[self._injected_kw] = True
+        # recall the function with result as kwargs
+        # the function may modify the result
+        return self._function(*self._function_args, **result)
+
     def __call__(self):
+        # when the result is ready, read it without waiting for the lock,
+        # which would make all the workers wait for each other
+        value = self._get_ready_value() or self._get_stale_value()
+        if value is not None:
+            result = value['result']
+            if self._inject:
+                result = self._inject_result(result)
+            return result
         # this lock prevent any other process to run the function,
         # and if an other process is running the function, I should wait it
         # to finish
@@ -335,31 +521,9 @@ class _SharedFunction(object):
 
             if call_function is True:
                 result, exp, traceback_text = self._call_function()
-                creation_datetime = datetime.datetime.utcnow().strftime(
-                    _DATETIME_FORMAT)
-                if exp:
-                    error = str(exp) or 'error occurred'
-                    error_class_name = '{0}.{1}'.format(
-                        exp.__class__.__module__, exp.__class__.__name__)
-                    value = dict(state=_STATE_FAILED,
-                                 id=self.transaction,
-                                 result=None,
-                                 error=error,
-                                 error_class_name=error_class_name,
-                                 traceback=traceback_text,
-                                 pid=os.getpid(),
-                                 creation_datetime=creation_datetime
-                                 )
-                else:
-                    error = None
-                    result = self._encode_result_kwargs(result)
-                    value = dict(state=_STATE_READY,
-                                 id=self.transaction,
-                                 result=result,
-                                 error=error,
-                                 pid=os.getpid(),
-                                 creation_datetime=creation_datetime
-                                 )
+                value = self._make_value(result, exp, traceback_text)
+                result = value['result']
+                error = value['error']
                 self.storage.set(self.key, value)
 
         if call_function and exp:
@@ -403,15 +567,7 @@ class _SharedFunction(object):
             )
 
         if not call_function and self._inject:
-            # note: to be able to use this functionality the result must be a
-            # dict
-            if self._injected_kw:
-                # update the kwargs with a kw to notify the function that the
-                # kwargs are injected from saved data
-                result[self._injected_kw] = True
-            # recall the function with result as kwargs
-            # the function may modify the result
-            result = self._function(*self._function_args, **result)
+            result = self._inject_result(result)
 
         return result
 
@@ -486,7 +642,7 @@ def _get_function_name_key(function_name, scope=None, scope_kwargs=None,
 def shared(function_=None, scope=_get_default_scope, scope_context=None,
            scope_kwargs=None, timeout=SHARE_DEFAULT_TIMEOUT,
            retries=DEFAULT_CALL_RETRIES, function_kw=None,
-           inject=False, injected_kw='_injected'):
+           inject=False, injected_kw='_injected', stale_timeout=None):
     """Generic function sharing, share the results of any decorated function.
     Any parallel pytest xdist worker will wait for this function to finish
 
@@ -499,6 +655,7 @@ def shared(function_=None, scope=_get_default_scope, scope_context=None,
     :type function_kw: list
     :type inject: bool
     :type injected_kw: str
+    :type stale_timeout: int
 
     :param function_: the function that is intended to be shared
     :param scope: this parameter will define the namespace of data sharing
@@ -516,52 +673,52 @@ def shared(function_=None, scope=_get_default_scope, scope_context=None,
         **kwargs
     :param injected_kw: the kw arg to set to True to inform the function that
         the kwargs was injected from a saved storage
+    :param stale_timeout: the time in seconds a result is still returned after
+        its timeout, while one worker calls the function again in the
+        background to replace it. By default expired results are not returned
+        and the callers wait for the function to be called again.
     """
     _check_config()
-    class_names = []
-    class_name = None
-    index = 1
-    while class_name != '<module>' and index <= _DEFAULT_CLASS_NAME_DEPTH:
-        if class_name:
-            class_names.append(class_name)
-        class_name = inspect.getouterframes(inspect.currentframe())[index][3]
-        index += 1
-    class_names.reverse()
-    class_name = '.'.join(class_names)
+    class_name = get_caller_class_name(depth=_DEFAULT_CLASS_NAME_DEPTH - 1)
     if function_kw is None:
         function_kw = []
 
     def main_wrapper(func):
 
-        @functools.wraps(func)
-        def function_wrapper(*args, **kwargs):
+        def get_key(**kwargs):
+            """Return the storage key of the function called with kwargs"""
             function_kw_scope = {
                 key: kwargs.get(key) for key in function_kw}
             function_name = _get_function_name(
                 func, class_name=class_name, kwargs=function_kw_scope)
-            if not ENABLED:
-                # if disabled call the function immediately
-                return func(*args, **kwargs)
-
-            function_name_key = _get_function_name_key(
+            return _get_function_name_key(
                 function_name,
                 scope=scope,
                 scope_kwargs=scope_kwargs,
                 scope_context=scope_context
             )
+
+        @functools.wraps(func)
+        def function_wrapper(*args, **kwargs):
+            if not ENABLED:
+                # if disabled call the function immediately
+                return func(*args, **kwargs)
+
             shared_object = _SharedFunction(
-                function_name_key,
+                get_key(**kwargs),
                 func,
                 args=args,
                 kwargs=kwargs,
                 timeout=timeout,
                 retries=retries,
                 inject=inject,
-                injected_kw=injected_kw
+                injected_kw=injected_kw,
+                stale_timeout=stale_timeout
             )
 
             return shared_object()
 
+        setattr(function_wrapper, '__shared_key__', get_key)
         return function_wrapper
 
     def wait_function(func):
@@ -571,3 +728,93 @@ def shared(function_=None, scope=_get_default_scope, scope_context=None,
         return main_wrapper(function_)
     else:
         return wait_function
+
+
+def _get_shared_key(function, **kwargs):
+    """Return the storage key of a shared function called with kwargs"""
+    get_key = getattr(function, '__shared_key__', None)
+    if get_key is None:
+        raise SharedFunctionError(
+            '{0} is not a shared function'.format(function))
+    return get_key(**kwargs)
+
+
+def call_shared(key, function, args=None, kwargs=None, timeout=None,
+                scope=None, scope_context=None):
+    """Call a function only once for all the workers, like a shared function,
+    with its storage key built from ``key`` instead of the function name. The
+    other callers wait for its result. The function is called directly when
+    sharing is disabled.
+
+    :type key: str
+    :type function: callable
+    :type args: tuple
+    :type kwargs: dict
+    :type timeout: int
+    :type scope: str or callable
+    :type scope_context: str
+    :param key: the name of the shared result, in place of the function name
+    :param timeout: the time in seconds the result is shared, defaults to
+        ``SHARE_DEFAULT_TIMEOUT``
+    :param scope: the namespace of data sharing, see :func:`shared`
+    :param scope_context: an added context string, see :func:`shared`
+    :return: the function result
+    """
+    _check_config()
+    if not ENABLED:
+        return function(*(args or ()), **(kwargs or {}))
+    if timeout is None:
+        timeout = SHARE_DEFAULT_TIMEOUT
+    function_key = _get_function_name_key(
+        key, scope=scope, scope_context=scope_context)
+    return _SharedFunction(
+        function_key, function, args=args, kwargs=kwargs, timeout=timeout)()
+
+
+def invalidate(key, **kwargs):
+    """Drop the stored result of a shared function, the next call calls the
+    function again. A refresh of the result running in the background is
+    dropped too.
+
+    :type key: str or callable
+    :param key: the storage key, or the shared function
+    :param kwargs: the kwargs the shared function is called with, when some
+        of them are used as scope with ``function_kw``
+    """
+    if callable(key):
+        key = _get_shared_key(key, **kwargs)
+    _check_config()
+    _get_default_storage_handler().delete(key)
+    logger.info('invalidated shared function result: {0}'.format(key))
+
+
+def prewarm(function, kwargs=None, args=None):
+    """Call a shared function in a background thread, to have its result
+    stored, or refreshed, before the tests need it. A failed call is logged.
+
+    :type function: callable
+    :type kwargs: dict
+    :type args: tuple
+    :return: the started thread, or ``None`` when sharing is disabled
+    """
+    key = _get_shared_key(function, **(kwargs or {}))
+    _check_config()
+    if not ENABLED:
+        return None
+
+    def call():
+        try:
+            function(*(args or ()), **(kwargs or {}))
+        except Exception as exp:
+            logger.error('prewarming shared function result {0} failed: {1}'
+                         .format(key, exp))
+
+    thread = threading.Thread(target=call, name='prewarm {0}'.format(key))
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+shared.call_shared = call_shared
+shared.invalidate = invalidate
+shared.prewarm = prewarm
@@ -0,0 +1,249 @@
+# -*- encoding: utf-8 -*-
+import errno
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from contextlib import contextmanager
+
+from robottelo.decorators.func_shared.base import BaseStorageHandler
+from robottelo.decorators.func_shared.file_storage import _get_root_dir
+
+logger = logging.getLogger(__name__)
+
+DB_FILE_NAME = 'shared_functions.sqlite'
+# the database file path, by default DB_FILE_NAME in the shared functions
+# temporary directory
+DB_PATH = None
+LOCK_TIMEOUT = 7200
+# after how much time the stored values are dropped, the shared functions
+# consider them expired long before
+VALUE_TIMEOUT = 86400
+# how much time a connection waits for the database to be writable
+BUSY_TIMEOUT = 60
+
+_LOCK_POLL_MIN_INTERVAL = 0.05
+_LOCK_POLL_MAX_INTERVAL = 1
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS shared_values ('
+    ' key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS shared_locks ('
+    ' key TEXT PRIMARY KEY, owner TEXT NOT NULL, pid INTEGER NOT NULL,'
+    ' expires REAL NOT NULL)',
+)
+
+# connections of this process by thread and database path, sqlite
+# connections can not be used by other threads or forked processes
+_connections = threading.local()
+# the database paths already initialized and cleaned up by this process
+_initialized = set()
+_initialized_lock = threading.Lock()
+
+
+class SqliteStorageLockError(Exception):
+    """Raised when a storage lock can not be acquired in time"""
+
+
+def get_db_path():
+    """Return the path of the database file"""
+    if DB_PATH:
+        return DB_PATH
+    return os.path.join(_get_root_dir(), DB_FILE_NAME)
+
+
+def _get_connection(db_path):
+    """Return the connection of the current thread to ``db_path``"""
+    connections = getattr(_connections, 'by_path', None)
+    if connections is None or _connections.pid != os.getpid():
+        connections = _connections.by_path = {}
+        _connections.pid = os.getpid()
+    connection = connections.get(db_path)
+    if connection is None:
+        # isolation_level None: transactions are started explicitly
+        connection = sqlite3.connect(
+            db_path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connections[db_path] = connection
+    return connection
+
+
+class SqliteStorageHandler(BaseStorageHandler):
+    """Key value storage handler, backed by a sqlite database in WAL mode
+    shared by all the processes. WAL mode lets readers run while a writer
+    holds the database.
+
+    Each key is a row of the ``shared_values`` table, with an expiration
+    time. Locks are rows of the ``shared_locks`` table inserted in a
+    transaction. Expired values and locks left by dead processes are dropped
+    once per process, see :meth:`cleanup`.
+    """
+
+    def __init__(self, db_path=None, lock_timeout=None, value_timeout=None):
+        if db_path is None:
+            db_path = get_db_path()
+        if lock_timeout is None:
+            lock_timeout = LOCK_TIMEOUT
+        if value_timeout is None:
+            value_timeout = VALUE_TIMEOUT
+        self._db_path = db_path
+        self._lock_timeout = lock_timeout
+        self._value_timeout = value_timeout
+        with _initialized_lock:
+            if db_path not in _initialized:
+                for statement in _SCHEMA:
+                    self.connection.execute(statement)
+                self.cleanup()
+                _initialized.add(db_path)
+
+    @property
+    def db_path(self):
+        return self._db_path
+
+    @property
+    def connection(self):
+        return _get_connection(self._db_path)
+
+    @contextmanager
+    def _transaction(self):
+        """Run the statements in a transaction holding the database write
+        lock from its start
+        """
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _acquire(self, lock_key, owner):
+        """Try to insert the lock row, return whether it was inserted"""
+        now = time.time()
+        with self._transaction() as connection:
+            row = connection.execute(
+                'SELECT pid, expires FROM shared_locks WHERE key = ?',
+                (lock_key,)
+            ).fetchone()
+            if row is not None:
+                pid, expires = row
+                if expires > now and _is_process_running(pid):
+                    return False
+                # the lock of a process which died while holding it, or held
+                # for longer than the lock timeout, can be taken
+                logger.warning('taking over lock {0} of process {1}'.format(
+                    lock_key, pid))
+                connection.execute(
+                    'DELETE FROM shared_locks WHERE key = ?', (lock_key,))
+            cursor = connection.execute(
+                'INSERT INTO shared_locks (key, owner, pid, expires)'
+                ' VALUES (?, ?, ?, ?)',
+                (lock_key, owner, os.getpid(), now + self._lock_timeout)
+            )
+            return cursor.rowcount == 1
+
+    @contextmanager
+    def lock(self, key):
+        """Return the storage locker context manager"""
+        lock_key = '{}.lock'.format(key)
+        owner = uuid.uuid4().hex
+        deadline = time.time() + self._lock_timeout
+        interval = _LOCK_POLL_MIN_INTERVAL
+        while not self._acquire(lock_key, owner):
+            if time.time() >= deadline:
+                raise SqliteStorageLockError(
+                    'Not able to acquire lock {0} in {1} seconds'.format(
+                        lock_key, self._lock_timeout))
+            time.sleep(interval)
+            interval = min(interval * 2, _LOCK_POLL_MAX_INTERVAL)
+        try:
+            yield owner
+        finally:
+            with self._transaction() as connection:
+                connection.execute(
+                    'DELETE FROM shared_locks WHERE key = ? AND owner = ?',
+                    (lock_key, owner)
+                )
+
+    def when_lock_acquired(self, data):
+        # the lock row already holds the process id
+        pass
+
+    def get(self, key):
+        """Return the key value
+
+        :type key: str
+        """
+        row = self.connection.execute(
+            'SELECT value FROM shared_values WHERE key = ? AND expires > ?',
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return self.decode(row[0])
+
+    def set(self, key, value):
+        """Write the value of key
+
+        :type key: str
+        :type value: object
+        """
+        value = self.encode(value)
+        with self._transaction() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO shared_values (key, value, expires)'
+                ' VALUES (?, ?, ?)',
+                (key, value, time.time() + self._value_timeout)
+            )
+
+    def delete(self, key):
+        """Remove the value of key
+
+        :type key: str
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                'DELETE FROM shared_values WHERE key = ?', (key,))
+
+    def cleanup(self):
+        """Drop the expired values and locks, along with the locks of the
+        processes of this host which are not running anymore.
+
+        :return: the number of dropped values and locks.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            dropped = connection.execute(
+                'DELETE FROM shared_values WHERE expires <= ?', (now,)
+            ).rowcount
+            dropped += connection.execute(
+                'DELETE FROM shared_locks WHERE expires <= ?', (now,)
+            ).rowcount
+            dead_pids = [
+                pid for pid, in connection.execute(
+                    'SELECT DISTINCT pid FROM shared_locks')
+                if not _is_process_running(pid)
+            ]
+            for pid in dead_pids:
+                dropped += connection.execute(
+                    'DELETE FROM shared_locks WHERE pid = ?', (pid,)
+                ).rowcount
+        if dropped:
+            logger.info('dropped {0} expired shared values and locks from {1}'
+                        .format(dropped, self._db_path))
+        return dropped
+
+
+def _is_process_running(pid):
+    """Return whether the process ``pid`` is running on this host"""
+    try:
+        os.kill(pid, 0)
+    except OSError as err:
+        # running, but owned by another user
+        return err.errno == errno.EPERM
+    return True
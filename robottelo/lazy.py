@@ -0,0 +1,73 @@
+# -*- encoding: utf-8 -*-
+"""Lazy module attributes, built or imported when first accessed.
+
+Modules with costly attributes, like large tables or attributes of heavy
+optional packages, define a module level ``__getattr__`` function called for
+the attributes they do not have, as described by :pep:`562`::
+
+    from robottelo.lazy import lazy_attributes, lazy_imports
+
+    __getattr__ = lazy_attributes(__name__, HEAVY_TABLE=_get_heavy_table)
+
+    # or, for attributes of other modules
+    __getattr__ = lazy_imports(__name__, By='selenium.webdriver.common.by:By')
+
+The attributes are cached in the module once built. :pep:`562` is supported
+from python 3.7, :func:`enable_module_getattr` brings it to older pythons.
+"""
+import import_string
+import sys
+import types
+
+
+class _ModuleWithGetattr(types.ModuleType):
+    """Module calling its module level ``__getattr__`` function for the
+    attributes it does not have
+    """
+
+    def __getattr__(self, name):
+        module_getattr = self.__dict__.get('__getattr__')
+        if module_getattr is None:
+            raise AttributeError('module {0!r} has no attribute {1!r}'.format(
+                self.__name__, name))
+        return module_getattr(name)
+
+
+def enable_module_getattr(module_name):
+    """Make the module level ``__getattr__`` function of ``module_name`` be
+    called for its missing attributes, on pythons not supporting :pep:`562`.
+    """
+    if sys.version_info >= (3, 7):
+        return
+    module = sys.modules[module_name]
+    if not isinstance(module, _ModuleWithGetattr):
+        module.__class__ = _ModuleWithGetattr
+
+
+def lazy_attributes(module_name, **factories):
+    """Return a module level ``__getattr__`` function building the attributes
+    of ``module_name`` with the functions of ``factories``, by attribute name,
+    when first accessed.
+    """
+    def module_getattr(name):
+        factory = factories.get(name)
+        if factory is None:
+            raise AttributeError('module {0!r} has no attribute {1!r}'.format(
+                module_name, name))
+        value = factory()
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    enable_module_getattr(module_name)
+    return module_getattr
+
+
+def lazy_imports(module_name, **import_names):
+    """Return a module level ``__getattr__`` function importing the attributes
+    of ``module_name`` from the ``module:attribute`` import names of
+    ``import_names``, by attribute name, when first accessed.
+    """
+    return lazy_attributes(module_name, **{
+        name: (lambda import_name=import_name: import_string(import_name))
+        for name, import_name in import_names.items()
+    })
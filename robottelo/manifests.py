@@ -9,7 +9,6 @@ import zipfile
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
-from nailgun import entities
 
 from robottelo.cli.subscription import Subscription
 from robottelo.config import settings
@@ -252,6 +251,8 @@ def upload_manifest_locked(org_id, manifest=None,  interface=INTERFACE_API, time
         # ssh_client timeout.
         timeout = 1500
     if interface == INTERFACE_API:
+        # imported here to not import NailGun with the manifests tools
+        from nailgun import entities
         with manifest:
             result = entities.Subscription().upload(
                 data={'organization_id': org_id},
@@ -1,17 +1,23 @@
 """Utility module to handle the shared ssh connection."""
+import atexit
 import base64
+import hashlib
 import logging
 import os
 import re
+import select
+import threading
 import time
 
 import paramiko
 import six
 
+from concurrent.futures import ThreadPoolExecutor
 from fnmatch import fnmatch
 from contextlib import contextmanager
 from robottelo.cli import hammer
 from robottelo.config import settings
+from six.moves import shlex_quote
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +28,10 @@ class SSHCommandTimeoutError(Exception):
     """
 
 
+class SSHTransferError(Exception):
+    """Raised when a transferred file differs from its source"""
+
+
 def decode_to_utf8(text):  # pragma: no cover
     """Paramiko returns bytes object and we need to ensure it is utf-8 before
     parsing
@@ -85,9 +95,12 @@ def _call_paramiko_sshclient():  # pragma: no cover
     return SSHClient()
 
 
-def get_client(hostname=None, username=None, password=None,
-               key_filename=None, timeout=None):
-    """Returns a SSH client connected to given hostname"""
+def _get_credentials(hostname=None, username=None, password=None,
+                     key_filename=None):
+    """Fill the missing connection credentials with the server configuration.
+
+    :return: A ``(hostname, username, password, key_filename)`` tuple.
+    """
     if hostname is None:
         hostname = settings.server.hostname
     if username is None:
@@ -96,6 +109,14 @@ def get_client(hostname=None, username=None, password=None,
         key_filename = settings.server.ssh_key
     if password is None:
         password = settings.server.ssh_password
+    return hostname, username, password, key_filename
+
+
+def get_client(hostname=None, username=None, password=None,
+               key_filename=None, timeout=None):
+    """Returns a SSH client connected to given hostname"""
+    hostname, username, password, key_filename = _get_credentials(
+        hostname, username, password, key_filename)
     if timeout is None:
         timeout = settings.ssh_client.connection_timeout
     client = _call_paramiko_sshclient()
@@ -157,6 +178,204 @@ def get_connection(hostname=None, username=None, password=None,
         logger.debug('Destroyed Paramiko client {0}'.format(client._id))
 
 
+class SSHConnectionPool(object):
+    """Per process pool of connected SSH clients.
+
+    Idle clients are kept per ``(hostname, username, password, key_filename)``
+    and handed out again instead of doing a new TCP connection, key exchange
+    and authentication for every command. A client is only reused when its
+    transport is still active and able to send data, clients idle for more
+    than ``ssh_client.pool_max_idle_time`` seconds are closed and at most
+    ``ssh_client.pool_max_size`` idle clients are kept per key.
+
+    The pool remembers the pid of the process that filled it: a forked child
+    never reuses (nor closes) the clients inherited from its parent as the
+    underlying sockets are shared with it.
+    """
+
+    def __init__(self):
+        self._pid = None
+        self._lock = None
+        self._idle = {}
+        self.stats = {}
+        self._reset()
+
+    def _reset(self):
+        """Start from an empty pool owned by the current process."""
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._idle = {}
+        self.stats = {
+            'created': 0,
+            'reused': 0,
+            'evicted': 0,
+            'discarded': 0,
+        }
+
+    def _check_pid(self):
+        """Forget the inherited clients if running in a forked process."""
+        if self._pid != os.getpid():
+            self._reset()
+
+    @staticmethod
+    def _is_healthy(client):
+        """Check whether a pooled client can still be used."""
+        transport = client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except (EOFError, IOError, paramiko.SSHException):
+            return False
+        return True
+
+    @staticmethod
+    def _close(client):
+        try:
+            client.close()
+        except Exception as err:  # pragma: no cover
+            logger.debug('Failed to close pooled client: %s', err)
+        logger.debug('Destroyed Paramiko client {0}'.format(client._id))
+
+    def _evict_expired(self, now):
+        """Close the idle clients that exceeded the max idle time.
+
+        Must be called with the pool lock held.
+        """
+        max_idle_time = settings.ssh_client.pool_max_idle_time
+        expired = []
+        for key, entries in self._idle.items():
+            alive = []
+            for client, last_used in entries:
+                if now - last_used > max_idle_time:
+                    expired.append(client)
+                else:
+                    alive.append((client, last_used))
+            self._idle[key] = alive
+        self.stats['evicted'] += len(expired)
+        return expired
+
+    def acquire(self, hostname=None, username=None, password=None,
+                key_filename=None, timeout=None):
+        """Return a connected client, reusing an idle one when possible."""
+        key = _get_credentials(hostname, username, password, key_filename)
+        client = None
+        with self._get_lock():
+            expired = self._evict_expired(time.time())
+            entries = self._idle.get(key, [])
+            while entries and client is None:
+                candidate, _ = entries.pop()
+                if self._is_healthy(candidate):
+                    client = candidate
+                    self.stats['reused'] += 1
+                else:
+                    expired.append(candidate)
+                    self.stats['discarded'] += 1
+        for stale_client in expired:
+            self._close(stale_client)
+        if client is None:
+            client = get_client(*key, timeout=timeout)
+            keepalive_interval = settings.ssh_client.keepalive_interval
+            if keepalive_interval:
+                client.get_transport().set_keepalive(keepalive_interval)
+            with self._get_lock():
+                self.stats['created'] += 1
+            logger.debug('Instantiated Paramiko client {0}'.format(client._id))
+        client._pool_key = key
+        return client
+
+    def release(self, client, reusable=True):
+        """Give the client back to the pool or close it.
+
+        :param client: A client previously returned by :meth:`acquire`.
+        :param bool reusable: Whether the client is in a known good state. A
+            client that was in use when an error happened should not be
+            reused.
+        """
+        key = client._pool_key
+        with self._get_lock():
+            entries = self._idle.setdefault(key, [])
+            if reusable and len(entries) < settings.ssh_client.pool_max_size:
+                entries.append((client, time.time()))
+                return
+            self.stats['discarded'] += 1
+        self._close(client)
+
+    def _get_lock(self):
+        self._check_pid()
+        return self._lock
+
+    def close_all(self):
+        """Close every idle client owned by the current process."""
+        if self._pid != os.getpid():
+            self._reset()
+            return
+        with self._lock:
+            clients = [
+                client
+                for entries in self._idle.values()
+                for client, _ in entries
+            ]
+            self._idle = {}
+        for client in clients:
+            self._close(client)
+
+    def get_stats(self):
+        """Return a copy of the pool counters plus the connection reuse rate.
+
+        ``reuse_rate`` is the ratio of connections served from the pool to all
+        connections served.
+        """
+        with self._get_lock():
+            stats = dict(self.stats)
+            stats['idle'] = sum(len(entries) for entries in self._idle.values())
+        served = stats['created'] + stats['reused']
+        stats['reuse_rate'] = float(stats['reused']) / served if served else 0.0
+        return stats
+
+
+_connection_pool = SSHConnectionPool()
+atexit.register(_connection_pool.close_all)
+
+
+def get_connection_pool_stats():
+    """Return the counters of the SSH connection pool of this process."""
+    return _connection_pool.get_stats()
+
+
+@contextmanager
+def get_pooled_connection(hostname=None, username=None, password=None,
+                          key_filename=None, timeout=None):
+    """Yield an ssh connection taken from the connection pool.
+
+    Accepts the same arguments as :func:`get_connection`, but the connection
+    is given back to the pool instead of being closed when the caller is done
+    using it, so the next caller targeting the same host with the same
+    credentials skips the ssh handshake. If an exception is raised while the
+    connection is in use, it is closed instead of being put back into the
+    pool.
+
+    When the ``connection_pool`` option of the ``ssh_client`` section is
+    disabled this behaves exactly like :func:`get_connection`.
+    """
+    if timeout is None:
+        timeout = settings.ssh_client.connection_timeout
+    if not settings.ssh_client.connection_pool:
+        with get_connection(hostname, username, password, key_filename,
+                            timeout) as client:
+            yield client
+        return
+    client = _connection_pool.acquire(
+        hostname, username, password, key_filename, timeout)
+    reusable = False
+    try:
+        logger.info('Connected to [%s]', hostname)
+        yield client
+        reusable = True
+    finally:
+        _connection_pool.release(client, reusable=reusable)
+
+
 @contextmanager
 def get_sftp_session(hostname=None, username=None,
                      password=None, key_filename=None, timeout=None):
@@ -185,12 +404,15 @@ def get_sftp_session(hostname=None, username=None,
         connecting to the server. If it is ``None`` ``key_filename`` from
         configuration's ``server`` section will be used.
     :param int timeout: Time to wait for establish the connection.
+
+    The underlying connection is taken from the connection pool, see
+    :func:`get_pooled_connection`.
        """
-    with get_connection(hostname=hostname, username=username,
-                        password=password, key_filename=key_filename,
-                        timeout=timeout) as connection:
+    with get_pooled_connection(hostname=hostname, username=username,
+                               password=password, key_filename=key_filename,
+                               timeout=timeout) as connection:
+        sftp = connection.open_sftp()
         try:
-            sftp = connection.open_sftp()
             yield sftp
         finally:
             sftp.close()
@@ -234,9 +456,9 @@ def add_authorized_key(key, hostname=None, username=None, password=None,
     ssh_path = '~/.ssh'
     auth_file = os.path.join(ssh_path, 'authorized_keys')
 
-    with get_connection(hostname=hostname, username=username,
-                        password=password, key_filename=key_filename,
-                        timeout=timeout) as con:
+    with get_pooled_connection(hostname=hostname, username=username,
+                               password=password, key_filename=key_filename,
+                               timeout=timeout) as con:
 
         # ensure ssh directory exists
         execute_command('mkdir -p %s' % ssh_path, con)
@@ -246,15 +468,15 @@ def add_authorized_key(key, hostname=None, username=None, password=None,
             key=key_content, dest=auth_file)
         execute_command(add_key, con)
 
-        # set proper permissions
-        execute_command('chmod 700 %s' % ssh_path, con)
-        execute_command('chmod 600 %s' % auth_file, con)
         ssh_user = username or settings.server.ssh_username
-        execute_command('chown -R %s %s' % (ssh_user, ssh_path), con)
-
-        # Restore SELinux context with restorecon, if it's available:
-        cmd = 'command -v restorecon && restorecon -RvF %s || true' % ssh_path
-        execute_command(cmd, con)
+        execute_many([
+            # set proper permissions
+            'chmod 700 %s' % ssh_path,
+            'chmod 600 %s' % auth_file,
+            'chown -R %s %s' % (ssh_user, ssh_path),
+            # Restore SELinux context with restorecon, if it's available:
+            'command -v restorecon && restorecon -RvF %s || true' % ssh_path,
+        ], con)
 
 
 def upload_file(local_file, remote_file, key_filename=None, hostname=None):
@@ -323,14 +545,155 @@ def download_file(remote_file, local_file=None, hostname=None):
     """
     if local_file is None:  # pragma: no cover
         local_file = remote_file
-    with get_connection(
-        hostname=hostname,
-    ) as connection:  # pragma: no cover
+    with get_sftp_session(hostname=hostname) as sftp:  # pragma: no cover
+        sftp.get(remote_file, local_file)
+
+
+TRANSFER_CHUNK_SIZE = 1024 * 1024
+
+
+def _stream_file(source_sftp, destination_sftp, source_file,
+                 destination_file, progress=None):
+    """Copy a file of the source SFTP session to the destination SFTP
+    session by chunks, keeping its permissions.
+
+    :return: the sha256 hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with source_sftp.open(source_file, 'rb') as source:
+        source_stat = source.stat()
+        # read ahead the whole file, the reads do not wait for each request
+        source.prefetch(source_stat.st_size)
+        with destination_sftp.open(destination_file, 'wb') as destination:
+            # do not wait for the server to acknowledge each write
+            destination.set_pipelined(True)
+            transferred = 0
+            while True:
+                chunk = source.read(TRANSFER_CHUNK_SIZE)
+                if not chunk:
+                    break
+                destination.write(chunk)
+                digest.update(chunk)
+                transferred += len(chunk)
+                if progress is not None:
+                    progress(destination_file, transferred,
+                             source_stat.st_size)
+    destination_sftp.chmod(destination_file, source_stat.st_mode & 0o7777)
+    return digest.hexdigest()
+
+
+def _verify_checksums(connection, digests):
+    """Check the sha256 digests of the files on the connection host.
+
+    :param dict digests: the expected hex digests by file path.
+    :raises SSHTransferError: If any file has an other digest.
+    """
+    result = execute_command(
+        u'sha256sum {0}'.format(u' '.join(
+            shlex_quote(path) for path in digests)),
+        connection
+    )
+    remote_digests = {}
+    for line in result.stdout:
+        digest, _, path = line.partition(u'  ')
+        remote_digests[path] = digest
+    mismatched = [
+        path for path, digest in digests.items()
+        if remote_digests.get(path) != digest
+    ]
+    if mismatched:
+        raise SSHTransferError(
+            u'Transferred files differ from their source: {0}\n{1}'.format(
+                u', '.join(mismatched), result.stderr))
+
+
+def transfer_files(files, source_hostname=None, destination_hostname=None,
+                   source_key_filename=None, destination_key_filename=None,
+                   progress=None, verify=True, timeout=None):
+    """Copy files from a remote host to another one, streaming them from
+    SFTP reads on the source host to SFTP writes on the destination host, in
+    chunks, without local copy. All the files are transferred on a single
+    SFTP session to each host::
+
+        transfer_files(
+            ['/root/ca.crt', ('/tmp/certs.tar', '/root/certs.tar')],
+            destination_hostname=vm.ip_addr
+        )
+
+    :param files: the files to transfer, either paths, kept on the
+        destination host, or ``(source path, destination path)`` tuples.
+    :param str source_hostname: the host to read the files from. If it is
+        ``None`` ``hostname`` from configuration's ``server`` section will be
+        used.
+    :param str destination_hostname: the host to write the files to. If it is
+        ``None`` ``hostname`` from configuration's ``server`` section will be
+        used.
+    :param str source_key_filename: The path of the ssh private key to use
+        when connecting to the source host.
+    :param str destination_key_filename: The path of the ssh private key to
+        use when connecting to the destination host.
+    :param progress: a callable called after each chunk with the destination
+        path, the number of bytes transferred and the size of the file.
+    :param bool verify: whether to check the sha256 digests of the written
+        files on the destination host.
+    :param int timeout: Time to wait for establishing the connections.
+    :return: A list of the sha256 hex digests of the files, in the order of
+        ``files``.
+    :raises SSHTransferError: If any written file differs from its source.
+    """
+    paths = [
+        (path, path) if isinstance(path, six.string_types) else tuple(path)
+        for path in files
+    ]
+    source_hostname = source_hostname or settings.server.hostname
+    destination_hostname = destination_hostname or settings.server.hostname
+    with get_pooled_connection(hostname=source_hostname,
+                               key_filename=source_key_filename,
+                               timeout=timeout) as source_connection, \
+            get_pooled_connection(hostname=destination_hostname,
+                                  key_filename=destination_key_filename,
+                                  timeout=timeout) as destination_connection:
+        source_sftp = source_connection.open_sftp()
+        destination_sftp = destination_connection.open_sftp()
         try:
-            sftp = connection.open_sftp()
-            sftp.get(remote_file, local_file)
+            digests = []
+            for source_file, destination_file in paths:
+                logger.info(u'Transferring %s:%s to %s:%s', source_hostname,
+                            source_file, destination_hostname,
+                            destination_file)
+                digests.append(_stream_file(
+                    source_sftp, destination_sftp, source_file,
+                    destination_file, progress
+                ))
         finally:
-            sftp.close()
+            source_sftp.close()
+            destination_sftp.close()
+        if verify and paths:
+            _verify_checksums(destination_connection, dict(
+                (destination_file, digest) for (_, destination_file), digest
+                in zip(paths, digests)
+            ))
+    return digests
+
+
+def transfer_file(source_file, destination_file=None, source_hostname=None,
+                  destination_hostname=None, source_key_filename=None,
+                  destination_key_filename=None, progress=None, verify=True,
+                  timeout=None):
+    """Copy a file from a remote host to another one without local copy,
+    see :func:`transfer_files`. The file keeps its path when
+    ``destination_file`` is not provided.
+
+    :return: the sha256 hex digest of the file.
+    """
+    return transfer_files(
+        [(source_file, destination_file or source_file)],
+        source_hostname=source_hostname,
+        destination_hostname=destination_hostname,
+        source_key_filename=source_key_filename,
+        destination_key_filename=destination_key_filename,
+        progress=progress, verify=verify, timeout=timeout
+    )[0]
 
 
 def command(cmd, hostname=None, output_format=None, username=None,
@@ -353,19 +716,72 @@ def command(cmd, hostname=None, output_format=None, username=None,
         configuration's ``server`` section will be used.
     :param int timeout: Time to wait for the ssh command to finish.
     :param connection_timeout: Time to wait for establishing the connection.
+
+    The connection is taken from the connection pool, see
+    :func:`get_pooled_connection`.
     """
     hostname = hostname or settings.server.hostname
     if timeout is None:
         timeout = settings.ssh_client.command_timeout
     if connection_timeout is None:
         connection_timeout = settings.ssh_client.connection_timeout
-    with get_connection(hostname=hostname, username=username,
-                        password=password, key_filename=key_filename,
-                        timeout=connection_timeout) as connection:
+    with get_pooled_connection(hostname=hostname, username=username,
+                               password=password, key_filename=key_filename,
+                               timeout=connection_timeout) as connection:
         return execute_command(
             cmd, connection, output_format, timeout, connection_timeout)
 
 
+CHANNEL_READ_SIZE = 32768
+
+
+def iter_channel_output(channel, timeout=None):
+    """Yield the output of the command running on ``channel`` as it arrives.
+
+    Both stdout and stderr are read while the command runs, blocking on the
+    channel until new data, the end of the output or the timeout happens
+    instead of sleeping between checks. Reading as the data arrives also
+    keeps the remote command from stalling on a full ssh window.
+
+    The generator finishes once the remote side has sent all its output and
+    the exit status of the command is available through
+    ``channel.recv_exit_status()``.
+
+    :param channel: The ``paramiko.Channel`` the command was executed on.
+    :param timeout: Time to wait for the command to finish. Wait forever if
+        it is ``None`` or ``0``.
+    :return: A generator of ``('stdout'|'stderr', bytes)`` tuples.
+    :raises SSHCommandTimeoutError: If the command has not finished after
+        ``timeout`` seconds. The channel is closed before raising.
+    """
+    end_time = time.time() + timeout if timeout else None
+
+    def remaining_time():
+        if end_time is None:
+            return None
+        remaining = end_time - time.time()
+        if remaining <= 0:
+            channel.close()
+            raise SSHCommandTimeoutError(
+                'ssh command did not respond in the predefined time '
+                '(timeout={0})'.format(timeout)
+            )
+        return remaining
+
+    while True:
+        while channel.recv_ready():
+            yield 'stdout', channel.recv(CHANNEL_READ_SIZE)
+        while channel.recv_stderr_ready():
+            yield 'stderr', channel.recv_stderr(CHANNEL_READ_SIZE)
+        if channel.eof_received or channel.closed:
+            if not (channel.recv_ready() or channel.recv_stderr_ready()):
+                break
+            continue
+        select.select([channel], [], [], remaining_time())
+    while not channel.status_event.is_set():
+        channel.status_event.wait(remaining_time())
+
+
 def execute_command(cmd, connection, output_format=None, timeout=None,
                     connection_timeout=None):
     """Execute a command via ssh in the given connection
@@ -384,33 +800,40 @@ def execute_command(cmd, connection, output_format=None, timeout=None,
     logger.info('>>> %s', cmd)
     _, stdout, stderr = connection.exec_command(
         cmd, timeout=connection_timeout)
-    if timeout:
-        # wait for the exit status ready
-        end_time = time.time() + timeout
-        while time.time() < end_time:
-            if stdout.channel.exit_status_ready():
-                break
-            time.sleep(1)
-        else:
-            logger.error('ssh command did not respond in the predefined time'
-                         ' (timeout=%s) and will be interrupted', timeout)
-            stdout.channel.close()
-            stderr.channel.close()
-            logger.error(
-                    '[Captured stdout]\n{0}\n-----\n'.format(stdout.read())
-            )
-            logger.error(
-                    '[Captured stderr]\n{0}\n-----\n'.format(stderr.read())
-            )
-            raise SSHCommandTimeoutError(
-                'ssh command: {0} \n did not respond in the predefined time '
-                '(timeout={1})'.format(cmd, timeout)
-            )
+    channel = stdout.channel
+    output = {'stdout': [], 'stderr': []}
+    try:
+        for stream, chunk in iter_channel_output(channel, timeout):
+            output[stream].append(chunk)
+    except SSHCommandTimeoutError:
+        logger.error('ssh command did not respond in the predefined time'
+                     ' (timeout=%s) and will be interrupted', timeout)
+        logger.error('[Captured stdout]\n{0}\n-----\n'.format(
+            b''.join(output['stdout'])))
+        logger.error('[Captured stderr]\n{0}\n-----\n'.format(
+            b''.join(output['stderr'])))
+        raise SSHCommandTimeoutError(
+            'ssh command: {0} \n did not respond in the predefined time '
+            '(timeout={1})'.format(cmd, timeout)
+        )
+
+    errorcode = channel.recv_exit_status()
+
+    return build_command_result(
+        b''.join(output['stdout']), b''.join(output['stderr']), errorcode,
+        output_format
+    )
+
 
-    errorcode = stdout.channel.recv_exit_status()
+def build_command_result(stdout, stderr, return_code, output_format=None):
+    """Build a SSHCommandResult from the raw output of a command
 
-    stdout = stdout.read()
-    stderr = stderr.read()
+    :param stdout: the command stdout, either bytes or text
+    :param stderr: the command stderr, either bytes or text
+    :param return_code: the command exit status
+    :param output_format: plain|json|csv|list valid only for hammer commands
+    :return: SSHCommandResult
+    """
     # Remove escape code for colors displayed in the output
     regex = re.compile(r'\x1b\[\d\d?m')
     if stdout:
@@ -435,7 +858,141 @@ def execute_command(cmd, connection, output_format=None, timeout=None,
             if not line.startswith('[')
         ]
     return SSHCommandResult(
-        stdout, stderr, errorcode, output_format)
+        stdout, stderr, return_code, output_format)
+
+
+class SSHCommandStream(object):
+    """Output of a running command, read as it arrives.
+
+    Iterating over the stream yields the stdout bytes chunks of the command.
+    Once all of them have been consumed, ``stderr`` and ``return_code`` are
+    available.
+    """
+
+    def __init__(self, channel, timeout=None):
+        self._channel = channel
+        self._output = iter_channel_output(channel, timeout)
+        self._stderr = []
+        self.finished = False
+        self.return_code = None
+
+    def __iter__(self):
+        for stream, chunk in self._output:
+            if stream == 'stdout':
+                yield chunk
+            else:
+                self._stderr.append(chunk)
+        self.return_code = self._channel.recv_exit_status()
+        self.finished = True
+
+    @property
+    def stderr(self):
+        """The command stderr as unicode, without color codes."""
+        return build_command_result(
+            None, b''.join(self._stderr), self.return_code).stderr
+
+
+@contextmanager
+def stream_command(cmd, hostname=None, username=None, password=None,
+                   key_filename=None, timeout=None, connection_timeout=None):
+    """Executes a SSH command on remote hostname and yields its output as it
+    arrives, without holding all of it in memory::
+
+        with stream_command('cat /var/log/messages') as stream:
+            for chunk in stream:
+                ...
+            assert stream.return_code == 0
+
+    Accepts the same arguments as :func:`command`. If the caller does not
+    consume the whole output, the command channel is closed when leaving the
+    context.
+
+    :return: A SSHCommandStream.
+    """
+    hostname = hostname or settings.server.hostname
+    if timeout is None:
+        timeout = settings.ssh_client.command_timeout
+    if connection_timeout is None:
+        connection_timeout = settings.ssh_client.connection_timeout
+    with get_pooled_connection(hostname=hostname, username=username,
+                               password=password, key_filename=key_filename,
+                               timeout=connection_timeout) as connection:
+        logger.info('>>> %s', cmd)
+        _, stdout, _ = connection.exec_command(
+            cmd, timeout=connection_timeout)
+        stream = SSHCommandStream(stdout.channel, timeout)
+        try:
+            yield stream
+        finally:
+            if not stream.finished:
+                stdout.channel.close()
+
+
+MAX_CONCURRENT_CHANNELS = 10
+
+
+def execute_many(cmds, connection, output_format=None, timeout=None,
+                 connection_timeout=None, concurrency=None):
+    """Execute several commands concurrently in the given connection
+
+    Every command runs on its own channel of the connection transport, so the
+    commands share a single ssh handshake and wait for each other only when
+    more than ``concurrency`` commands are running.
+
+    :param cmds: an iterable of commands to be executed via ssh
+    :param connection: SSH Paramiko client connection
+    :param output_format: plain|json|csv|list valid only for hammer commands
+    :param timeout: Time to wait for each ssh command to finish.
+    :param connection_timeout: Time to wait for opening each channel.
+    :param int concurrency: Maximum number of channels open at the same time.
+        Defaults to ``MAX_CONCURRENT_CHANNELS``, which matches the default
+        ``MaxSessions`` of sshd.
+    :return: A list of SSHCommandResult in the same order as ``cmds``.
+    :raises SSHCommandTimeoutError: If any of the commands times out, once
+        all the other commands finished.
+    """
+    cmds = list(cmds)
+    if not cmds:
+        return []
+    if concurrency is None:
+        concurrency = MAX_CONCURRENT_CHANNELS
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(cmds))) as pool:
+        futures = [
+            pool.submit(
+                execute_command, cmd, connection, output_format, timeout,
+                connection_timeout
+            )
+            for cmd in cmds
+        ]
+    return [future.result() for future in futures]
+
+
+def run_many(cmds, hostname=None, output_format=None, username=None,
+             password=None, key_filename=None, timeout=None,
+             connection_timeout=None, concurrency=None):
+    """Executes several independent SSH commands concurrently on remote
+    hostname over a single connection.
+
+    Accepts the same arguments as :func:`command` plus ``concurrency``, see
+    :func:`execute_many`. Commands must not depend on each other as there is
+    no guarantee on the order they run in::
+
+        results = run_many(['rpm -q katello', 'hostname -f'])
+
+    :return: A list of SSHCommandResult in the same order as ``cmds``.
+    """
+    hostname = hostname or settings.server.hostname
+    if timeout is None:
+        timeout = settings.ssh_client.command_timeout
+    if connection_timeout is None:
+        connection_timeout = settings.ssh_client.connection_timeout
+    with get_pooled_connection(hostname=hostname, username=username,
+                               password=password, key_filename=key_filename,
+                               timeout=connection_timeout) as connection:
+        return execute_many(
+            cmds, connection, output_format, timeout, connection_timeout,
+            concurrency
+        )
 
 
 def is_ssh_pub_key(key):
@@ -17,7 +17,6 @@ except ImportError:
     sauceclient = None
 
 from fauxfactory import gen_string
-from nailgun import entities
 from robottelo import manifests
 from robottelo.config import settings
 from robottelo.constants import (
@@ -350,6 +349,8 @@ class UITestCase(TestCase):
         """TestCases can overwrite this method to create a different
         organization object for the session.
         """
+        # NailGun is only needed by the UI tests
+        from nailgun import entities
         cls.session_org = entities.Organization(
             id=DEFAULT_ORG_ID, name=DEFAULT_ORG
         )
@@ -359,6 +360,7 @@ class UITestCase(TestCase):
         """Creates a new user for each session this method can be overwritten
         in TestCases in order to get different default user
         """
+        from nailgun import entities
         try:
             username = gen_string('alpha')
             cls.session_user = entities.User(
@@ -1,9 +1,18 @@
 # -*- encoding: utf-8 -*-
-"""Implements different locators for UI"""
+"""Implements different locators for UI
 
-from selenium.webdriver.common.by import By  # noqa
-from .model import Locator, LocatorDict  # noqa
-from .menu import menu_locators  # noqa
-from .tab import tab_locators  # noqa
-from .common import common_locators  # noqa
-from .base import locators  # noqa
+The locators are built, and selenium imported, when first used, see
+:mod:`robottelo.lazy`.
+"""
+from robottelo.lazy import lazy_imports
+
+__getattr__ = lazy_imports(
+    __name__,
+    By='selenium.webdriver.common.by:By',
+    Locator='robottelo.ui.locators.model:Locator',
+    LocatorDict='robottelo.ui.locators.model:LocatorDict',
+    menu_locators='robottelo.ui.locators.menu:menu_locators',
+    tab_locators='robottelo.ui.locators.tab:tab_locators',
+    common_locators='robottelo.ui.locators.common:common_locators',
+    locators='robottelo.ui.locators.base:locators',
+)
@@ -11,8 +11,12 @@ snap-guest and its dependencies and the ``image_dir`` path created.
 """
 import logging
 import os
+import re
 import six
+import threading
+import time
 
+from collections import OrderedDict
 from fauxfactory import gen_string
 
 from robottelo import ssh
@@ -29,6 +33,85 @@ else:  # pragma: no cover
 
 logger = logging.getLogger(__name__)
 
+# how long each phase of the virtual machine boot can take
+READY_TIMEOUT = 120
+# the intervals between readiness probes grow exponentially from the minimum
+# to the maximum
+READY_POLL_MIN_INTERVAL = 0.25
+READY_POLL_MAX_INTERVAL = 4
+# how long a single readiness probe can take
+PROBE_TIMEOUT = 10
+BOOT_PHASES = ('clone', 'boot', 'dhcp', 'sshd')
+
+_DOMIFADDR_IP_RE = re.compile(r'\bipv4\s+(\d+\.\d+\.\d+\.\d+)/')
+_PING_IP_RE = re.compile(r'\((\d+\.\d+\.\d+\.\d+)\)')
+
+_boot_stats = {}
+_boot_stats_lock = threading.Lock()
+
+
+def _poll(probe, timeout=None):
+    """Call probe until it returns a true value, waiting exponentially
+    longer between the calls. Return the value, None after ``timeout``
+    seconds, ``READY_TIMEOUT`` by default.
+
+    A probe command which times out counts as a not ready answer.
+    """
+    if timeout is None:
+        timeout = READY_TIMEOUT
+    deadline = time.time() + timeout
+    interval = READY_POLL_MIN_INTERVAL
+    while True:
+        try:
+            value = probe()
+        except ssh.SSHCommandTimeoutError as err:
+            logger.debug('Probe timed out: %s', err)
+            value = None
+        if value:
+            return value
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, READY_POLL_MAX_INTERVAL)
+
+
+def _record_boot_timings(timings):
+    """Add the boot phases timings of a virtual machine to the stats"""
+    with _boot_stats_lock:
+        for phase, phase_time in timings.items():
+            stats = _boot_stats.setdefault(
+                phase, {'count': 0, 'total_time': 0, 'max_time': 0})
+            stats['count'] += 1
+            stats['total_time'] += phase_time
+            stats['max_time'] = max(stats['max_time'], phase_time)
+
+
+def get_boot_stats():
+    """Return the number of virtual machines which went through each boot
+    phase in this process, with the total and maximum time in seconds spent
+    in the phase, by phase name.
+    """
+    with _boot_stats_lock:
+        return {phase: dict(stats) for phase, stats in _boot_stats.items()}
+
+
+def reset_boot_stats():
+    """Reset the boot stats"""
+    with _boot_stats_lock:
+        _boot_stats.clear()
+
+
+def format_boot_stats():
+    """Return the boot stats as text lines, in the order of the phases"""
+    stats = get_boot_stats()
+    return [
+        '{0}: {count} vms, average {1:.1f}s (max {max_time:.1f}s)'.format(
+            phase, stats[phase]['total_time'] / stats[phase]['count'],
+            **stats[phase])
+        for phase in BOOT_PHASES if phase in stats
+    ]
+
 
 class VirtualMachineError(Exception):
     """Exception raised for failed virtual machine management operations"""
@@ -110,6 +193,15 @@ class VirtualMachine(object):
         self._domain = domain
         self._created = False
         self._subscribed = False
+        # the time in seconds spent in each boot phase by create
+        self.boot_timings = OrderedDict()
+        # the warm pool which handed out this virtual machine, see
+        # robottelo.vm_pool
+        self._pool = None
+        # whether create can take over a warm pool virtual machine, not for
+        # the ones the pools create
+        self._adopt_warm = True
+        self._custom_name = bool(hostname or tag or target_image)
         self._source_image = source_image or u'{0}-base'.format(self.distro)
         self._target_image = (
             target_image or gen_string('alphanumeric', 16).lower()
@@ -166,6 +258,8 @@ class VirtualMachine(object):
         """
         if self._created:
             return
+        if self._adopt_warm_vm():
+            return
 
         command_args = [
             'snap-guest',
@@ -205,6 +299,7 @@ class VirtualMachine(object):
 
         )
 
+        start = time.time()
         result = ssh.command(
                 command,
                 self.provisioning_server,
@@ -216,41 +311,128 @@ class VirtualMachine(object):
                 u'Failed to run snap-guest: {0}'.format(result.stderr))
         else:
             self._created = True
-
-        # outside of VLANs ping from hypervisor, in VLANs ping from SAT
-        if self.bridge == 'br0':
-            ping_from_hostname = self.provisioning_server
-        else:
-            ping_from_hostname = settings.server.hostname
-
-        # Give some time to machine boot
-        result = ssh.command(
-            u'for i in {{1..60}}; do ping -c1 {0}.local && exit 0; sleep 1;'
-            u' done; exit 1'.format(self._target_image),
-            ping_from_hostname,
-            connection_timeout=30
-        )
-        if result.return_code != 0:
-            logger.error('Failed to obtain VM IP, reverting changes')
-            self.destroy()
-            raise VirtualMachineError(
-                'Failed to fetch virtual machine IP address information')
-        output = ''.join(result.stdout)
-        self.ip_addr = output.split('(')[1].split(')')[0]
-        ssh_check = ssh.command(
-            u'for i in {{1..60}}; do nc -vn {0} 22 <<< "" && exit 0; sleep 1;'
-            u' done; exit 1'.format(self.ip_addr),
-            self.provisioning_server,
-            connection_timeout=30
-        )
-        if ssh_check.return_code != 0:
-            logger.error('Failed to SSH to the VM, reverting changes')
+        self.boot_timings['clone'] = time.time() - start
+        try:
+            self._wait_ready()
+        except Exception:
+            logger.error('Virtual machine not ready, reverting changes')
             self.destroy()
-            raise VirtualMachineError(
-                'Failed to connect to SSH port of the virtual machine')
+            raise
+        finally:
+            _record_boot_timings(self.boot_timings)
+        logger.info(u'Virtual machine {0} ready: {1}'.format(
+            self.hostname, ', '.join(
+                '{0} {1:.1f}s'.format(phase, phase_time)
+                for phase, phase_time in self.boot_timings.items())))
+
+    def _wait_ready(self):
+        """Wait for the virtual machine to run, to get an IP address and for
+        its sshd to answer, recording the time of each phase.
+
+        The probes run on a single connection to the provisioning server.
+        """
+        with ssh.get_pooled_connection(
+                hostname=self.provisioning_server,
+                timeout=30) as connection:
+            def run(cmd):
+                return ssh.execute_command(
+                    cmd, connection, timeout=PROBE_TIMEOUT,
+                    connection_timeout=30)
+
+            phases = (
+                ('boot', self._probe_running,
+                 'Virtual machine did not start'),
+                ('dhcp', self._probe_ip_addr,
+                 'Failed to fetch virtual machine IP address information'),
+                ('sshd', self._probe_sshd,
+                 'Failed to connect to SSH port of the virtual machine'),
+            )
+            for phase, probe, error in phases:
+                start = time.time()
+                ready = _poll(lambda: probe(run))
+                self.boot_timings[phase] = time.time() - start
+                if not ready:
+                    raise VirtualMachineError(error)
+
+    def _probe_running(self, run):
+        """Return whether the virtual machine is running"""
+        result = run(u'virsh domstate {0}'.format(self.target_image))
+        return (result.return_code == 0 and
+                ''.join(result.stdout).strip() == 'running')
+
+    def _probe_ip_addr(self, run):
+        """Return the IP address of the virtual machine, None when not
+        known yet.
+
+        The address is read from the libvirt DHCP leases of its network, or
+        from the ARP table of the provisioning server for bridges. When
+        libvirt does not know it, the virtual machine is pinged by name, from
+        the provisioning server on the ``br0`` bridge and from the satellite
+        otherwise.
+        """
+        source = 'lease' if self.nw_type == 'network' else 'arp'
+        result = run(u'virsh domifaddr {0} --source {1}'.format(
+            self.target_image, source))
+        match = None
+        if result.return_code == 0:
+            match = _DOMIFADDR_IP_RE.search('\n'.join(result.stdout))
+        if match is None:
+            ping = u'ping -c1 -W1 {0}.local'.format(self._target_image)
+            if self.bridge == 'br0':
+                result = run(ping)
+            else:
+                result = ssh.command(
+                    ping, settings.server.hostname, timeout=PROBE_TIMEOUT,
+                    connection_timeout=30)
+            if result.return_code == 0:
+                match = _PING_IP_RE.search(''.join(result.stdout))
+        if match is not None:
+            self.ip_addr = match.group(1)
+        return self.ip_addr
+
+    def _probe_sshd(self, run):
+        """Return whether the sshd of the virtual machine answers"""
+        result = run(
+            u'timeout 2 bash -c \'read -r banner < /dev/tcp/{0}/22 && '
+            u'[[ $banner == SSH-* ]]\''.format(self.ip_addr))
+        return result.return_code == 0
+
+    def _get_pool_key(self):
+        """Return what identifies the warm pool virtual machines which can
+        stand for this one, None if it can not be replaced by one.
+        """
+        if type(self) is not VirtualMachine or self._custom_name:
+            return None
+        return (self.distro, self.cpu, self.ram, self.provisioning_server,
+                self.image_dir, self._domain, self._source_image, self.bridge,
+                self.network)
+
+    def _adopt_warm_vm(self):
+        """Take over a matching virtual machine of the default warm pool,
+        return whether one was taken.
+        """
+        # imported here, robottelo.vm_pool depends on this module
+        from robottelo.vm_pool import get_default_pool
+        pool = get_default_pool()
+        key = self._get_pool_key()
+        if pool is None or key is None or not self._adopt_warm:
+            return False
+        warm_vm = pool.take(key)
+        if warm_vm is None:
+            return False
+        for name in ('_target_image', 'ip_addr', 'bridge', 'network',
+                     'nw_type', '_created'):
+            setattr(self, name, getattr(warm_vm, name))
+        logger.info(u'Took over warm virtual machine {0}'.format(
+            self.hostname))
+        return True
 
     def destroy(self):
         """Destroys the virtual machine on the provisioning server"""
+        if self._pool is not None:
+            # handed out by a warm pool, which destroys it in background
+            self._pool.release(self)
+            return
         logger.info('Destroying the VM')
         if not self._created:
             return
@@ -1,5 +1,15 @@
-"""Virtual machine client provisioning with satellite capsule product setup"""
+"""Virtual machine client provisioning with satellite capsule product setup
+
+Installing and configuring a capsule takes about 40 minutes. When the
+``golden_image`` option of the ``capsule`` section is enabled, a capsule is
+installed and configured once for the satellite, then saved as a base image on
+the provisioning server. The capsule virtual machines are cloned from it and
+only get their own hostname, certificates and registration to the satellite,
+the installer configuring only them with the ``IDENTITY_SCENARIO`` scenario.
+"""
+import hashlib
 import logging
+import re
 import time
 
 import os
@@ -12,20 +22,127 @@ from robottelo.constants import (
     SATELLITE_FIREWALL_SERVICE_NAME,
 )
 from robottelo.decorators import bz_bug_is_open, setting_is_set
+from robottelo.decorators.func_locker import lock_function
 from robottelo.cli.capsule import Capsule
 from robottelo.cli.host import Host
 from robottelo.helpers import extract_capsule_satellite_installer_command
-from robottelo.ssh import download_file, upload_file
-from robottelo.vm import VirtualMachine
+from robottelo.ssh import download_file
+from robottelo.vm import _poll, VirtualMachine
 from tempfile import mkstemp
 
 logger = logging.getLogger(__name__)
 
+# the libvirt images location, used by snap-guest when the clients image_dir
+# option is not set
+DEFAULT_IMAGE_DIR = '/var/lib/libvirt/images'
+# how long building a golden image can take, the workers needing it wait for
+# the one building it
+GOLDEN_IMAGE_BUILD_TIMEOUT = 7200
+# how long a virtual machine can take to shut down
+SHUTDOWN_TIMEOUT = 300
+# the satellite CA signing the capsule certificates
+SATELLITE_CA_CERT = '/etc/pki/katello/certs/katello-default-ca.crt'
+# the installer scenarios location on the capsule
+INSTALLER_SCENARIOS_DIR = '/etc/foreman-installer/scenarios.d'
+# the installer scenario of the golden image, configuring only the modules
+# giving a cloned capsule its certificates and registration to the satellite
+IDENTITY_SCENARIO = 'capsule-identity'
+IDENTITY_MODULES = ('certs', 'foreman_proxy', 'foreman_proxy_content')
+# how long the installer takes to install and configure a capsule, and to
+# give a cloned capsule its identity
+INSTALLER_TIMEOUT = 1500
+IDENTITY_INSTALLER_TIMEOUT = 600
+
 
 class CapsuleVirtualMachineError(Exception):
     """Exception raised for failed capsule virtual machine operations"""
 
 
+def _get_satellite_ca_fingerprint():
+    """Return the fingerprint of the satellite CA signing the capsule
+    certificates, which changes when the satellite is reinstalled or its
+    certificates regenerated.
+    """
+    result = ssh.command(
+        u'openssl x509 -noout -fingerprint -sha256 -in {0}'.format(
+            SATELLITE_CA_CERT),
+        hostname=settings.server.hostname
+    )
+    if result.return_code != 0:
+        raise CapsuleVirtualMachineError(
+            u'Failed to read the satellite CA fingerprint\n{0}'.format(
+                result.stderr))
+    return u''.join(result.stdout).strip()
+
+
+def get_golden_image_name(distro):
+    """Return the name of the capsule golden image of ``distro``, for the
+    configured satellite, its CA and the capsule repository.
+    """
+    digest = hashlib.md5(u'{0} {1} {2} {3}'.format(
+        distro, settings.server.hostname, _get_satellite_ca_fingerprint(),
+        settings.capsule_repo
+    ).encode('utf-8')).hexdigest()
+    return u'{0}-capsule-{1}'.format(distro, digest[:12])
+
+
+@lock_function(timeout=GOLDEN_IMAGE_BUILD_TIMEOUT)
+def get_golden_image(distro, provisioning_server=None, image_dir=None,
+                     cpu=4, ram=16384):
+    """Return the name of the capsule golden image of ``distro``, building
+    it when the provisioning server does not have it yet.
+
+    The image is built from a capsule virtual machine installed and
+    configured as usual, shut down and flattened into a standalone base
+    image, usable as snap-guest source image.
+    """
+    if provisioning_server is None:
+        provisioning_server = settings.clients.provisioning_server
+    if image_dir is None:
+        image_dir = settings.clients.image_dir or DEFAULT_IMAGE_DIR
+    name = get_golden_image_name(distro)
+    image_path = os.path.join(image_dir, u'{0}.img'.format(name))
+
+    def run(cmd, timeout=None):
+        return ssh.command(
+            cmd, hostname=provisioning_server, timeout=timeout,
+            connection_timeout=30)
+
+    if run(u'test -f {0}'.format(image_path)).return_code == 0:
+        return name
+    logger.info(u'Building capsule golden image {0}'.format(image_path))
+    builder = CapsuleVirtualMachine(
+        cpu=cpu, ram=ram, distro=distro,
+        provisioning_server=provisioning_server, image_dir=image_dir,
+        golden_image=False
+    )
+    with builder:
+        builder._add_identity_scenario()
+        # the clones get their own name resolution
+        builder.run(u'sed -i \'/{0}/d\' /etc/hosts'.format(builder.hostname))
+        run(u'virsh shutdown {0}'.format(builder.target_image))
+        if not _poll(
+                lambda: ''.join(run(u'virsh domstate {0}'.format(
+                    builder.target_image)).stdout).strip() == 'shut off',
+                SHUTDOWN_TIMEOUT):
+            raise CapsuleVirtualMachineError(
+                u'Failed to shut down {0}'.format(builder.hostname))
+        # flatten the snap-guest image, which depends on its base image
+        result = run(
+            u'qemu-img convert -O qcow2 {0} {1}.tmp && mv {1}.tmp {1}'.format(
+                os.path.join(image_dir, u'{0}.img'.format(
+                    builder.target_image)),
+                image_path
+            ),
+            timeout=1800
+        )
+        if result.return_code != 0:
+            raise CapsuleVirtualMachineError(
+                u'Failed to save capsule golden image {0}\n{1}'.format(
+                    image_path, result.stderr))
+    return name
+
+
 class CapsuleVirtualMachine(VirtualMachine):
     """Virtual machine client provisioning with satellite capsule product
     setup
@@ -34,7 +151,7 @@ class CapsuleVirtualMachine(VirtualMachine):
     def __init__(
             self, cpu=4, ram=16384, distro=None, provisioning_server=None,
             image_dir=None, org_id=None, lce_id=None,
-            organization_ids=None, location_ids=None):
+            organization_ids=None, location_ids=None, golden_image=None):
         """Manage a virtual machine with satellite capsule product setup for
         client provisioning.
 
@@ -55,6 +172,9 @@ class CapsuleVirtualMachine(VirtualMachine):
          organizations that will use the capsule.
         :param List[int] location_ids: the location ids for which the content
          will be synchronized.
+        :param bool golden_image: whether to clone the virtual machine from
+         the capsule golden image, instead of installing the capsule. Defaults
+         to the ``golden_image`` option of the ``capsule`` section.
         """
         # ensure that capsule configuration exist and validate
         if not setting_is_set('capsule'):
@@ -92,6 +212,10 @@ class CapsuleVirtualMachine(VirtualMachine):
         self._capsule = None
         self._capsule_org = None
         self._capsule_lce = None
+        if golden_image is None:
+            golden_image = settings.capsule.golden_image
+        self._golden_image = golden_image
+        self._satellite_hosts_entry = False
 
     @property
     def hostname_local(self):
@@ -132,6 +256,7 @@ class CapsuleVirtualMachine(VirtualMachine):
             .format(self._capsule_hostname, self.ip_addr),
             hostname=settings.server.hostname
         )
+        self._satellite_hosts_entry = True
         if self.distro[:-1] == DISTRO_RHEL7:
             self.run('hostnamectl set-hostname {}'.format(
                 self._capsule_hostname))
@@ -174,6 +299,21 @@ class CapsuleVirtualMachine(VirtualMachine):
             self.run('firewall-cmd --zone=public --add-service={}'.format(
                 SATELLITE_FIREWALL_SERVICE_NAME))
 
+    def _remove_satellite_name_resolution(self):
+        """Remove the capsule record from the satellite hosts file"""
+        if not self._satellite_hosts_entry:
+            return
+        result = ssh.command(
+            u'sed -i \'/{0}/d\' /etc/hosts'.format(self._capsule_hostname),
+            hostname=settings.server.hostname
+        )
+        if result.return_code != 0:
+            logger.error(
+                u'Failed to remove {0} from the satellite hosts file\n{1}'
+                .format(self._capsule_hostname, result.stderr))
+            return
+        self._satellite_hosts_entry = False
+
     def _capsule_cleanup(self):
         """make the necessary cleanup in case of a crash"""
         if self._subscribed:
@@ -222,6 +362,42 @@ class CapsuleVirtualMachine(VirtualMachine):
         """Prepare the virtual machine to host a capsule node"""
         # setup the name resolution
         self._capsule_setup_name_resolution()
+        self._install_capsule()
+        self._configure_capsule()
+
+    def _setup_capsule_identity(self):
+        """Give a capsule cloned from the golden image its own hostname,
+        certificates and registration to the satellite
+        """
+        self._capsule_setup_name_resolution()
+        self._configure_capsule(scenario=IDENTITY_SCENARIO)
+
+    def _add_identity_scenario(self):
+        """Add to the installed capsule the ``IDENTITY_SCENARIO`` installer
+        scenario, a copy of the scenario it was installed with where only the
+        ``IDENTITY_MODULES`` are enabled.
+        """
+        script = (
+            'dir = "{0}"; '
+            'scenario = YAML.load_file("#{{dir}}/last_scenario.yaml"); '
+            'answers = YAML.load_file(scenario[:answer_file]); '
+            'answers.each_key {{ |name| answers[name] = false '
+            'unless %w({1}).include?(name) }}; '
+            'scenario[:name] = "{2}"; '
+            'scenario[:answer_file] = "#{{dir}}/{2}-answers.yaml"; '
+            'File.write(scenario[:answer_file], answers.to_yaml); '
+            'File.write("#{{dir}}/{2}.yaml", scenario.to_yaml)'
+            .format(INSTALLER_SCENARIOS_DIR, ' '.join(IDENTITY_MODULES),
+                    IDENTITY_SCENARIO)
+        )
+        result = self.run(u"ruby -ryaml -e '{0}'".format(script))
+        if result.return_code != 0:
+            raise CapsuleVirtualMachineError(
+                u'Failed to add the {0} installer scenario\n{1}'.format(
+                    IDENTITY_SCENARIO, result.stderr))
+
+    def _install_capsule(self):
+        """Install the capsule packages"""
         logger.info('adding repofiles required for capsule installation')
         self.create_custom_repos(
             capsule=settings.capsule_repo,
@@ -238,6 +414,15 @@ class CapsuleVirtualMachine(VirtualMachine):
                 u'Failed to install satellite-capsule package\n{}'.format(
                     result.stderr)
             )
+
+    def _configure_capsule(self, scenario=None):
+        """Generate the capsule certificates and run the installer, which
+        registers the capsule to the satellite
+
+        :param str scenario: the installer scenario replacing the one of the
+         generated installer command, to only replace the certificates and
+         registration of an already configured capsule.
+        """
         cert_file_path = '/tmp/{0}-certs.tar'.format(self.hostname)
         certs_gen = ssh.command(
             'capsule-certs-generate '
@@ -251,26 +436,15 @@ class CapsuleVirtualMachine(VirtualMachine):
                 .format(certs_gen.stderr)
             )
         # copy the certificate to capsule vm
-        _, temporary_local_cert_file_path = mkstemp(suffix='-certs.tar')
-        logger.info(
-            'downloading the certs file: {0}'.format(cert_file_path)
-        )
-        download_file(
-            remote_file=cert_file_path,
-            local_file=temporary_local_cert_file_path,
-            hostname=settings.server.hostname
-        )
         logger.info(
-            'uploading the certs file: {0}'.format(cert_file_path)
+            'transferring the certs file: {0}'.format(cert_file_path)
         )
-        upload_file(
-            key_filename=settings.server.ssh_key,
-            local_file=temporary_local_cert_file_path,
-            remote_file=cert_file_path,
-            hostname=self.ip_addr
+        ssh.transfer_file(
+            cert_file_path,
+            source_hostname=settings.server.hostname,
+            destination_hostname=self.ip_addr,
+            destination_key_filename=settings.server.ssh_key
         )
-        # delete the temporary file
-        os.remove(temporary_local_cert_file_path)
 
         installer_cmd = extract_capsule_satellite_installer_command(
                             certs_gen.stdout
@@ -279,7 +453,14 @@ class CapsuleVirtualMachine(VirtualMachine):
             if '--scenario foreman-proxy-content' in installer_cmd:
                 installer_cmd = installer_cmd.replace(
                      '--scenario foreman-proxy-content', '--scenario capsule')
-        result = self.run(installer_cmd, timeout=1500)
+        timeout = INSTALLER_TIMEOUT
+        if scenario is not None:
+            installer_cmd = re.sub(
+                r'--scenario \S+', u'--scenario {0}'.format(scenario),
+                installer_cmd
+            ) + ' --certs-update-all'
+            timeout = IDENTITY_INSTALLER_TIMEOUT
+        result = self.run(installer_cmd, timeout=timeout)
         if result.return_code != 0:
             # before exit download the capsule log file
             _, log_path = mkstemp(prefix='capsule_external-', suffix='.log')
@@ -307,9 +488,16 @@ class CapsuleVirtualMachine(VirtualMachine):
                     'pulp_celerybeat service not running')
 
     def create(self):
+        if self._golden_image and not self._created:
+            self._source_image = get_golden_image(
+                self.distro, provisioning_server=self.provisioning_server,
+                image_dir=self.image_dir, cpu=self.cpu, ram=self.ram)
         super(CapsuleVirtualMachine, self).create()
         try:
-            self._setup_capsule()
+            if self._golden_image:
+                self._setup_capsule_identity()
+            else:
+                self._setup_capsule()
         except Exception:
             # handle exception as VirtualMachine has no exception handling
             # in __enter__ function
@@ -380,5 +568,10 @@ class CapsuleVirtualMachine(VirtualMachine):
 
     def destroy(self):
         """Destroys the virtual machine on the provisioning server"""
-        self._capsule_cleanup()
+        try:
+            self._capsule_cleanup()
+        finally:
+            # the satellite is shared, do not leave records of the removed
+            # capsules
+            self._remove_satellite_name_resolution()
         super(CapsuleVirtualMachine, self).destroy()
@@ -0,0 +1,188 @@
+"""Fleets of client virtual machines created and destroyed concurrently
+
+Creating and destroying a client are chains of blocking SSH calls to the
+provisioning server. A :class:`VirtualMachineFleet` runs them for all its
+virtual machines at the same time, at most ``max_parallel`` by provisioning
+server, and can be used as a context manager::
+
+    with VirtualMachineFleet(10, distro=DISTRO_RHEL7) as fleet:
+        results = fleet.run('rpm -q katello-agent')
+        for vm, result in zip(fleet, results):
+            ...
+
+When some virtual machines can not be created, the others are destroyed and
+:class:`VirtualMachineFleetError` is raised.
+"""
+import logging
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from robottelo.vm import VirtualMachine, VirtualMachineError
+
+logger = logging.getLogger(__name__)
+
+# the number of virtual machines created or destroyed at the same time on a
+# provisioning server
+MAX_PARALLEL_PER_SERVER = 5
+# the number of commands run at the same time by VirtualMachineFleet.run
+MAX_PARALLEL_RUNS = 20
+
+
+class VirtualMachineFleetError(VirtualMachineError):
+    """Indicates some virtual machines of a fleet failed an operation.
+
+    :param str operation: The name of the operation which failed.
+    :param list vms: The virtual machines of the fleet.
+    :param list results: The results of the operation, in the order of
+        ``vms``, with ``None`` in place of the failed ones.
+    :param dict errors: The exception raised by the operation for each
+        virtual machine which failed it, by index.
+    """
+
+    def __init__(self, operation, vms, results, errors):
+        self.vms = vms
+        self.results = results
+        self.errors = errors
+        msg = u'Failed to {0} {1} of {2} virtual machines:'.format(
+            operation, len(errors), len(vms))
+        for index in sorted(errors):
+            msg += u'\n#{0} {1}: {2}'.format(
+                index, vms[index].hostname, errors[index])
+        super(VirtualMachineFleetError, self).__init__(msg)
+
+
+def _map_concurrently(function, items, lanes, group_key=None):
+    """Call ``function`` with every item of ``items``, running at most
+    ``lanes`` calls at the same time for each group of items with the same
+    ``group_key``.
+
+    :return: A tuple with the results, in the order of ``items`` with
+        ``None`` in place of the failed calls, and the exceptions raised by
+        the failed calls, by index.
+    """
+    results = [None] * len(items)
+    errors = {}
+    groups = OrderedDict()
+    for index, item in enumerate(items):
+        key = None if group_key is None else group_key(item)
+        groups.setdefault(key, []).append(index)
+
+    def call(index):
+        try:
+            results[index] = function(items[index])
+        except Exception as err:
+            errors[index] = err
+
+    executors = []
+    try:
+        for indexes in groups.values():
+            executor = ThreadPoolExecutor(
+                max_workers=max(1, min(lanes, len(indexes))))
+            executors.append(executor)
+            for index in indexes:
+                executor.submit(call, index)
+    finally:
+        for executor in executors:
+            executor.shutdown(wait=True)
+    return results, errors
+
+
+class VirtualMachineFleet(object):
+    """Manages virtual machines created and destroyed together.
+
+    :param int count: The number of virtual machines to create, with the
+        :class:`robottelo.vm.VirtualMachine` arguments of ``vm_kwargs``.
+    :param list vms: The virtual machines of the fleet, instead of
+        ``count``.
+    :param int max_parallel: The maximum number of virtual machines created
+        or destroyed at the same time on a provisioning server. Defaults to
+        ``MAX_PARALLEL_PER_SERVER``.
+    """
+
+    def __init__(self, count=None, vms=None, max_parallel=None, **vm_kwargs):
+        if (count is None) == (vms is None):
+            raise ValueError('Either count or vms must be provided')
+        if vms is None:
+            vms = [VirtualMachine(**vm_kwargs) for _ in range(count)]
+        elif vm_kwargs:
+            raise ValueError(
+                'Virtual machine arguments can not be given with vms')
+        if max_parallel is None:
+            max_parallel = MAX_PARALLEL_PER_SERVER
+        self.vms = list(vms)
+        self.max_parallel = max_parallel
+
+    def __len__(self):
+        return len(self.vms)
+
+    def __iter__(self):
+        return iter(self.vms)
+
+    def __getitem__(self, index):
+        return self.vms[index]
+
+    def _map(self, function):
+        """Call ``function`` with every virtual machine, at most
+        ``max_parallel`` at the same time by provisioning server.
+        """
+        return _map_concurrently(
+            function, self.vms, self.max_parallel,
+            lambda vm: vm.provisioning_server
+        )
+
+    def create(self):
+        """Create all the virtual machines.
+
+        :raises VirtualMachineFleetError: If any virtual machine could not be
+            created, once all the virtual machines are destroyed.
+        """
+        results, errors = self._map(lambda vm: vm.create())
+        if errors:
+            logger.error('Failed to create the fleet, destroying it')
+            _, destroy_errors = self._map(lambda vm: vm.destroy())
+            for index in sorted(destroy_errors):
+                logger.error(u'Failed to destroy {0}: {1}'.format(
+                    self.vms[index].hostname, destroy_errors[index]))
+            raise VirtualMachineFleetError('create', self.vms, results, errors)
+
+    def destroy(self):
+        """Destroy all the virtual machines.
+
+        :raises VirtualMachineFleetError: If any virtual machine could not be
+            destroyed, once the others are.
+        """
+        results, errors = self._map(lambda vm: vm.destroy())
+        if errors:
+            raise VirtualMachineFleetError(
+                'destroy', self.vms, results, errors)
+
+    def run(self, cmd, timeout=None, concurrency=None):
+        """Run a command on all the virtual machines.
+
+        :param str cmd: The command to run.
+        :param int timeout: Time to wait for the command on each virtual
+            machine.
+        :param int concurrency: The maximum number of virtual machines
+            running the command at the same time. Defaults to
+            ``MAX_PARALLEL_RUNS``.
+        :return: A list of SSHCommandResult in the order of the virtual
+            machines.
+        :raises VirtualMachineFleetError: If the command could not be run on
+            some virtual machines. The results of the others can be found in
+            its ``results``.
+        """
+        if concurrency is None:
+            concurrency = MAX_PARALLEL_RUNS
+        results, errors = _map_concurrently(
+            lambda vm: vm.run(cmd, timeout=timeout), self.vms, concurrency)
+        if errors:
+            raise VirtualMachineFleetError('run', self.vms, results, errors)
+        return results
+
+    def __enter__(self):
+        self.create()
+        return self
+
+    def __exit__(self, *exc):
+        self.destroy()
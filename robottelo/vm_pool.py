@@ -0,0 +1,268 @@
+"""Warm pool of client virtual machines
+
+Provisioning a client with snap-guest, waiting for it to boot and for its
+sshd to answer takes minutes, paid by every test using a client. A
+:class:`VirtualMachinePool` keeps ``size`` booted virtual machines, with their
+SSH port open, ready for each of its distros, creating them in background
+threads.
+
+:meth:`VirtualMachinePool.get` hands out one of them as a
+:class:`robottelo.vm.VirtualMachine`. Its
+:meth:`~robottelo.vm.VirtualMachine.destroy`, also called when leaving its
+context manager, hands it back to the pool, which destroys it in background
+and creates a fresh one::
+
+    pool = VirtualMachinePool(size=2, distros=[DISTRO_RHEL7])
+    pool.start()
+    with pool.get(DISTRO_RHEL7) as vm:
+        result = vm.run('ls')
+
+The tests change the clients they use, so the machines handed out are never
+handed out again.
+
+The default pool is configured by the ``pool_size`` and ``pool_distros``
+options of the ``clients`` section and started with
+:func:`start_default_pool`. The virtual machines created with the default
+options, like ``VirtualMachine(distro=DISTRO_RHEL7)``, then take over one of
+its machines instead of being provisioned. Pools belong to a process, every
+pytest-xdist worker warms its own machines.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from robottelo.config import settings
+from robottelo.vm import VirtualMachine, VirtualMachineError
+
+logger = logging.getLogger(__name__)
+
+# how many virtual machines of a distro can fail to be created in a row before
+# the pool stops creating them
+MAX_FAILURES = 3
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+class VirtualMachinePool(object):
+    """Keeps ``size`` booted virtual machines ready for each distro of
+    ``distros``.
+
+    :param size: the number of virtual machines kept ready by distro.
+    :param distros: the distros of the virtual machines.
+    :param prepare: a function called with each created virtual machine
+        before it is ready, to install what the tests need.
+    :param vm_kwargs: the other arguments of the virtual machines.
+    """
+
+    def __init__(self, size=1, distros=None, prepare=None, **vm_kwargs):
+        self.size = size
+        self.distros = list(distros or [])
+        self.prepare = prepare
+        self.vm_kwargs = vm_kwargs
+        self._condition = threading.Condition()
+        # the ready virtual machines with their pool key, by distro
+        self._ready = {distro: [] for distro in self.distros}
+        # the number of virtual machines being created, by distro
+        self._pending = {distro: 0 for distro in self.distros}
+        self._failures = {distro: 0 for distro in self.distros}
+        self._threads = set()
+        self._started = False
+        self._closed = False
+
+    def start(self):
+        """Start creating the virtual machines in background"""
+        with self._condition:
+            if self._started:
+                return
+            self._started = True
+        atexit.register(self.close)
+        for distro in self.distros:
+            self._fill(distro)
+
+    def _start_thread(self, target, *args):
+        """Run target in a background thread, waited for by :meth:`close`"""
+        def run():
+            try:
+                target(*args)
+            finally:
+                with self._condition:
+                    self._threads.discard(thread)
+                    self._condition.notify_all()
+
+        thread = threading.Thread(
+            target=run, name='vm pool {0}'.format(target.__name__))
+        with self._condition:
+            self._threads.add(thread)
+        thread.start()
+        return thread
+
+    def _fill(self, distro):
+        """Start creating the virtual machines missing to ``distro``"""
+        with self._condition:
+            if (self._closed or not self._started or
+                    self._failures[distro] >= MAX_FAILURES):
+                return
+            missing = (self.size - len(self._ready[distro]) -
+                       self._pending[distro])
+            if missing <= 0:
+                return
+            self._pending[distro] += missing
+        for _ in range(missing):
+            self._start_thread(self._warm, distro)
+
+    def _new_vm(self, distro):
+        """Return a created virtual machine of ``distro`` with its pool key"""
+        vm = VirtualMachine(distro=distro, **self.vm_kwargs)
+        # provision it, instead of taking a ready one of the default pool
+        vm._adopt_warm = False
+        key = vm._get_pool_key()
+        try:
+            vm.create()
+            if self.prepare is not None:
+                self.prepare(vm)
+        except Exception:
+            self._destroy(vm)
+            raise
+        return key, vm
+
+    def _warm(self, distro):
+        """Create a virtual machine and add it to the ready ones"""
+        try:
+            key, vm = self._new_vm(distro)
+        except Exception:
+            logger.exception(
+                'Failed to create a warm {0} virtual machine'.format(distro))
+            with self._condition:
+                self._pending[distro] -= 1
+                self._failures[distro] += 1
+                self._condition.notify_all()
+            return
+        with self._condition:
+            self._pending[distro] -= 1
+            self._failures[distro] = 0
+            if not self._closed:
+                self._ready[distro].append((key, vm))
+                self._condition.notify_all()
+                return
+        self._destroy(vm)
+
+    @staticmethod
+    def _destroy(vm):
+        """Destroy the virtual machine, logging the failures"""
+        try:
+            vm.destroy()
+        except Exception:
+            logger.exception(u'Failed to destroy virtual machine {0}'.format(
+                vm.hostname))
+
+    def get(self, distro, timeout=None):
+        """Hand out a ready virtual machine of ``distro``.
+
+        Waits for the virtual machines being created when none is ready, or
+        creates one when none is being created.
+
+        :param distro: one of the distros of the pool.
+        :param timeout: the maximum time in seconds to wait for a virtual
+            machine being created, no limit if None.
+        :raises robottelo.vm.VirtualMachineError: if ``distro`` is not a
+            distro of the pool.
+        """
+        if distro not in self._ready:
+            raise VirtualMachineError(
+                u'{0} is not a distro of the pool. Choose one of {1}'
+                .format(distro, self.distros))
+        self.start()
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            ready = self._ready[distro]
+            while not ready and self._pending[distro] and not self._closed:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            vm = ready.pop(0)[1] if ready else None
+        self._fill(distro)
+        if vm is None:
+            logger.info('No warm {0} virtual machine ready, creating one'
+                        .format(distro))
+            _, vm = self._new_vm(distro)
+        vm._pool = self
+        return vm
+
+    def take(self, key):
+        """Remove and return a ready virtual machine of pool key ``key``, None
+        if there is none.
+        """
+        with self._condition:
+            for distro, ready in self._ready.items():
+                for index, (ready_key, vm) in enumerate(ready):
+                    if ready_key == key:
+                        del ready[index]
+                        break
+                else:
+                    continue
+                break
+            else:
+                return None
+        self._fill(distro)
+        return vm
+
+    def release(self, vm):
+        """Destroy in background a virtual machine handed out by :meth:`get`
+        """
+        vm._pool = None
+        self._start_thread(self._destroy, vm)
+
+    def close(self):
+        """Stop creating virtual machines, destroy the ready ones and wait
+        for the background creations and destructions.
+        """
+        with self._condition:
+            self._closed = True
+            ready = [vm for vms in self._ready.values() for _, vm in vms]
+            for vms in self._ready.values():
+                del vms[:]
+            self._condition.notify_all()
+        for vm in ready:
+            self._start_thread(self._destroy, vm)
+        while True:
+            with self._condition:
+                threads = [
+                    thread for thread in self._threads
+                    if thread is not threading.current_thread()
+                ]
+            if not threads:
+                break
+            for thread in threads:
+                thread.join()
+
+
+def get_default_pool():
+    """Return the default pool, None if not started"""
+    return _default_pool
+
+
+def start_default_pool():
+    """Start the default pool as configured by the ``clients`` section,
+    return it, or None if its ``pool_size`` is 0.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None and settings.clients.pool_size:
+            _default_pool = VirtualMachinePool(
+                size=settings.clients.pool_size,
+                distros=settings.clients.pool_distros,
+            )
+            _default_pool.start()
+    return _default_pool
+
+
+def close_default_pool():
+    """Close the default pool, if started"""
+    global _default_pool
+    with _default_pool_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,117 @@
+"""Compare the time of decorating test classes methods with ``@shared`` and
+``@lock_function`` when finding the names of the decorating classes with
+:func:`robottelo.decorators.get_caller_class_name` and with the
+implementation it replaced, which called ``inspect.getouterframes`` for every
+frame, reading the source context of the whole stack.
+
+Decorations happen when pytest imports the test modules, so on every xdist
+worker. The benchmark builds a test module with many test case classes using
+both decorators and measures its import, at the depth of a pytest collection
+stack.
+
+Run it with::
+
+    python scripts/benchmark_decorator_collection.py [classes [classes ...]]
+
+"""
+from __future__ import print_function
+
+import importlib
+import inspect
+import sys
+import timeit
+
+from robottelo.decorators import func_locker
+
+# the module, shadowed by the shared decorator in the func_shared package
+shared_module = importlib.import_module(
+    'robottelo.decorators.func_shared.shared')
+
+# roughly the depth of the stack when pytest imports a test module
+COLLECTION_STACK_DEPTH = 60
+
+MODULE_HEADER = '''
+from robottelo.decorators.func_locker import lock_function
+from robottelo.decorators.func_shared.shared import shared
+'''
+
+CLASS_TEMPLATE = '''
+class SomeTestCase{0}(object):
+
+    @classmethod
+    @shared
+    def setUpClass(cls):
+        pass
+
+    @shared(scope_context='context')
+    def _shared_setup(self):
+        pass
+
+    @lock_function
+    def test_locked(self):
+        pass
+'''
+
+
+def legacy_get_caller_class_name(depth=2, stack_level=1):
+    """The class names discovery used by the decorators before
+    get_caller_class_name.
+    """
+    class_names = []
+    class_name = None
+    index = stack_level + 1
+    while class_name != '<module>' and index <= stack_level + depth + 1:
+        if class_name:
+            class_names.append(class_name)
+        class_name = inspect.getouterframes(inspect.currentframe())[index][3]
+        index += 1
+    class_names.reverse()
+    return '.'.join(class_names)
+
+
+def build_module(classes):
+    """Return the compiled source of a test module with ``classes`` test
+    case classes.
+    """
+    source = MODULE_HEADER + ''.join(
+        CLASS_TEMPLATE.format(index) for index in range(classes))
+    return compile(source, 'test_benchmark.py', 'exec')
+
+
+def import_module(code, depth=COLLECTION_STACK_DEPTH):
+    """Run the module code at ``depth`` frames deep."""
+    if depth:
+        return import_module(code, depth - 1)
+    exec(code, {'__name__': 'test_benchmark'})
+
+
+def measure(code, finder):
+    """Return the best time of importing the module with ``finder`` as
+    class names discovery function.
+    """
+    func_locker.get_caller_class_name = finder
+    shared_module.get_caller_class_name = finder
+    timer = timeit.Timer(lambda: import_module(code))
+    return min(timer.repeat(repeat=3, number=1))
+
+
+def main(sizes):
+    current = func_locker.get_caller_class_name
+    # decorations must not depend on the settings
+    shared_module._set_configured(True)
+    try:
+        print('{0:>8} {1:>12} {2:>12} {3:>8}'.format(
+            'classes', 'legacy (s)', 'current (s)', 'speedup'))
+        for size in sizes:
+            code = build_module(size)
+            legacy_time = measure(code, legacy_get_caller_class_name)
+            current_time = measure(code, current)
+            print('{0:>8} {1:>12.4f} {2:>12.4f} {3:>7.1f}x'.format(
+                size, legacy_time, current_time, legacy_time / current_time))
+    finally:
+        func_locker.get_caller_class_name = current
+        shared_module.get_caller_class_name = current
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [10, 50, 200])
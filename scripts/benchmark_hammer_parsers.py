@@ -0,0 +1,134 @@
+"""Compare time and memory of parsing hammer output as a whole with parsing it
+while it is read.
+
+Synthetic hammer ``list`` outputs are split in chunks the size of the ones
+read from an ssh channel, and parsed:
+
+* buffered: the chunks are joined and parsed like ``ssh.command`` does.
+* streamed: the chunks are parsed by ``hammer.iter_csv`` or
+  ``hammer.iter_json`` and all the rows are kept in a list.
+* iterated: same as streamed, but the rows are dropped once seen, like a
+  caller iterating over ``Base.iter_list`` would.
+
+Run it with::
+
+    python scripts/benchmark_hammer_parsers.py [rows [rows ...]]
+
+"""
+from __future__ import print_function
+
+import json
+import sys
+import time
+import tracemalloc
+
+from robottelo import ssh
+from robottelo.cli import hammer
+
+CHUNK_SIZE = ssh.CHANNEL_READ_SIZE
+FIELDS = (
+    'ID', 'Name', 'Label', 'Description', 'Organization', 'Content Type',
+    'URL', 'Last Sync',
+)
+
+
+def generate_rows(count):
+    for index in range(count):
+        yield [
+            str(index),
+            'repository {0}'.format(index),
+            'repository_{0}'.format(index),
+            '' if index % 3 else 'a "quoted", description',
+            'Default Organization',
+            'yum',
+            'https://example.com/pulp/repos/{0}/'.format(index),
+            '2019/01/01 00:00:00',
+        ]
+
+
+def csv_output(count):
+    def quote(value):
+        if any(char in value for char in ',"\n'):
+            return '"{0}"'.format(value.replace('"', '""'))
+        return value
+    lines = [','.join(FIELDS)]
+    lines.extend(
+        ','.join(quote(value) for value in row)
+        for row in generate_rows(count)
+    )
+    return '\n'.join(lines).encode('utf-8')
+
+
+def json_output(count):
+    return json.dumps(
+        [dict(zip(FIELDS, row)) for row in generate_rows(count)],
+        indent=2,
+    ).encode('utf-8')
+
+
+def split_chunks(data):
+    return [
+        data[index:index + CHUNK_SIZE]
+        for index in range(0, len(data), CHUNK_SIZE)
+    ]
+
+
+def measure(function, chunks):
+    """Return the seconds and the peak of memory allocated in MiB"""
+    tracemalloc.start()
+    start = time.time()
+    function(chunks)
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024.0 / 1024.0
+
+
+def buffered(output_format):
+    def parse(chunks):
+        return ssh.build_command_result(
+            b''.join(chunks), b'', 0, output_format).stdout
+    return parse
+
+
+def streamed_csv(chunks):
+    return list(hammer.iter_csv(hammer.iter_output_lines(chunks)))
+
+
+def iterated_csv(chunks):
+    for _ in hammer.iter_csv(hammer.iter_output_lines(chunks)):
+        pass
+
+
+def streamed_json(chunks):
+    return list(hammer.iter_json(chunks))
+
+
+def iterated_json(chunks):
+    for _ in hammer.iter_json(chunks):
+        pass
+
+
+def main(counts):
+    print('{0:>7} {1:>6} {2:>10} {3:>9} {4:>9} {5:>9}'.format(
+        'rows', 'format', 'parser', 'size MiB', 'seconds', 'peak MiB'))
+    for count in counts:
+        for output_format, generate, parsers in (
+                ('csv', csv_output, (
+                    ('buffered', buffered('csv')),
+                    ('streamed', streamed_csv),
+                    ('iterated', iterated_csv))),
+                ('json', json_output, (
+                    ('buffered', buffered('json')),
+                    ('streamed', streamed_json),
+                    ('iterated', iterated_json)))):
+            chunks = split_chunks(generate(count))
+            size = sum(len(chunk) for chunk in chunks) / 1024.0 / 1024.0
+            for name, parser in parsers:
+                elapsed, peak = measure(parser, chunks)
+                print('{0:>7} {1:>6} {2:>10} {3:>9.1f} {4:>9.2f} {5:>9.1f}'
+                      .format(count, output_format, name, size, elapsed, peak))
+
+
+if __name__ == '__main__':
+    main([int(count) for count in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,205 @@
+"""Compare the time of parsing large hammer info outputs with the current
+``hammer.parse_info`` and with the implementation it replaced, which
+compiled its patterns and computed the indentation char by char on every
+line.
+
+The outputs are built from the recorded outputs in
+``tests/robottelo/data/hammer_info`` by repeating their numbered entries, like
+a content view with many versions and repositories or a host with many
+network interfaces.
+
+Run it with::
+
+    python scripts/benchmark_parse_info.py [entries [entries ...]]
+
+"""
+from __future__ import print_function
+
+import os
+import re
+import sys
+import timeit
+
+from robottelo.cli import hammer
+
+CORPUS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests',
+    'robottelo', 'data', 'hammer_info'
+)
+OUTPUTS = ('content_view', 'content_view_version', 'host', 'organization')
+
+
+def legacy_get_line_indentation_level(line, tab_spaces=4,
+                                      indentation_spaces=4):
+    """The get_line_indentation_level implementation used by
+    legacy_parse_info.
+    """
+    if not line or len(line) < tab_spaces:
+        return 0
+    spaces = 0
+    for char in line:
+        if char not in (' ', '\t'):
+            break
+        if char == '\t':
+            spaces += tab_spaces
+        else:
+            spaces += 1
+    return spaces // indentation_spaces
+
+
+def legacy_parse_info(output):
+    """The parse_info implementation replaced by the single pass parser."""
+    # info dictionary
+    contents = {}
+    sub_prop = None  # stores name of the last group of sub-properties
+    sub_num = None  # is not None when list of properties
+    second_level_key = None  # is set when a possible second level is detected
+
+    for line in output:
+        # skip empty lines
+        if line == '':
+            continue
+        current_indent_level = legacy_get_line_indentation_level(line)
+        if current_indent_level <= 1:
+            # we are entering or leaving a second level from lower/upper levels
+            # clear the second level key
+            second_level_key = None
+        if line.startswith(' '):  # sub-properties are indented
+            # values are separated by ':' or '=>', but not by '::' which can be
+            # entity name like 'test::params::keys'
+            if line.find(':') != -1 and not line.find('::') != -1:
+                key, value = line.lstrip().split(":", 1)
+            elif line.find('=>') != -1 and len(
+                    line.lstrip().split(" =>", 1)) == 2:
+                key, value = line.lstrip().split(" =>", 1)
+            else:
+                key = value = None
+
+            if key is None and value is None:
+                # Parse single attribute collection properties
+                # Template
+                #  1) template1
+                #  2) template2
+                #
+                # or
+                # Template
+                #  template1
+                #  template2
+                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
+
+                if match is None:
+                    match = re.match(r'(.*)$', line.lstrip())
+
+                value = match.group(1)
+
+                if isinstance(contents[sub_prop], dict):
+                    contents[sub_prop] = []
+
+                contents[sub_prop].append(value)
+            else:
+                # some properties have many numbered values
+                # Example:
+                # Content:
+                #  1) Repo Name: repo1
+                #     URL:       /custom/4f84fc90-9ffa-...
+                #  2) Repo Name: puppet1
+                #     URL:       /custom/4f84fc90-9ffa-...
+                starts_with_number = re.match(r'(\d+)\)', key)
+                if starts_with_number:
+                    sub_num = int(starts_with_number.group(1))
+                    # no. 1) we need to change dict() to list()
+                    if sub_num == 1:
+                        contents[sub_prop] = []
+                    # remove number from key
+                    key = re.sub(r'\d+\)', '', key)
+                    # append empty dict to array
+                    contents[sub_prop].append({})
+
+                key = key.lstrip().replace(' ', '-').lower()
+                value = value.lstrip()
+                # add value to dictionary
+                if sub_num is not None:
+                    contents[sub_prop][-1][key] = value
+                else:
+                    # a third level is always represented as a dictionary and
+                    # we need to detect if we are at third level
+                    # example:
+                    # Content Information:
+                    #     Content View:
+                    #         ID:   10
+                    #         Name: Default Organization View
+                    # the "ID" and "Name" are located at third indent level
+                    # "content view" is located at second indent level
+                    if current_indent_level == 2 and second_level_key:
+                        # we are at third level indentation
+                        if not contents[sub_prop][second_level_key]:
+                            contents[sub_prop][second_level_key] = {}
+                        contents[sub_prop][second_level_key][key] = value
+                    else:
+                        contents[sub_prop][key] = value
+                    if current_indent_level == 1 and not value:
+                        # always set the last possible second level key
+                        # that can form a third level
+                        second_level_key = key
+        else:
+            sub_num = None  # new property implies no sub property
+            key, value = line.lstrip().split(":", 1)
+            key = key.lstrip().replace(' ', '-').lower()
+            if value.lstrip() == '':  # 'key:' no value, new sub-property
+                sub_prop = key
+                contents[sub_prop] = {}
+            else:  # 'key: value' line
+                contents[key] = value.lstrip()
+
+    return contents
+
+
+def load_output(name, entries):
+    """Return the lines of a recorded output with each numbered entry
+    repeated ``entries`` times.
+    """
+    with open(os.path.join(CORPUS_DIR, name + '.txt')) as handler:
+        lines = handler.read().split('\n')
+    output = []
+    entry = []
+    number = 0
+    for line in lines + ['']:
+        match = re.match(r'^( +)\d+\)', line)
+        if match or (entry and line.startswith(' ' * 4) and
+                     not line.startswith(' ' * 8)):
+            if match and entry:
+                output.extend(entry)
+                entry = []
+            entry.append(line)
+            continue
+        for _ in range(entries if entry else 0):
+            number += 1
+            output.append(re.sub(r'\d+\)', '{0})'.format(number), entry[0],
+                                 count=1))
+            output.extend(entry[1:])
+        entry = []
+        number = 0
+        output.append(line)
+    return output
+
+
+def main(counts):
+    print('{0:>20} {1:>8} {2:>7} {3:>10} {4:>10} {5:>8}'.format(
+        'output', 'entries', 'lines', 'legacy ms', 'current ms', 'speed-up'))
+    for count in counts:
+        for name in OUTPUTS:
+            output = load_output(name, count)
+            assert legacy_parse_info(output) == hammer.parse_info(output)
+            number = max(3, 20000 // len(output))
+            times = []
+            for function in (legacy_parse_info, hammer.parse_info):
+                times.append(min(timeit.repeat(
+                    lambda: function(output), number=number, repeat=5
+                )) / number * 1000)
+            print('{0:>20} {1:>8} {2:>7} {3:>10.3f} {4:>10.3f} {5:>7.2f}x'
+                  .format(name, count, len(output), times[0], times[1],
+                          times[0] / times[1]))
+
+
+if __name__ == '__main__':
+    main([int(count) for count in sys.argv[1:]] or [1, 100, 1000])
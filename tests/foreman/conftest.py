@@ -13,8 +13,11 @@ from nailgun import entities
 from robottelo.cleanup import EntitiesCleaner
 from robottelo.config import settings
 from robottelo.decorators import setting_is_set
+from robottelo.decorators.func_locker import format_lock_stats
 from robottelo.bz_helpers import get_deselect_bug_ids, group_by_key
 from robottelo.helpers import get_func_name
+from robottelo.vm import format_boot_stats
+from robottelo.vm_pool import close_default_pool, start_default_pool
 
 
 def log(message, level="DEBUG"):
@@ -194,3 +197,29 @@ def pytest_collection_modifyitems(items, config):
 @pytest.fixture(autouse=True, scope="function")
 def record_test_timestamp_xml(record_property):
     record_property("start_time", int(time() * 1000))
+
+
+def pytest_collection_finish(session):
+    """Start warming the clients of the default pool, once the tests to run
+    by this worker are known.
+    """
+    if session.items and not session.config.option.collectonly:
+        if not settings.configured:
+            settings.configure()
+        start_default_pool()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Destroy the clients left in the default pool and log the contention
+    of the functions locked by this worker, to find the ones serializing the
+    parallel runs, along with the boot timings of its clients.
+    """
+    close_default_pool()
+    lock_stats = format_lock_stats()
+    if lock_stats:
+        log('Locked functions contention:\n{0}'.format('\n'.join(lock_stats)),
+            level='INFO')
+    boot_stats = format_boot_stats()
+    if boot_stats:
+        log('Clients boot timings:\n{0}'.format('\n'.join(boot_stats)),
+            level='INFO')
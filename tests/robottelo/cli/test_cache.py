@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Tests for module ``robottelo.cli.cache``."""
+from robottelo.cli import cache
+
+
+def test_make_key_normalizes_options():
+    key = cache.make_key(
+        'os', 'list', {'id': 1, 'ids': [1, 2], 'full': True, 'name': None,
+                       'search': False})
+    assert key == cache.make_key(
+        'os', 'list', {'ids': '1,2', 'id': '1', 'full': True})
+    assert key != cache.make_key('os', 'list', {'id': 1}, username='admin')
+    assert key != cache.make_key('os', 'list', {'id': 1}, 'json')
+
+
+def test_is_read_command():
+    assert cache.is_read_command('os', 'os list --per-page 10')
+    assert cache.is_read_command('os', 'os info')
+    assert not cache.is_read_command('os', 'os list-something')
+    assert not cache.is_read_command('os', 'os update --id 1')
+    assert not cache.is_read_command('os', 'org list')
+
+
+def test_get_set_copies():
+    read_cache = cache.ReadCache()
+    key = cache.make_key('os', 'info', {'id': 1})
+    result = {'name': 'x'}
+    read_cache.set(key, result, 10)
+    result['name'] = 'y'
+    found, cached = read_cache.get(key)
+    assert found
+    assert cached == {'name': 'x'}
+    cached['name'] = 'z'
+    assert read_cache.get(key) == (True, {'name': 'x'})
+
+
+def test_expiration(monkeypatch):
+    read_cache = cache.ReadCache()
+    key = cache.make_key('os', 'info', {'id': 1})
+    monkeypatch.setattr(cache.time, 'time', lambda: 100)
+    read_cache.set(key, {}, 10)
+    assert read_cache.get(key)[0]
+    monkeypatch.setattr(cache.time, 'time', lambda: 110)
+    assert read_cache.get(key) == (False, None)
+    stats = read_cache.stats()
+    assert stats['by_command']['os'] == {
+        'hits': 1, 'misses': 1, 'expired': 1, 'invalidated': 0}
+    assert stats['entries'] == 0
+
+
+def test_max_entries():
+    read_cache = cache.ReadCache(max_entries=2)
+    keys = [cache.make_key('os', 'info', {'id': index}) for index in range(3)]
+    for key in keys:
+        read_cache.set(key, {}, 10)
+    assert not read_cache.get(keys[0])[0]
+    assert read_cache.get(keys[1])[0]
+    assert read_cache.get(keys[2])[0]
+
+
+def test_invalidate_for_command():
+    read_cache = cache.ReadCache()
+    os_info = cache.make_key('os', 'info', {'id': 1})
+    os_list = cache.make_key('os', 'list', {})
+    arch_info = cache.make_key('architecture', 'info', {'id': 1})
+    arch_list = cache.make_key('architecture', 'list', {})
+    for key in (os_info, os_list):
+        read_cache.set(key, {}, 10, ('operatingsystem',))
+    for key in (arch_info, arch_list):
+        read_cache.set(key, {}, 10, ('architecture',))
+    read_cache.invalidate_for_command(
+        'medium', 'medium create --operatingsystem-ids 1')
+    assert not read_cache.get(os_info)[0]
+    assert read_cache.get(os_list)[0]
+    assert read_cache.get(arch_info)[0]
+    read_cache.invalidate_for_command('architecture', 'architecture delete')
+    assert not read_cache.get(arch_info)[0]
+    assert not read_cache.get(arch_list)[0]
+    assert read_cache.get(os_list)[0]
+    total = read_cache.stats()['total']
+    assert total['invalidated'] == 3
+    read_cache.reset_stats()
+    assert read_cache.stats()['total']['hits'] == 0
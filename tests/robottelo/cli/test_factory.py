@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Tests for module ``robottelo.cli.factory``."""
+import functools
+import threading
+
+import pytest
+
+from robottelo.cli import factory, hammer_shell
+
+
+def make_entity(options=None):
+    """Factory returning its options with the thread and hammer shell lane
+    used.
+    """
+    result = dict(options)
+    result['lane'] = getattr(hammer_shell._lanes, 'number', 0)
+    result['thread'] = threading.current_thread().name
+    options['mutated'] = True
+    return result
+
+
+def test_make_many_order():
+    results = factory.make_many(
+        make_entity, 20, lambda index: {'index': index}, lanes=4)
+    assert [result['index'] for result in results] == list(range(20))
+    assert len(set(result['thread'] for result in results)) <= 4
+    assert set(result['lane'] for result in results) <= {0, 1, 2, 3}
+
+
+def test_make_many_copies_options():
+    options = {'name': 'foo'}
+    results = factory.make_many(make_entity, 3, options, lanes=2)
+    assert [result['name'] for result in results] == ['foo'] * 3
+    assert options == {'name': 'foo'}
+
+
+def test_make_many_options_list():
+    results = factory.make_many(
+        make_entity, 2, [{'name': 'foo'}, None], lanes=2)
+    assert results[0]['name'] == 'foo'
+    assert 'name' not in results[1]
+    with pytest.raises(ValueError):
+        factory.make_many(make_entity, 3, [{'name': 'foo'}])
+
+
+def test_make_many_default_lanes(mocker):
+    settings = mocker.patch('robottelo.cli.factory.settings')
+    settings.ssh_client.pool_max_size = 0
+    results = factory.make_many(make_entity, 3)
+    assert len(set(result['thread'] for result in results)) == 1
+
+
+def test_make_many_partial_failure():
+    def make_odd(options=None):
+        if options['index'] % 2 == 0:
+            raise factory.CLIFactoryError(
+                'Failed to create #{0}'.format(options['index']))
+        return options['index']
+
+    with pytest.raises(factory.CLIFactoryBatchError) as context:
+        factory.make_many(make_odd, 5, lambda index: {'index': index})
+    error = context.value
+    assert error.results == [None, 1, None, 3, None]
+    assert sorted(error.errors) == [0, 2, 4]
+    assert 'Failed to create 3 of 5 entities with make_odd' in str(error)
+    assert '#2: Failed to create #2' in str(error)
+
+
+def test_make_many_partial_factory_failure():
+    def make_failing(options=None, name=None):
+        raise factory.CLIFactoryError('Failed to create {0}'.format(name))
+
+    with pytest.raises(factory.CLIFactoryBatchError) as context:
+        factory.make_many(functools.partial(make_failing, name='foo'), 2)
+    assert context.value.errors[0].args == ('Failed to create foo',)
+    assert 'Failed to create 2 of 2 entities with functools.partial' in str(
+        context.value)
+
+
+def test_make_many_nothing():
+    assert factory.make_many(make_entity, 0) == []
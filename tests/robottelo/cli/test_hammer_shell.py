@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""Tests for module ``robottelo.cli.hammer_shell``."""
+import json
+import threading
+import time
+
+import pytest
+
+from unittest import mock
+
+from robottelo import ssh
+from robottelo.cli import hammer_shell
+
+
+class FakeChannel(object):
+    """A channel where every request written gets the reply built by
+    ``respond``.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.stdout = []
+        self.closed = False
+        self.eof_received = False
+
+    def sendall(self, data):
+        request = json.loads(data.decode('utf-8'))
+        for chunk in self.respond(request['args']):
+            self.stdout.append(chunk)
+
+    def recv_ready(self):
+        return bool(self.stdout)
+
+    def recv(self, nbytes):
+        return self.stdout.pop(0)
+
+    def recv_stderr_ready(self):
+        return False
+
+    def exit_status_ready(self):
+        return self.eof_received
+
+
+def reply(status=0, stdout=u'', stderr=u''):
+    return hammer_shell.RESPONSE_MARKER + json.dumps({
+        'status': status, 'stdout': stdout, 'stderr': stderr}).encode('utf-8')
+
+
+@pytest.fixture
+def session():
+    session = hammer_shell.HammerShell(hostname='example.com')
+    session._client = mock.Mock()
+    return session
+
+
+@pytest.mark.parametrize('command, args', [
+    (u'organization list --per-page="10000"',
+     [u'organization', u'list', u'--per-page=10000']),
+    (u'organization create --name="a b" --description="it\\"s"',
+     [u'organization', u'create', u'--name=a b', u'--description=it"s']),
+    (u'host list --search="name ~ a;b"',
+     [u'host', u'list', u'--search=name ~ a;b']),
+])
+def test_split_command(command, args):
+    assert hammer_shell.split_command(command) == args
+
+
+@pytest.mark.parametrize('command', [
+    u'organization list | head -1',
+    u'organization list > /tmp/orgs',
+    u'organization list; hostname',
+    u'organization create --name="$HOSTNAME"',
+    u'organization create --name=`hostname`',
+    u'organization create --name="unbalanced',
+])
+def test_split_command_needs_shell(command):
+    assert hammer_shell.split_command(command) is None
+
+
+def test_execute(session):
+    session._channel = FakeChannel(lambda args: [
+        reply(stdout=u'Id,Name\n1,"a"\n')[:10],
+        reply(stdout=u'Id,Name\n1,"a"\n')[10:] + b'\n',
+    ])
+    result = session.execute([u'organization', u'list'], 'csv', timeout=1)
+    assert isinstance(result, ssh.SSHCommandResult)
+    assert result.return_code == 0
+    assert result.stdout == [{u'id': u'1', u'name': u'a'}]
+
+
+def test_execute_keeps_direct_output(session):
+    session._channel = FakeChannel(lambda args: [
+        b'written to STDOUT\n' + reply(stdout=u'done\n') + b'\n' +
+        reply(stdout=u'next\n') + b'\n'
+    ])
+    result = session.execute([u'ping'], 'plain', timeout=1)
+    assert result.stdout == u'written to STDOUT\ndone\n'
+    assert session._buffer == reply(stdout=u'next\n') + b'\n'
+
+
+def test_execute_error(session):
+    session._channel = FakeChannel(lambda args: [
+        reply(status=65, stderr=u'Could not create\n') + b'\n'])
+    result = session.execute([u'organization', u'create'], 'csv', timeout=1)
+    assert result.return_code == 65
+    assert result.stderr == u'Could not create\n'
+
+
+def test_execute_process_died(session):
+    channel = FakeChannel(lambda args: [b'partial output'])
+    channel.eof_received = True
+    session._channel = channel
+    with pytest.raises(hammer_shell.HammerShellError):
+        session.execute([u'organization', u'list'], timeout=1)
+    assert session._channel is None
+    assert not session.alive
+
+
+@mock.patch('robottelo.cli.hammer_shell.get_session')
+def test_execute_falls_back_without_session(get_session):
+    get_session.return_value = None
+    assert hammer_shell.execute([u'ping'], u'admin', u'changeme') is None
+
+
+@mock.patch('robottelo.cli.hammer_shell.get_session')
+def test_execute_does_not_rerun_when_session_dies(get_session):
+    get_session.return_value.execute.side_effect = (
+        hammer_shell.HammerShellError('exited'))
+    result = hammer_shell.execute([u'ping'], u'admin', u'changeme')
+    assert result.return_code == 255
+
+
+@mock.patch('robottelo.cli.hammer_shell.HammerShell')
+def test_get_session_per_lane(shell_class):
+    shell_class.side_effect = lambda hostname: mock.Mock(alive=True)
+    hammer_shell._sessions.clear()
+    try:
+        session = hammer_shell.get_session(u'admin', u'changeme', 'example')
+        with hammer_shell.lane(1):
+            lane_session = hammer_shell.get_session(
+                u'admin', u'changeme', 'example')
+            assert lane_session is not session
+        assert hammer_shell.get_session(
+            u'admin', u'changeme', 'example') is session
+        with hammer_shell.lane(1):
+            assert hammer_shell.get_session(
+                u'admin', u'changeme', 'example') is lane_session
+    finally:
+        hammer_shell._sessions.clear()
+
+
+@mock.patch('robottelo.cli.hammer_shell.HammerShell')
+def test_get_session_started_once(shell_class):
+    def slow_start():
+        time.sleep(0.05)
+    shell_class.side_effect = lambda hostname: mock.Mock(
+        alive=True, start=mock.Mock(side_effect=slow_start))
+    hammer_shell._sessions.clear()
+    sessions = []
+    threads = [
+        threading.Thread(target=lambda: sessions.append(
+            hammer_shell.get_session(u'admin', u'changeme', 'example')))
+        for _ in range(4)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert shell_class.call_count == 1
+        assert len(set(map(id, sessions))) == 1
+    finally:
+        hammer_shell._sessions.clear()
+
+
+@mock.patch('robottelo.cli.hammer_shell.time')
+@mock.patch('robottelo.cli.hammer_shell.HammerShell')
+def test_get_session_retries_start(shell_class, time_mock):
+    shell_class.return_value.start.side_effect = (
+        hammer_shell.HammerShellError('no ruby'))
+    time_mock.time.return_value = 1000
+    hammer_shell._sessions.clear()
+    hammer_shell._start_failures.clear()
+    try:
+        assert hammer_shell.get_session(
+            u'admin', u'changeme', 'example') is None
+        # not retried before the backoff delay
+        assert hammer_shell.get_session(
+            u'admin', u'changeme', 'example') is None
+        assert shell_class.call_count == 1
+        time_mock.time.return_value += hammer_shell.START_RETRY_DELAY
+        shell_class.return_value.start.side_effect = None
+        session = hammer_shell.get_session(u'admin', u'changeme', 'example')
+        assert session is shell_class.return_value
+        assert shell_class.call_count == 2
+        assert 'example' not in hammer_shell._start_failures
+    finally:
+        hammer_shell._sessions.clear()
+        hammer_shell._start_failures.clear()
+
+
+@mock.patch('robottelo.cli.hammer_shell.time')
+@mock.patch('robottelo.cli.hammer_shell.HammerShell')
+def test_get_session_start_attempts(shell_class, time_mock):
+    shell_class.return_value.start.side_effect = (
+        hammer_shell.HammerShellError('no ruby'))
+    time_mock.time.return_value = 1000
+    hammer_shell._sessions.clear()
+    hammer_shell._start_failures.clear()
+    try:
+        for _ in range(hammer_shell.START_ATTEMPTS + 1):
+            assert hammer_shell.get_session(
+                u'admin', u'changeme', 'example') is None
+            time_mock.time.return_value += 3600
+        assert shell_class.call_count == hammer_shell.START_ATTEMPTS
+    finally:
+        hammer_shell._sessions.clear()
+        hammer_shell._start_failures.clear()
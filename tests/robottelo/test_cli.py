@@ -2,13 +2,19 @@ import six
 import unittest2
 
 from functools import partial
+from robottelo.cli.architecture import Architecture
 from robottelo.cli.base import (
     Base,
     CLIBaseError,
     CLIDataBaseError,
     CLIError,
-    CLIReturnCodeError
+    CLIReturnCodeError,
+    LazyInfo,
 )
+from robottelo.cli.cache import read_cache
+from robottelo.cli.operatingsys import OperatingSys
+from robottelo.cli.product import Product
+from robottelo.cli.repository import Repository
 
 if six.PY2:
     import mock
@@ -43,6 +49,22 @@ class BaseCliTestCase(unittest2.TestCase):
         self.assertNotIn(u'--flag-two', command_parts)
         self.assertEqual(len(command_parts), 4)
 
+    def test_construct_command_sub(self):
+        """Check the command_sub passed overrides the class attribute"""
+        Base.command_base = 'basecommand'
+        Base.command_sub = 'subcommand'
+        self.assertEqual(
+            Base._construct_command({}, command_sub='other'),
+            u'basecommand other ')
+        self.assertEqual(Base.command_sub, 'subcommand')
+
+    def test_commands_without_org(self):
+        """Check the commands exempted from the organization requirement"""
+        self.assertTrue(Repository._requires_org('list'))
+        self.assertFalse(Repository._requires_org('create'))
+        self.assertFalse(Repository._requires_org('info'))
+        self.assertTrue(Product._requires_org('info'))
+
     def test_username_password_parameters_lookup(self):
         """Username and password returned are the parameters"""
         username, password = CLIClass._get_username_password('auser', 'apass')
@@ -250,6 +272,69 @@ class BaseCliTestCase(unittest2.TestCase):
         construct.called_once_with({})
         execute.called_once_with(construct.return_value, output_format='csv')
 
+    @mock.patch('robottelo.cli.base.Base.info')
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_add_create_lazy_info(self, settings, construct, execute, info):
+        """Check command create fetches the info only when a field not
+        output by create is accessed
+        """
+        settings.cli.lazy_create_info = True
+        execute.return_value = [
+            {'message': 'Created', 'id': 'foo', 'name': 'bar'}]
+        info.return_value = {'id': 'foo', 'name': 'bar', 'label': 'baz'}
+        Base.command_requires_org = False
+        result = Base.create()
+        self.assertIsInstance(result, LazyInfo)
+        self.assertEqual(result['id'], 'foo')
+        self.assertEqual(result['name'], 'bar')
+        self.assertTrue(result)
+        self.assertFalse(result.loaded)
+        info.assert_not_called()
+        self.assertEqual(result['label'], 'baz')
+        self.assertTrue(result.loaded)
+        info.assert_called_once_with({u'id': 'foo'})
+        self.assertEqual(result, info.return_value)
+        self.assertEqual(info.call_count, 1)
+
+    @mock.patch('robottelo.cli.base.Base.info')
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_add_create_lazy_info_whole_record(
+            self, settings, construct, execute, info):
+        """Check the info is fetched when the record is used as a whole"""
+        settings.cli.lazy_create_info = True
+        execute.return_value = [{'id': 'foo', 'name': 'bar'}]
+        info.return_value = {'id': 'foo', 'name': 'bar', 'label': 'baz'}
+        Base.command_requires_org = False
+        result = Base.create()
+        self.assertEqual(
+            sorted(result.items()),
+            [('id', 'foo'), ('label', 'baz'), ('name', 'bar')]
+        )
+        info.assert_called_once_with({u'id': 'foo'})
+        self.assertIs(type(result.copy()), dict)
+
+    @mock.patch('robottelo.cli.base.Base.info')
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_add_create_lazy_info_class_override(
+            self, settings, construct, execute, info):
+        """Check the class lazy_create_info attribute overrides the setting"""
+        settings.cli.lazy_create_info = True
+        execute.return_value = [{'id': 'foo', 'name': 'bar'}]
+        info.return_value = {'id': 'foo', 'name': 'bar', 'label': 'baz'}
+        Base.command_requires_org = False
+        Base.lazy_create_info = False
+        try:
+            self.assertEqual(Base.create(), info.return_value)
+        finally:
+            Base.lazy_create_info = None
+        info.assert_called_once_with({u'id': 'foo'})
+
     def assert_cmd_execution(
             self, construct, execute, base_method, cmd_sub,
             ignore_stderr=False, **base_method_kwargs):
@@ -328,6 +413,86 @@ class BaseCliTestCase(unittest2.TestCase):
         )
         self.assertIs(response, handle_resp.return_value)
 
+    @mock.patch('robottelo.cli.base.hammer_shell.execute')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_with_hammer_shell(self, settings, command, shell_exec):
+        """Check command is run in the hammer shell session"""
+        settings.locale = 'en_US'
+        settings.performance = False
+        settings.cli.hammer_backend = 'shell'
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        response = Base.execute(
+            'org list --search="name = x"', output_format='csv',
+            return_raw_response=True
+        )
+        shell_exec.assert_called_once_with(
+            [u'-v', u'-u', u'admin', u'-p', u'password', u'--output=csv',
+             u'org', u'list', u'--search=name = x'],
+            'admin', 'password', 'csv', None
+        )
+        command.assert_not_called()
+        self.assertIs(response, shell_exec.return_value)
+
+    @mock.patch('robottelo.cli.base.hammer_shell.execute')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_with_hammer_shell_fallback(
+            self, settings, command, shell_exec):
+        """Check command is run in a hammer process when it needs a shell or
+        no hammer shell session is available
+        """
+        settings.locale = 'en_US'
+        settings.performance = False
+        settings.cli.hammer_backend = 'shell'
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        shell_exec.return_value = None
+        Base.execute('org list', return_raw_response=True)
+        shell_exec.assert_called_once()
+        self.assertEqual(command.call_count, 1)
+        Base.execute('org list | head -1', return_raw_response=True)
+        shell_exec.assert_called_once()
+        self.assertEqual(command.call_count, 2)
+
+    @mock.patch('robottelo.cli.base.ssh.stream_command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_iter_list(self, settings, stream_command):
+        """Check records are parsed from the streamed output"""
+        settings.locale = 'en_US'
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        stream = stream_command.return_value.__enter__.return_value
+        stream.__iter__.return_value = iter([b'Id,Na', b'me\n1,a\n2,b\n'])
+        stream.return_code = 0
+        stream.stderr = u''
+        Base.command_base = 'basecommand'
+        Base.command_requires_org = False
+        records = Base.iter_list()
+        stream_command.assert_not_called()
+        self.assertEqual(
+            list(records),
+            [{u'id': u'1', u'name': u'a'}, {u'id': u'2', u'name': u'b'}]
+        )
+        ssh_cmd = (
+            u'LANG=en_US  hammer -v -u admin -p password --output=csv '
+            u'basecommand list --per-page="10000"'
+        )
+        stream_command.assert_called_once_with(ssh_cmd.encode('utf-8'))
+
+    @mock.patch('robottelo.cli.base.ssh.stream_command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_iter_list_error(self, settings, stream_command):
+        """Check a hammer failure is raised once the output is consumed"""
+        stream = stream_command.return_value.__enter__.return_value
+        stream.__iter__.return_value = iter([])
+        stream.return_code = 65
+        stream.stderr = u'Error'
+        Base.command_requires_org = False
+        with self.assertRaises(CLIReturnCodeError):
+            list(Base.iter_list())
+
     @mock.patch('robottelo.cli.base.Base.list')
     def test_exists_without_option_and_empty_return(self, lst_method):
         """Check exists method without options and empty return"""
@@ -473,6 +638,133 @@ class BaseCliTestCase(unittest2.TestCase):
         )
 
 
+class CachedCLIClass(Base):
+    """Class used for the read cache tests"""
+    command_base = 'cached'
+    cacheable_reads = True
+    reference_options = ('cached',)
+
+
+@mock.patch('robottelo.cli.base.ssh.command')
+@mock.patch('robottelo.cli.base.settings')
+class ReadCacheTestCase(unittest2.TestCase):
+    """Tests for the read cache of the Base cli class"""
+
+    def setUp(self):
+        read_cache.invalidate()
+        self.addCleanup(read_cache.invalidate)
+
+    def configure(self, settings, command, stdout, ttl=300):
+        settings.performance = False
+        settings.cli.hammer_backend = 'process'
+        settings.cli.read_cache_ttl = ttl
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        command.return_value = mock.Mock(
+            return_code=0, stderr='', stdout=stdout)
+
+    def test_list_cached(self, settings, command):
+        """Check list results are cached by options"""
+        self.configure(settings, command, [{'id': '1'}])
+        result = CachedCLIClass.list({'search': 'name=x'})
+        self.assertEqual(result, [{'id': '1'}])
+        result.append({'id': '2'})
+        self.assertEqual(
+            CachedCLIClass.list({'search': 'name=x'}), [{'id': '1'}])
+        self.assertEqual(command.call_count, 1)
+        CachedCLIClass.list({'search': 'name=y'})
+        self.assertEqual(command.call_count, 2)
+
+    def test_info_cached(self, settings, command):
+        """Check info results are cached and raw responses are not"""
+        self.configure(settings, command, ['Id: 1', 'Name: x'])
+        self.assertEqual(
+            CachedCLIClass.info({'id': 1}), {'id': '1', 'name': 'x'})
+        self.assertEqual(
+            CachedCLIClass.info({'id': '1'}), {'id': '1', 'name': 'x'})
+        self.assertEqual(command.call_count, 1)
+        CachedCLIClass.info({'id': 1}, return_raw_response=True)
+        self.assertEqual(command.call_count, 2)
+
+    def test_cache_disabled(self, settings, command):
+        """Check nothing is cached when the TTL is 0 or for the classes
+        without cacheable_reads
+        """
+        self.configure(settings, command, [], ttl=0)
+        CachedCLIClass.list()
+        CachedCLIClass.list()
+        self.assertEqual(command.call_count, 2)
+        settings.cli.read_cache_ttl = 300
+        Base.list()
+        Base.list()
+        self.assertEqual(command.call_count, 4)
+
+    def test_invalidated_by_write(self, settings, command):
+        """Check writes of the class drop its cached results"""
+        self.configure(settings, command, [])
+        CachedCLIClass.list()
+        CachedCLIClass.execute('cached update --id 1 --name y')
+        CachedCLIClass.list()
+        self.assertEqual(command.call_count, 3)
+
+    def test_invalidated_by_reference(self, settings, command):
+        """Check writes of other classes referencing the entities drop the
+        cached info results only
+        """
+        self.configure(settings, command, [])
+        CachedCLIClass.list()
+        CachedCLIClass.info({'id': 1})
+        Base.execute('other update --id 1 --name y')
+        CachedCLIClass.list()
+        CachedCLIClass.info({'id': 1})
+        self.assertEqual(command.call_count, 3)
+        Base.execute('other update --id 1 --cached-ids 1')
+        CachedCLIClass.list()
+        CachedCLIClass.info({'id': 1})
+        self.assertEqual(command.call_count, 5)
+
+    def test_not_invalidated_by_similar_option(self, settings, command):
+        """Check only the reference options drop the cached info results,
+        not the options or values merely containing them
+        """
+        self.configure(settings, command, [])
+        CachedCLIClass.info({'id': 1})
+        Base.execute('other update --id 1 --cachedx-ids 1')
+        Base.execute('other update --id 1 --name="--cached-ids=1"')
+        Base.execute('other update --id 1 --description="a --cached b"')
+        CachedCLIClass.info({'id': 1})
+        self.assertEqual(command.call_count, 4)
+        Base.execute('other update --id 1 --cached-id 1')
+        CachedCLIClass.info({'id': 1})
+        self.assertEqual(command.call_count, 6)
+
+    def test_invalidated_by_option_of_referencing_class(
+            self, settings, command):
+        """Check an operating system command referencing architectures drops
+        the cached architecture info results
+        """
+        self.configure(settings, command, ['Id: 1'])
+        Architecture.list()
+        Architecture.info({'id': 1})
+        OperatingSys.add_architecture(
+            {'id': 2, 'architecture-id': 1})
+        Architecture.list()
+        Architecture.info({'id': 1})
+        self.assertEqual(command.call_count, 4)
+
+    def test_invalidated_by_referenced_class(self, settings, command):
+        """Check an architecture command drops the cached operating system
+        info results, which list the architectures
+        """
+        self.configure(settings, command, ['Id: 1'])
+        OperatingSys.list()
+        OperatingSys.info({'id': 1})
+        Architecture.delete({'id': 2})
+        OperatingSys.list()
+        OperatingSys.info({'id': 1})
+        self.assertEqual(command.call_count, 4)
+
+
 class CLIErrorTests(unittest2.TestCase):
     """Tests for the CLIError cli class"""
 
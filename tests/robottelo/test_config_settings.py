@@ -1,6 +1,17 @@
 """Tests for module ``robottelo.config.settings``."""
 import six
-from robottelo.config.base import Settings, INIReader, ImproperlyConfigured
+import sys
+
+from robottelo.config.base import (
+    _PostImportHook,
+    _PostImportLoader,
+    CLISettings,
+    DistroSettings,
+    ImproperlyConfigured,
+    INIReader,
+    Settings,
+    SSHClientSettings,
+)
 from unittest2 import TestCase
 
 if six.PY2:
@@ -51,6 +62,141 @@ class SettingsTestCase(TestCase):
             self.assertEqual(settings.server.hostname, 'example.com')
             self.assertEqual(settings.server.ssh_password, '1234')
 
+    @mock.patch(builtin_open, new_callable=lambda: get_valid_ini_with_distro)
+    def test_configure_sections_lazily(self, mock_open):
+        with mock.patch('os.path.isfile', return_value=True):
+            settings = Settings()
+            with mock.patch.object(
+                    DistroSettings, 'read', autospec=True) as read, \
+                    mock.patch.object(
+                        DistroSettings, 'validate', return_value=[]):
+                settings.configure()
+                read.assert_not_called()
+                self.assertIsNone(settings.distro.image_el6)
+                self.assertIsNone(settings.distro.image_el7)
+                read.assert_called_once_with(settings.distro, settings.reader)
+
+    @mock.patch(builtin_open, new_callable=lambda: get_valid_ini_with_distro)
+    def test_configure_section_validation_error(self, mock_open):
+        with mock.patch('os.path.isfile', return_value=True):
+            settings = Settings()
+            settings.configure()
+            self.assertTrue(settings.configured)
+            with mock.patch.object(
+                    DistroSettings, 'validate', autospec=True,
+                    return_value=['invalid']) as validate:
+                for _ in range(2):
+                    with self.assertRaises(ImproperlyConfigured):
+                        settings.distro
+            validate.assert_called_once()
+            settings.distro = DistroSettings()
+            self.assertIsNone(settings.distro.image_el6)
+
+    @mock.patch(builtin_open, new_callable=lambda: get_valid_ini)
+    def test_configure_third_parties_once_imported(self, mock_open):
+        with mock.patch('os.path.isfile', return_value=True), \
+                mock.patch('robottelo.config.base._post_import_hook') as hook:
+            settings = Settings()
+            settings.configure()
+            hook.register.assert_any_call(
+                'nailgun', settings._configure_entities)
+            hook.register.assert_any_call(
+                'airgun.settings', settings._configure_airgun)
+
+    @mock.patch(builtin_open, new_callable=lambda: get_valid_ini)
+    def test_patch_section(self, mock_open):
+        with mock.patch('os.path.isfile', return_value=True):
+            settings = Settings()
+            settings.configure()
+            with mock.patch.object(settings, 'cli') as cli:
+                self.assertIs(settings.cli, cli)
+            self.assertIsInstance(settings.cli, CLISettings)
+            self.assertEqual(settings.cli.read_cache_ttl, 300)
+
+    @mock.patch(builtin_open, new_callable=lambda: get_valid_ini)
+    def test_configure_cli_defaults(self, mock_open):
+        """Check the cli settings have their defaults without [cli]"""
+        with mock.patch('os.path.isfile', return_value=True):
+            settings = Settings()
+            settings.configure()
+            self.assertEqual(settings.cli.hammer_backend, 'process')
+            self.assertFalse(settings.cli.lazy_create_info)
+            self.assertEqual(settings.cli.read_cache_ttl, 300)
+
+    def test_all_features(self):
+        settings = Settings()
+        self.assertIn('server', settings.all_features)
+        self.assertIn('compute_resources', settings.all_features)
+        self.assertNotIn('configured', settings.all_features)
+
+
+class CLISettingsTestCase(TestCase):
+
+    def test_validate_read_cache_ttl(self):
+        cli = CLISettings()
+        cli._read_cache_ttl = 0
+        self.assertEqual(cli.validate(), [])
+        cli._read_cache_ttl = -1
+        self.assertEqual(
+            cli.validate(),
+            ['[cli] read_cache_ttl should not be a negative number of '
+             'seconds.'])
+
+
+class SSHClientSettingsTestCase(TestCase):
+
+    def test_validate_pool_max_size(self):
+        ssh_client = SSHClientSettings()
+        ssh_client._pool_max_size = 0
+        self.assertEqual(ssh_client.validate(), [])
+        ssh_client._pool_max_size = -1
+        self.assertEqual(
+            ssh_client.validate(),
+            ['[ssh_client] pool_max_size must not be negative'])
+
+
+class PostImportHookTestCase(TestCase):
+
+    def setUp(self):
+        self.hook = _PostImportHook()
+        self.addCleanup(
+            lambda: self.hook in sys.meta_path and sys.meta_path.remove(
+                self.hook))
+
+    def test_register_imported(self):
+        callback = mock.Mock()
+        self.hook.register('os', callback)
+        callback.assert_called_once_with()
+        self.assertNotIn(self.hook, sys.meta_path)
+
+    def test_register_not_imported(self):
+        sys.modules.pop('colorsys', None)
+        callback = mock.Mock(side_effect=lambda: self.assertIn(
+            'colorsys', sys.modules))
+        self.hook.register('colorsys', callback)
+        callback.assert_not_called()
+        self.assertIn(self.hook, sys.meta_path)
+        import colorsys
+        callback.assert_called_once_with()
+        self.assertNotIn(self.hook, sys.meta_path)
+        self.assertNotIsInstance(colorsys.__loader__, _PostImportLoader)
+        self.assertIs(colorsys.__spec__.loader, colorsys.__loader__)
+
+    def test_remove_once_all_imported(self):
+        for module_name in ('colorsys', 'sndhdr'):
+            sys.modules.pop(module_name, None)
+        callbacks = mock.Mock()
+        self.hook.register('colorsys', callbacks.colorsys)
+        self.hook.register('sndhdr', callbacks.sndhdr)
+        import colorsys  # noqa
+        self.assertEqual(callbacks.mock_calls, [mock.call.colorsys()])
+        self.assertIn(self.hook, sys.meta_path)
+        self.assertIsNone(self.hook.find_spec('colorsys'))
+        import sndhdr  # noqa
+        self.assertEqual(
+            callbacks.mock_calls, [mock.call.colorsys(), mock.call.sndhdr()])
+        self.assertNotIn(self.hook, sys.meta_path)
+
 
 class FakeOpen(object):
     def __init__(self, lines, *args, **kwargs):
@@ -87,6 +233,11 @@ def get_invalid_ini(path, *args, **kwargs):
     return FakeOpen(lines)
 
 
+def get_valid_ini_with_distro(path, *args, **kwargs):
+    lines = get_valid_ini(path).lines
+    return FakeOpen(list(lines) + ['[distro]', 'image_el6=rhel6'])
+
+
 def get_valid_ini(path, *args, **kwargs):
     lines = [
         '[server]', 'hostname=example.com', 'ssh_password=1234',
@@ -1,8 +1,9 @@
 """Unit tests for :mod:`robottelo.decorators`."""
+import importlib
 from itertools import product, chain
 
 import six
-from fauxfactory import gen_integer
+from fauxfactory import gen_integer, gen_string
 from unittest2 import SkipTest, TestCase
 
 from robottelo import decorators
@@ -17,6 +18,10 @@ if six.PY2:
 else:
     from unittest import mock
 
+# the module, shadowed by the shared decorator in the func_shared package
+shared_module = importlib.import_module(
+    'robottelo.decorators.func_shared.shared')
+
 
 class BzBugIsOpenTestCase(TestCase):
     """Tests for :func:`robottelo.decorators.bz_bug_is_open`."""
@@ -710,6 +715,7 @@ class CacheableTestCase(TestCase):
         self.object_cache_patcher = mock.patch.dict(
             'robottelo.decorators.OBJECT_CACHE')
         self.object_cache = self.object_cache_patcher.start()
+        decorators.OBJECT_CACHE.reset_stats()
 
         def make_foo(options):
             return {'id': 42}
@@ -738,6 +744,120 @@ class CacheableTestCase(TestCase):
         self.assertNotIn('foo', decorators.OBJECT_CACHE)
         self.assertEqual(decorators.OBJECT_CACHE, {})
 
+    def test_cache_by_options(self):
+        """Cache the objects by their normalized options."""
+        make_bar = decorators.cacheable(lambda options: dict(options))
+        make_bar.__name__ = 'make_bar'
+        obj = make_bar({'name': 'a', 'label': 'b'}, cached=True)
+        self.assertIs(
+            make_bar({'label': 'b', 'name': 'a', 'id': None}, cached=True),
+            obj
+        )
+        other_obj = make_bar({'name': 'b'}, cached=True)
+        self.assertEqual(other_obj, {'name': 'b'})
+        self.assertIsNot(make_bar({'name': 'a'}, cached=True), obj)
+        self.assertEqual(
+            decorators.OBJECT_CACHE.stats()['<lambda>'],
+            {'hits': 1, 'misses': 3, 'expired': 0, 'evicted': 0}
+        )
+
+    def test_lru_eviction(self):
+        """Drop the least recently used objects first."""
+        make_foo = decorators.cacheable(lambda options: object())
+        with mock.patch.object(decorators.OBJECT_CACHE, 'max_entries', 2):
+            first = make_foo({'id': 1}, cached=True)
+            second = make_foo({'id': 2}, cached=True)
+            self.assertIs(make_foo({'id': 1}, cached=True), first)
+            make_foo({'id': 3}, cached=True)
+            self.assertEqual(len(decorators.OBJECT_CACHE), 2)
+            self.assertIs(make_foo({'id': 1}, cached=True), first)
+            self.assertIsNot(make_foo({'id': 2}, cached=True), second)
+
+    @mock.patch('robottelo.decorators.time.time')
+    def test_timeout(self, time_):
+        """Drop the objects cached for longer than the timeout."""
+        make_foo = decorators.cacheable(timeout=10)(lambda options: object())
+        time_.return_value = 100
+        obj = make_foo(cached=True)
+        time_.return_value = 109
+        self.assertIs(make_foo(cached=True), obj)
+        time_.return_value = 110
+        self.assertIsNot(make_foo(cached=True), obj)
+
+    def test_invalid_scope(self):
+        """Reject unknown scopes."""
+        with self.assertRaises(ValueError):
+            decorators.cacheable(scope='session')
+
+    @mock.patch.object(shared_module, '_configured', True)
+    @mock.patch.object(shared_module, 'ENABLED', True)
+    def test_shared_scope(self):
+        """Create shared objects only once for all the workers."""
+        calls = []
+
+        def make_baz(options=None):
+            calls.append(options)
+            return {'id': len(calls)}
+
+        make_baz = decorators.cacheable(scope='shared')(make_baz)
+        with mock.patch.object(
+                shared_module, 'NAMESPACE_SCOPE', gen_string('alpha', 10)):
+            self.assertEqual(make_baz({'name': 'a'}, cached=True), {'id': 1})
+            # as if called by another worker
+            decorators.OBJECT_CACHE.clear()
+            self.assertEqual(make_baz({'name': 'a'}, cached=True), {'id': 1})
+            self.assertEqual(make_baz({'name': 'b'}, cached=True), {'id': 2})
+        self.assertEqual(calls, [{'name': 'a'}, {'name': 'b'}])
+
+    @mock.patch.object(shared_module, '_configured', True)
+    @mock.patch.object(shared_module, 'ENABLED', False)
+    def test_shared_scope_disabled(self):
+        """Cache shared objects by worker when shared functions are
+        disabled.
+        """
+        make_foo = decorators.cacheable(scope='shared')(
+            lambda options: object())
+        obj = make_foo(cached=True)
+        self.assertIs(make_foo(cached=True), obj)
+
+
+def _decorate():
+    """Return the class name a decorator would find when called by the
+    caller of this function.
+    """
+    return decorators.get_caller_class_name()
+
+
+class GetCallerClassNameTestCase(TestCase):
+    """Tests for :func:`robottelo.decorators.get_caller_class_name`."""
+
+    def test_class_names(self):
+        """Return the innermost class names."""
+        class Outer(object):
+            outer = _decorate()
+
+            class Inner(object):
+                inner = _decorate()
+
+                class Innermost(object):
+                    innermost = _decorate()
+
+        self.assertEqual(Outer.outer, 'test_class_names.Outer')
+        self.assertEqual(Outer.Inner.inner, 'Outer.Inner')
+        self.assertEqual(Outer.Inner.Innermost.innermost, 'Inner.Innermost')
+
+    def test_module_level(self):
+        """Stop at the module level."""
+        self.assertEqual(MODULE_LEVEL_CLASS_NAME, '')
+        self.assertEqual(ModuleLevelClass.class_name, 'ModuleLevelClass')
+
+
+MODULE_LEVEL_CLASS_NAME = _decorate()
+
+
+class ModuleLevelClass(object):
+    class_name = _decorate()
+
 
 class RmBugIsOpenTestCase(TestCase):
     """Tests for :func:`robottelo.decorators.rm_bug_is_open`."""
@@ -0,0 +1,61 @@
+"""Modules left out of the imports done by all the test workers"""
+import json
+import subprocess
+import sys
+
+from unittest2 import TestCase
+
+from robottelo.config.base import get_project_root
+
+#: The modules only needed by some tests, not to be imported with the CLI
+DEFERRED_MODULES = (
+    'airgun',
+    'nailgun.entities',
+    'robottelo.api.utils',
+    'robottelo.ui.locators.base',
+    'selenium.webdriver',
+)
+
+_IMPORT_SCRIPT = '''
+import json, sys
+import {0}
+print(json.dumps(list(sys.modules)))
+'''
+
+
+def imported_modules(module_name):
+    """Import ``module_name`` in a new interpreter.
+
+    :return: the names of all the modules imported by ``module_name``.
+    """
+    process = subprocess.Popen(
+        [sys.executable, '-c', _IMPORT_SCRIPT.format(module_name)],
+        cwd=get_project_root(),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    if process.returncode:
+        raise AssertionError('Failed to import {0}:\n{1}'.format(
+            module_name, stderr.decode('utf-8')))
+    return json.loads(stdout.decode('utf-8').splitlines()[-1])
+
+
+def deferred_imports(module_name):
+    """Return the ``DEFERRED_MODULES`` imported by ``module_name``."""
+    modules = imported_modules(module_name)
+    return [
+        name for name in DEFERRED_MODULES
+        if any(module == name or module.startswith(name + '.')
+               for module in modules)
+    ]
+
+
+class DeferredImportsTestCase(TestCase):
+    """Tests for the modules imported with the CLI"""
+
+    def test_cli_base(self):
+        """The CLI base class does not import the API and UI packages"""
+        self.assertEqual(deferred_imports('robottelo.cli.base'), [])
+
+    def test_cli_factory(self):
+        """The CLI factories do not import the API and UI packages"""
+        self.assertEqual(deferred_imports('robottelo.cli.factory'), [])
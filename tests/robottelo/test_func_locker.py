@@ -1,12 +1,17 @@
 # coding: utf-8
 
+import fcntl
 import multiprocessing
 import os
+import six
+import threading
 import time
 import tempfile
 
 from unittest2 import TestCase
+from robottelo.decorators import func_locker
 from robottelo.decorators.func_locker import (
+    get_lock_stats,
     get_temp_dir,
     lock_function,
     locking_function,
@@ -15,8 +20,14 @@ from robottelo.decorators.func_locker import (
     TEMP_FUNC_LOCK_DIR,
     TEMP_ROOT_DIR,
     FunctionLockerError,
+    reset_lock_stats,
 )
 
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
 _this_module_name_string = 'tests.robottelo.test_func_locker'
 
 NAMESPACE_SCOPE = 'func_locker_unittest_scope'
@@ -130,6 +141,16 @@ def simple_recursive_combined_function():
     return 'I should not be reached'
 
 
+@lock_function(mode='shared')
+def simple_shared_function():
+    pass
+
+
+@lock_function(max_holders=2)
+def simple_bounded_function():
+    pass
+
+
 @lock_function
 def simple_function_to_lock():
     """Read the lock file and return it"""
@@ -456,3 +477,169 @@ class FuncLockerTestCase(TestCase):
                 pass
 
         self.assertIn('Cannot ensure locking', str(context.exception))
+
+
+class FuncLockerContentionTestCase(TestCase):
+    """Tests for the lock contention handling"""
+
+    def setUp(self):
+        reset_lock_stats()
+        self.lock_file_path = _get_function_lock_path(
+            'simple_function_to_lock')
+        self.function_name = _get_function_name_string(
+            'simple_function_to_lock')
+
+    def test_lock_stats(self):
+        """The acquisitions of the locks are counted"""
+        simple_function_to_lock()
+        with locking_function(simple_function_to_lock):
+            pass
+        stats = get_lock_stats()[self.function_name]
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['waiters'], 0)
+        self.assertEqual(stats['timeouts'], 0)
+        self.assertIn(self.function_name, func_locker.format_lock_stats()[0])
+
+    def test_lock_timeout(self):
+        """Waiting for a lock held by another thread times out"""
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            with locking_function(simple_function_to_lock):
+                locked.set()
+                release.wait(10)
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        try:
+            locked.wait(10)
+            with self.assertRaises(FunctionLockerError) as context:
+                with locking_function(simple_function_to_lock, timeout=0.2):
+                    pass
+            self.assertIn(str(os.getpid()), str(context.exception))
+        finally:
+            release.set()
+            holder.join()
+        stats = get_lock_stats()[self.function_name]
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['waiters'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+
+    def test_wait_for_release(self):
+        """Waiting processes get the lock as soon as it is released"""
+        locked = threading.Event()
+
+        def hold_lock():
+            with locking_function(simple_function_to_lock):
+                locked.set()
+                time.sleep(0.2)
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait(10)
+        with locking_function(simple_function_to_lock, timeout=10):
+            pass
+        holder.join()
+        self.assertEqual(get_lock_stats()[self.function_name]['waiters'], 1)
+
+    @mock.patch.object(func_locker, 'LOCK_STALE_CHECK_INTERVAL', 0.1)
+    def test_reclaim_stale_lock(self):
+        """Locks still held after their holder exited are reclaimed"""
+        dead_process = multiprocessing.Process(target=time.sleep, args=(0,))
+        dead_process.start()
+        dead_process.join()
+        # like a process forked by the dead holder, which inherited the lock
+        with open(self.lock_file_path, 'a+') as stale_handler:
+            fcntl.flock(stale_handler.fileno(), fcntl.LOCK_EX)
+            stale_handler.seek(0)
+            stale_handler.truncate()
+            stale_handler.write(str(dead_process.pid))
+            stale_handler.flush()
+            with locking_function(simple_function_to_lock, timeout=10):
+                with open(self.lock_file_path) as handler:
+                    self.assertEqual(handler.read(), str(os.getpid()))
+
+
+class FuncLockerModesTestCase(TestCase):
+    """Tests for the shared and bounded lock modes"""
+
+    def _hold(self, function, **kwargs):
+        """Hold the lock of function in a thread until the returned event is
+        set
+        """
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            with locking_function(function, **kwargs):
+                locked.set()
+                release.wait(10)
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        self.addCleanup(holder.join)
+        self.addCleanup(release.set)
+        self.assertTrue(locked.wait(10))
+        return release
+
+    def test_shared_holders(self):
+        """Shared holders run along with each other"""
+        self._hold(simple_shared_function)
+        with locking_function(simple_shared_function, timeout=0.2):
+            pass
+        simple_shared_function()
+
+    def test_exclusive_waits_for_shared(self):
+        """An exclusive holder waits for the shared holders, and the shared
+        holders for it
+        """
+        release = self._hold(simple_shared_function)
+        with self.assertRaises(FunctionLockerError):
+            with locking_function(simple_shared_function, mode='exclusive',
+                                  timeout=0.2):
+                pass
+        release.set()
+        with locking_function(simple_shared_function, mode='exclusive',
+                              timeout=10):
+            with self.assertRaises(FunctionLockerError):
+                with locking_function(simple_shared_function, timeout=0.2):
+                    pass
+
+    def test_max_holders(self):
+        """No more than max_holders hold the lock at once"""
+        first_release = self._hold(simple_bounded_function)
+        self._hold(simple_bounded_function)
+        with self.assertRaises(FunctionLockerError):
+            with locking_function(simple_bounded_function, timeout=0.2):
+                pass
+        first_release.set()
+        with locking_function(simple_bounded_function, timeout=10):
+            pass
+
+    def test_max_holders_inherited(self):
+        """Passing only the mode keeps the max_holders of the function, and
+        the shared mode is refused for it
+        """
+        self._hold(simple_bounded_function)
+        with locking_function(simple_bounded_function, mode='exclusive',
+                              timeout=0.2):
+            pass
+        with self.assertRaises(FunctionLockerError):
+            with locking_function(simple_bounded_function, mode='shared'):
+                pass
+
+    def test_function_lock_mode(self):
+        """The lock mode is kept on the locked function"""
+        self.assertEqual(simple_shared_function.__lock_mode__, 'shared')
+        self.assertEqual(simple_bounded_function.__lock_max_holders__, 2)
+        self.assertEqual(simple_function_to_lock.__lock_mode__, 'exclusive')
+
+    def test_invalid_mode(self):
+        """Unknown modes and invalid max_holders are refused"""
+        with self.assertRaises(FunctionLockerError):
+            lock_function(mode='read')
+        with self.assertRaises(FunctionLockerError):
+            lock_function(max_holders=0)
+        with self.assertRaises(FunctionLockerError):
+            lock_function(mode='shared', max_holders=2)
@@ -1,7 +1,12 @@
 # coding: utf-8
 
+import datetime
 import multiprocessing
 import os
+import shutil
+import six
+import tempfile
+import threading
 import time
 
 
@@ -9,19 +14,36 @@ from fauxfactory import gen_integer, gen_string
 from unittest2 import TestCase
 
 from robottelo.decorators.func_shared.shared import (
+    _DATETIME_FORMAT,
     _set_configured,
     set_default_scope,
     enable_shared_function,
     shared,
     SharedFunctionException,
     _NAMESPACE_SCOPE_KEY_TYPE,
+    _SharedFunction,
+)
+from robottelo.decorators.func_shared import redis_storage
+from robottelo.decorators.func_shared.redis_storage import (
+    RedisStorageHandler,
+    RedisStorageLockError,
+)
+from robottelo.decorators.func_shared.sqlite_storage import (
+    SqliteStorageHandler,
+    SqliteStorageLockError,
 )
 from robottelo.decorators.func_shared.file_storage import (
+    FileStorageHandler,
     get_temp_dir,
     TEMP_ROOT_DIR,
     TEMP_FUNC_SHARED_DIR,
 )
 
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
 DEFAULT_POOL_SIZE = 8
 SIMPLE_TIMEOUT_VALUE = 3
 
@@ -160,6 +182,25 @@ def simple_shared_counter_with_exception_not_restored(index=0):
     raise NotRestorableException('error', "I'am not restorable")
 
 
+_shared_calls = []
+
+
+@shared(function_kw=['index'])
+def shared_recorded_call(index=0):
+    _shared_calls.append(index)
+    return index
+
+
+def sqlite_storage_increment(db_path):
+    """Increment the counter stored in the sqlite database ``db_path``"""
+    storage = SqliteStorageHandler(db_path=db_path)
+    with storage.lock('counter'):
+        value = storage.get('counter') or 0
+        # let the other processes try to take the lock
+        time.sleep(0.01)
+        storage.set('counter', value + 1)
+
+
 class FunctionSharedTestCase(TestCase):
 
     @classmethod
@@ -527,3 +568,349 @@ class FunctionSharedTestCase(TestCase):
             inc_string_2 = basic_shared_counter_string(
                 suffix=suffix, prefix=prefix, counter=counter_value)
             self.assertEqual(inc_string, inc_string_2)
+
+
+class SharedFunctionReadTestCase(TestCase):
+    """Tests for reading the stored values of shared functions"""
+
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root_dir)
+        self.storage = FileStorageHandler(root_dir=self.root_dir)
+        self.key = gen_string('alpha', 10)
+
+    def call(self, function):
+        return _SharedFunction(
+            self.key, function, storage_handler=self.storage, timeout=60)()
+
+    def test_ready_value_read_without_lock(self):
+        """Ready values are read without taking the storage lock"""
+        self.assertEqual(self.call(lambda: {'id': 1}), {'id': 1})
+        with mock.patch.object(
+                self.storage, 'lock', side_effect=AssertionError):
+            self.assertEqual(self.call(lambda: {'id': 2}), {'id': 1})
+
+    def test_failed_value_read_with_lock(self):
+        """Failed values are read with the storage lock held"""
+        def fail():
+            raise ValueError('failed')
+
+        with self.assertRaises(ValueError):
+            self.call(fail)
+        with mock.patch.object(
+                self.storage, 'lock', wraps=self.storage.lock) as lock:
+            with self.assertRaises(ValueError):
+                self.call(lambda: {'id': 2})
+        lock.assert_called_once_with(self.key)
+
+    def test_unversioned_value_read_with_lock(self):
+        """Values of other record versions are read with the storage lock
+        held
+        """
+        self.call(lambda: {'id': 1})
+        value = self.storage.get(self.key)
+        del value['record_version']
+        self.storage.set(self.key, value)
+        with mock.patch.object(
+                self.storage, 'lock', wraps=self.storage.lock) as lock:
+            self.assertEqual(self.call(lambda: {'id': 2}), {'id': 1})
+        lock.assert_called_once_with(self.key)
+
+    def test_atomic_set(self):
+        """Values are written through a temporary file"""
+        self.storage.set(self.key, {'id': 1})
+        self.storage.set(self.key, {'id': 2})
+        self.assertEqual(self.storage.get(self.key), {'id': 2})
+        self.assertEqual(os.listdir(self.root_dir), [self.key])
+
+    def test_get_cached(self):
+        """Unchanged values are read once, changed ones are read again"""
+        self.storage.set(self.key, {'id': 1})
+        self.assertEqual(self.storage.get(self.key), {'id': 1})
+        with mock.patch('robottelo.decorators.func_shared.file_storage.open',
+                        create=True, side_effect=AssertionError):
+            value = self.storage.get(self.key)
+            self.assertEqual(value, {'id': 1})
+            # callers can change the values they get
+            value['id'] = 2
+            self.assertEqual(self.storage.get(self.key), {'id': 1})
+        other_storage = FileStorageHandler(root_dir=self.root_dir)
+        other_storage.set(self.key, {'id': 3})
+        self.assertEqual(self.storage.get(self.key), {'id': 3})
+        os.remove(other_storage.get_key_file_path(self.key))
+        self.assertIsNone(self.storage.get(self.key))
+
+    def test_zlib_encoding(self):
+        """Values are compressed with the zlib encoding and can be read
+        whatever the encoding
+        """
+        value = {'items': [{'name': 'repository'}] * 100}
+        zlib_storage = FileStorageHandler(
+            root_dir=self.root_dir, encoding='zlib')
+        zlib_storage.set(self.key, value)
+        self.assertEqual(self.storage.get(self.key), value)
+        zlib_size = os.path.getsize(zlib_storage.get_key_file_path(self.key))
+        self.storage.set(self.key, value)
+        self.assertEqual(zlib_storage.get(self.key), value)
+        self.assertLess(
+            zlib_size,
+            os.path.getsize(self.storage.get_key_file_path(self.key))
+        )
+
+    def test_invalid_encoding(self):
+        """Unknown encodings are rejected"""
+        with self.assertRaises(ValueError):
+            FileStorageHandler(root_dir=self.root_dir, encoding='xml')
+
+
+class SharedFunctionStaleTestCase(TestCase):
+    """Tests for serving stale results, invalidating and prewarming them"""
+
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root_dir)
+        self.storage = FileStorageHandler(root_dir=self.root_dir)
+        self.key = gen_string('alpha', 10)
+
+    def call(self, function):
+        return _SharedFunction(
+            self.key, function, storage_handler=self.storage, timeout=60,
+            stale_timeout=60)()
+
+    def store(self, age, **fields):
+        """Store a ready result created age seconds ago"""
+        self.call(lambda: {'id': 1})
+        value = self.storage.get(self.key)
+        creation_datetime = (
+            datetime.datetime.utcnow() - datetime.timedelta(seconds=age))
+        value['creation_datetime'] = creation_datetime.strftime(
+            _DATETIME_FORMAT)
+        value.update(fields)
+        self.storage.set(self.key, value)
+
+    def wait_refreshes(self):
+        for thread in threading.enumerate():
+            if thread.name.startswith('refresh '):
+                thread.join(10)
+
+    def test_stale_result_refreshed(self):
+        """Stale results are returned and refreshed in the background"""
+        self.store(90)
+        self.assertEqual(self.call(lambda: {'id': 2}), {'id': 1})
+        self.wait_refreshes()
+        value = self.storage.get(self.key)
+        self.assertEqual(value['result'], {'id': 2})
+        self.assertNotIn('refresh_id', value)
+
+    def test_stale_result_refreshed_once(self):
+        """Stale results already being refreshed are only returned"""
+        self.store(90, refresh_id='other', refresh_pid=0)
+        function = mock.Mock(return_value={'id': 2})
+        self.assertEqual(self.call(function), {'id': 1})
+        self.wait_refreshes()
+        function.assert_not_called()
+        self.assertEqual(self.storage.get(self.key)['refresh_id'], 'other')
+
+    def test_failed_refresh(self):
+        """A failed refresh keeps the stale result"""
+        def fail():
+            raise ValueError('failed')
+
+        self.store(90)
+        self.assertEqual(self.call(fail), {'id': 1})
+        self.wait_refreshes()
+        value = self.storage.get(self.key)
+        self.assertEqual(value['result'], {'id': 1})
+        self.assertNotIn('refresh_id', value)
+
+    def test_expired_stale_result(self):
+        """Results older than their timeout and stale timeout are computed
+        again by the caller
+        """
+        self.store(150, refresh_id='other', refresh_pid=0)
+        self.assertEqual(self.call(lambda: {'id': 2}), {'id': 2})
+
+    def test_invalidate_and_prewarm(self):
+        """Invalidated results are computed again, prewarmed ones are ready
+        """
+        set_default_scope(gen_string('alpha', 10))
+        enable_shared_function(True)
+        self.addCleanup(enable_shared_function, False)
+        del _shared_calls[:]
+        shared_recorded_call(index=1)
+        shared_recorded_call(index=1)
+        self.assertEqual(_shared_calls, [1])
+        shared.invalidate(shared_recorded_call, index=1)
+        shared_recorded_call(index=1)
+        self.assertEqual(_shared_calls, [1, 1])
+        shared.prewarm(shared_recorded_call, dict(index=2)).join(10)
+        self.assertEqual(shared_recorded_call(index=2), 2)
+        self.assertEqual(_shared_calls, [1, 1, 2])
+
+
+class CallSharedTestCase(TestCase):
+    """Tests for calling any function once for all the workers"""
+
+    def test_call_shared(self):
+        """The function is called once by key and its result shared"""
+        set_default_scope(gen_string('alpha', 10))
+        enable_shared_function(True)
+        self.addCleanup(enable_shared_function, False)
+        function = mock.Mock(side_effect=lambda value: {'value': value})
+        self.assertEqual(
+            shared.call_shared('key1', function, args=(1,)), {'value': 1})
+        self.assertEqual(
+            shared.call_shared('key1', function, args=(2,)), {'value': 1})
+        self.assertEqual(
+            shared.call_shared(
+                'key1', function, kwargs={'value': 3}, scope_context='other'),
+            {'value': 3}
+        )
+        self.assertEqual(function.call_count, 2)
+
+    def test_call_shared_disabled(self):
+        """The function is called every time when sharing is disabled"""
+        enable_shared_function(False)
+        function = mock.Mock(return_value=1)
+        self.assertEqual(shared.call_shared('key2', function, args=(1,)), 1)
+        self.assertEqual(shared.call_shared('key2', function, args=(1,)), 1)
+        self.assertEqual(function.mock_calls, [mock.call(1), mock.call(1)])
+
+
+class SqliteStorageHandlerTestCase(TestCase):
+    """Tests for the sqlite storage handler"""
+
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root_dir)
+        self.db_path = os.path.join(self.root_dir, 'shared.sqlite')
+        self.storage = SqliteStorageHandler(db_path=self.db_path)
+
+    def test_get_set(self):
+        """Values are stored by key"""
+        self.assertIsNone(self.storage.get('key'))
+        self.storage.set('key', {'id': 1})
+        self.storage.set('other_key', [1, 2])
+        self.storage.set('key', {'id': 2})
+        self.assertEqual(self.storage.get('key'), {'id': 2})
+        self.assertEqual(
+            SqliteStorageHandler(db_path=self.db_path).get('other_key'),
+            [1, 2]
+        )
+        self.storage.delete('key')
+        self.assertIsNone(self.storage.get('key'))
+
+    def test_expired_values(self):
+        """Expired values are not returned and dropped by the cleanup"""
+        storage = SqliteStorageHandler(db_path=self.db_path, value_timeout=0)
+        storage.set('key', {'id': 1})
+        self.assertIsNone(storage.get('key'))
+        self.assertEqual(storage.cleanup(), 1)
+
+    def test_shared_function(self):
+        """Shared function results are stored in the database"""
+        self.assertEqual(
+            _SharedFunction('key', lambda: {'id': 1},
+                            storage_handler=self.storage)(),
+            {'id': 1}
+        )
+        self.assertEqual(
+            _SharedFunction('key', lambda: {'id': 2},
+                            storage_handler=self.storage)(),
+            {'id': 1}
+        )
+
+    def test_lock_multiprocess(self):
+        """Locks are exclusive between processes"""
+        pool = multiprocessing.Pool(DEFAULT_POOL_SIZE)
+        try:
+            pool.map(sqlite_storage_increment,
+                     [self.db_path] * DEFAULT_POOL_SIZE * 2)
+        finally:
+            pool.terminate()
+            pool.join()
+        self.assertEqual(self.storage.get('counter'), DEFAULT_POOL_SIZE * 2)
+
+    def test_lock_timeout(self):
+        """Locks held by running processes are not taken over"""
+        with self.storage.lock('key'):
+            with self.assertRaises(SqliteStorageLockError):
+                with SqliteStorageHandler(
+                        db_path=self.db_path, lock_timeout=0.2).lock('key'):
+                    pass
+
+    def test_lock_of_dead_process(self):
+        """Locks of processes which are not running are taken over"""
+        process = multiprocessing.Process(target=lambda: None)
+        process.start()
+        process.join()
+        self.storage.connection.execute(
+            'INSERT INTO shared_locks (key, owner, pid, expires)'
+            ' VALUES (?, ?, ?, ?)',
+            ('key.lock', 'owner', process.pid, time.time() + 3600)
+        )
+        with self.storage.lock('key') as owner:
+            self.assertNotEqual(owner, 'owner')
+
+
+class RedisStorageHandlerTestCase(TestCase):
+    """Tests for the redis storage handler, with the scripts run by the
+    redis server mocked
+    """
+
+    def setUp(self):
+        redis_storage.reset_lock_wait_stats()
+        self.storage = RedisStorageHandler()
+        for name in ('_acquire_script', '_set_script', '_release_script'):
+            patcher = mock.patch.object(self.storage, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(self.storage, '_client')
+        self.client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connection_pool_shared(self):
+        """Handlers with the same connection parameters share their
+        connection pool
+        """
+        pool = RedisStorageHandler().client.connection_pool
+        self.assertIs(RedisStorageHandler().client.connection_pool, pool)
+        self.assertIsNot(
+            RedisStorageHandler(db=1).client.connection_pool, pool)
+
+    def test_lock_prefetches_value(self):
+        """The value read when acquiring the lock is returned by get"""
+        self.storage._acquire_script.side_effect = [[0], [1, b'{"id": 1}']]
+        with self.storage.lock('key') as token:
+            self.assertEqual(self.storage.get('key'), {'id': 1})
+        self.client.get.assert_not_called()
+        pubsub = self.client.pubsub.return_value
+        pubsub.subscribe.assert_called_once_with('key.notify')
+        pubsub.close.assert_called_once_with()
+        self.storage._release_script.assert_called_once_with(
+            keys=['key.lock', 'key.notify'], args=[token])
+        stats = redis_storage.get_lock_wait_stats()
+        self.assertEqual(stats['count'], 1)
+        self.assertEqual(stats['timeouts'], 0)
+
+    def test_lock_waits_for_notifications(self):
+        """Waiting workers retry when notified"""
+        self.storage._acquire_script.side_effect = [[0], [0], [1, None]]
+        with self.storage.lock('key'):
+            self.assertIsNone(self.storage.get('key'))
+        self.client.pubsub.return_value.get_message.assert_called_once()
+
+    def test_lock_timeout(self):
+        """Waiting for a lock fails after the timeout"""
+        self.storage._acquire_script.return_value = [0]
+        with self.assertRaises(RedisStorageLockError):
+            with self.storage.lock('key', timeout=0):
+                pass
+        self.storage._release_script.assert_not_called()
+        self.assertEqual(redis_storage.get_lock_wait_stats()['timeouts'], 1)
+
+    def test_set_publishes_state(self):
+        """Writing a value publishes its state"""
+        self.storage.set('key', {'state': 'READY'})
+        self.storage._set_script.assert_called_once_with(
+            keys=['key', 'key.notify'], args=['{"state": "READY"}', 'READY'])
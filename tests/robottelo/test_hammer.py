@@ -1,7 +1,10 @@
 # -*- encoding: utf-8 -*-
 """Tests for Robottelo's hammer helpers"""
+import json
+import os
 import unittest2
 
+from robottelo import ssh
 from robottelo.cli import hammer
 
 
@@ -138,6 +141,68 @@ class ParseJSONTestCase(unittest2.TestCase):
                          hammer.parse_csv(csv_ouput_lines)[0])
 
 
+def split_chunks(data, size):
+    """Split bytes ``data`` in chunks of ``size`` bytes"""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class StreamParseTestCase(unittest2.TestCase):
+    """Tests for parsing hammer output while it is read"""
+
+    csv_output = (
+        u'Id,Name,Description\n'
+        u'1,"a ""quoted"" name",""\n'
+        u'[Rails traffic line]\n'
+        u'2,\x1b[32mchårs\x1b[0m,"multi\nline"\n'
+    ).encode('utf-8')
+
+    def test_iter_csv(self):
+        """Streamed rows are the same as the ones parsed from the whole
+        output, however the output is split
+        """
+        expected = ssh.build_command_result(
+            self.csv_output, b'', 0, 'csv').stdout
+        self.assertEqual(len(expected), 2)
+        for size in (1, 2, 5, len(self.csv_output)):
+            self.assertEqual(
+                list(hammer.iter_csv(hammer.iter_output_lines(
+                    split_chunks(self.csv_output, size)))),
+                expected
+            )
+
+    def test_iter_csv_empty(self):
+        """No rows are yielded for an empty output"""
+        self.assertEqual(
+            list(hammer.iter_csv(hammer.iter_output_lines([]))), [])
+
+    def test_iter_json_list(self):
+        """Each item of a JSON list is yielded, however the output is
+        split
+        """
+        output = json.dumps([
+            {u'ID': i, u'Name': u'chårs {0}'.format(i), u'Sub Item': {}}
+            for i in range(10)
+        ], indent=2, ensure_ascii=False).encode('utf-8')
+        for size in (1, 3, 100, len(output)):
+            self.assertEqual(
+                list(hammer.iter_json(split_chunks(output, size))),
+                hammer.parse_json(output.decode('utf-8'))
+            )
+
+    def test_iter_json_object(self):
+        """A JSON object is yielded once completely read"""
+        self.assertEqual(
+            list(hammer.iter_json([b'{"ID": 1,', b' "Name": "a"}'])),
+            [{u'id': u'1', u'name': u'a'}]
+        )
+        self.assertEqual(list(hammer.iter_json([b''])), [])
+
+    def test_iter_json_unterminated_list(self):
+        """An incomplete JSON list raises ValueError"""
+        with self.assertRaises(ValueError):
+            list(hammer.iter_json([b'[{"ID": 1}']))
+
+
 class ParseHelpTestCase(unittest2.TestCase):
     """Tests for parsing hammer help output"""
 
@@ -401,3 +466,53 @@ class ParseInfoTestCase(unittest2.TestCase):
             hammer.parse_json('["item1", "item2"]'),
             ['item1', 'item2']
         )
+
+
+class ParseInfoCorpusTestCase(unittest2.TestCase):
+    """Differential tests for parsing info hammer output.
+
+    Each ``.txt`` file in ``data/hammer_info`` is a recorded hammer info
+    output and the ``.json`` file with the same name is what ``parse_info``
+    returned for it before being rewritten as a single pass parser.
+    """
+    corpus_dir = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'hammer_info')
+
+    def test_corpus(self):
+        """Parsing the recorded outputs returns the recorded dicts"""
+        names = sorted(
+            name[:-len('.txt')] for name in os.listdir(self.corpus_dir)
+            if name.endswith('.txt')
+        )
+        self.assertGreater(len(names), 0)
+        for name in names:
+            path = os.path.join(self.corpus_dir, name)
+            with open(path + '.txt') as handler:
+                output = handler.read().split('\n')
+            with open(path + '.json') as handler:
+                expected = json.load(handler)
+            with self.subTest(name):
+                self.assertEqual(hammer.parse_info(output), expected)
+
+    def test_line_indentation(self):
+        """Tabs and spaces are counted like before"""
+        for line, spaces, level in (
+                ('', 0, 0),
+                ('  a', 0, 0),
+                ('    a', 4, 1),
+                ('     a', 5, 1),
+                ('\ta', 0, 0),
+                ('\tab', 0, 0),
+                ('\tabc', 4, 1),
+                (' \t  a', 7, 1),
+                ('\t\t a', 9, 2),
+                ('        ', 8, 2)):
+            self.assertEqual(hammer.get_line_indentation_spaces(line), spaces)
+            self.assertEqual(hammer.get_line_indentation_level(line), level)
+
+    def test_malformed_output(self):
+        """Malformed outputs raise the same errors as before"""
+        with self.assertRaises(ValueError):
+            hammer.parse_info(['no separator'])
+        with self.assertRaises(KeyError):
+            hammer.parse_info([' ID: 1'])
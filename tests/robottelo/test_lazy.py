@@ -0,0 +1,51 @@
+"""Tests for module ``robottelo.lazy``."""
+import sys
+import types
+
+from unittest2 import TestCase
+
+from robottelo.lazy import lazy_attributes, lazy_imports
+
+
+class LazyAttributesTestCase(TestCase):
+    """Tests for :func:`robottelo.lazy.lazy_attributes` and
+    :func:`robottelo.lazy.lazy_imports`.
+    """
+
+    def setUp(self):
+        self.module_name = 'robottelo_lazy_test_module'
+        self.module = types.ModuleType(self.module_name)
+        sys.modules[self.module_name] = self.module
+        self.addCleanup(sys.modules.pop, self.module_name, None)
+        self.calls = []
+
+    def build_table(self):
+        self.calls.append(1)
+        return {'key': 'value'}
+
+    def test_lazy_attributes(self):
+        """Attributes are built once, when first accessed"""
+        self.module.__getattr__ = lazy_attributes(
+            self.module_name, TABLE=self.build_table)
+        self.assertEqual(self.calls, [])
+        module = sys.modules[self.module_name]
+        self.assertEqual(module.TABLE, {'key': 'value'})
+        self.assertIs(module.TABLE, module.TABLE)
+        from robottelo_lazy_test_module import TABLE
+        self.assertIs(TABLE, module.TABLE)
+        self.assertEqual(self.calls, [1])
+
+    def test_missing_attribute(self):
+        """Unknown attributes raise AttributeError"""
+        self.module.__getattr__ = lazy_attributes(
+            self.module_name, TABLE=self.build_table)
+        with self.assertRaises(AttributeError):
+            sys.modules[self.module_name].OTHER_TABLE
+        self.assertFalse(hasattr(sys.modules[self.module_name], 'OTHER'))
+
+    def test_lazy_imports(self):
+        """Attributes are imported from other modules"""
+        self.module.__getattr__ = lazy_imports(
+            self.module_name, dumps='json:dumps')
+        import json
+        self.assertIs(sys.modules[self.module_name].dumps, json.dumps)
@@ -1,8 +1,10 @@
 """Tests for module ``robottelo.ssh``."""
 # (too-many-public-methods) pylint: disable=R0904
+import hashlib
 import os
 import paramiko
 import six
+import threading
 
 from robottelo import ssh
 from unittest2 import TestCase
@@ -14,24 +16,133 @@ else:
 
 
 class MockChannel(object):
-    def __init__(self, ret, status_ready=True):
+    def __init__(self, ret, stdout=b'', stderr=b'', status_ready=True):
         self.ret = ret
-        self.status_ready = status_ready
+        self.stdout = [stdout] if stdout else []
+        self.stderr = [stderr] if stderr else []
+        self.status_event = threading.Event()
+        if status_ready:
+            self.status_event.set()
+        self.eof_received = status_ready
+        self.closed = False
+        self._pipe = None
 
     def recv_exit_status(self):
         return self.ret
 
     def exit_status_ready(self):
-        return self.status_ready
+        return self.status_event.is_set()
+
+    def recv_ready(self):
+        return bool(self.stdout)
+
+    def recv(self, nbytes):
+        return self.stdout.pop(0)
+
+    def recv_stderr_ready(self):
+        return bool(self.stderr)
+
+    def recv_stderr(self, nbytes):
+        return self.stderr.pop(0)
+
+    def fileno(self):
+        # never readable, only the select timeout can wake the reader up
+        if self._pipe is None:
+            self._pipe = os.pipe()
+        return self._pipe[0]
+
+    def close(self):
+        self.closed = True
+        if self._pipe is not None:
+            for fd in self._pipe:
+                os.close(fd)
+            self._pipe = None
 
 
 class MockStdout(object):
-    def __init__(self, cmd, ret):
-        self.cmd = cmd
-        self.channel = MockChannel(ret=ret)
+    def __init__(self, channel):
+        self.channel = channel
+
+
+class MockTransport(object):
+    def __init__(self, active=True):
+        self.active = active
+        self.keepalive = None
+
+    def is_active(self):
+        return self.active
+
+    def send_ignore(self):
+        if not self.active:
+            raise EOFError()
+
+    def set_keepalive(self, interval):
+        self.keepalive = interval
+
+
+class MockSFTPFile(object):
+    """A mock ``paramiko.SFTPFile`` object, reading or writing the files of
+    a :class:`MockSFTPClient`.
+    """
+    def __init__(self, client, path, mode):
+        self.client = client
+        self.path = path
+        self.mode = mode
+        if 'w' in mode:
+            self.content = six.BytesIO()
+        else:
+            self.content = six.BytesIO(client.files[client.hostname, path])
+        self.prefetched = None
+        self.pipelined = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if 'w' in self.mode:
+            content = self.content.getvalue()
+            if MockSFTPClient.corrupt:
+                content = content[:-1]
+            self.client.files[self.client.hostname, self.path] = content
+
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(os.stat_result(
+            (0o100750, 0, 0, 1, 0, 0, len(self.content.getvalue()), 0, 0, 0)))
+
+    def prefetch(self, file_size=None):
+        self.prefetched = file_size
+
+    def set_pipelined(self, pipelined=True):
+        self.pipelined = pipelined
+
+    def read(self, size=None):
+        return self.content.read(size)
+
+    def write(self, data):
+        self.content.write(data)
+
+
+class MockSFTPClient(object):
+    """A mock ``paramiko.SFTPClient`` object, with the files of all the
+    hosts in ``files`` by host name and path.
+    """
+    files = {}
+    modes = {}
+    # set to make the written files miss their last byte
+    corrupt = False
+
+    def __init__(self, hostname):
+        self.hostname = hostname
+        self.closed = False
 
-    def read(self):
-        return self.cmd
+    def open(self, path, mode='r'):
+        return MockSFTPFile(self, path, mode)
+
+    def chmod(self, path, mode):
+        self.modes[self.hostname, path] = mode
+
+    def close(self):
+        self.closed = True
 
 
 class MockSSHClient(object):
@@ -53,6 +164,8 @@ class MockSSHClient(object):
         self.key_filename = None
         self.password = None
         self.ret_code = 0
+        self.status_ready = True
+        self.transport = MockTransport()
 
     def set_missing_host_key_policy(self, policy):  # pylint:disable=W0613
         """A no-op stub method."""
@@ -81,17 +194,37 @@ class MockSSHClient(object):
     def close(self):
         """A no-op stub method."""
         self.close_ += 1
+        self.transport.active = False
+
+    def get_transport(self):
+        return self.transport
+
+    def open_sftp(self):
+        return MockSFTPClient(self.hostname)
 
     def exec_command(self, cmd, *args, **kwargs):
-        return (
+        stdout = cmd
+        if cmd.startswith('sha256sum '):
+            # the digests of the files of the mock sftp client
+            stdout = '\n'.join(
+                '{0}  {1}'.format(hashlib.sha256(
+                    MockSFTPClient.files[self.hostname, path]).hexdigest(),
+                    path)
+                for path in cmd.split()[1:]
+            )
+        channel = MockChannel(
             self.ret_code,
-            MockStdout(cmd, self.ret_code),
-            MockStdout('', self.ret_code)
+            stdout=stdout.encode('utf-8'),
+            status_ready=self.status_ready,
         )
+        return self.ret_code, MockStdout(channel), MockStdout(channel)
 
 
 class SSHTestCase(TestCase):
     """Tests for module ``robottelo.ssh``."""
+    def setUp(self):
+        ssh._connection_pool = ssh.SSHConnectionPool()
+
     @mock.patch('robottelo.ssh.settings')
     def test_get_connection_key(self, settings):
         """Test method ``get_connection`` using key file to connect to the
@@ -113,6 +246,10 @@ class SSHTestCase(TestCase):
         settings.server.ssh_key = key_filename
         settings.ssh_client.command_timeout = 300
         settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
         with ssh.get_connection() as connection:  # pylint:disable=W0212
             self.assertEqual(connection.set_missing_host_key_policy_, 1)
             self.assertEqual(connection.connect_, 1)
@@ -142,6 +279,10 @@ class SSHTestCase(TestCase):
         settings.server.ssh_password = 'test_password'
         settings.ssh_client.command_timeout = 300
         settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
         with ssh.get_connection() as connection:  # pylint:disable=W0212
             self.assertEqual(connection.set_missing_host_key_policy_, 1)
             self.assertEqual(connection.connect_, 1)
@@ -216,6 +357,10 @@ class SSHTestCase(TestCase):
         settings.server.ssh_password = 'test_password'
         settings.ssh_client.command_timeout = 300
         settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
         ssh.add_authorized_key('ssh-rsa xxxx user@host')
 
     @mock.patch('robottelo.ssh.settings')
@@ -227,6 +372,10 @@ class SSHTestCase(TestCase):
         settings.server.ssh_password = 'test_password'
         settings.ssh_client.command_timeout = 300
         settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
 
         with ssh.get_connection() as connection:  # pylint:disable=W0212
             ret = ssh.execute_command('ls -la', connection)
@@ -242,6 +391,10 @@ class SSHTestCase(TestCase):
         settings.server.ssh_password = 'test_password'
         settings.ssh_client.command_timeout = 300
         settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
 
         with ssh.get_connection() as connection:  # pylint:disable=W0212
             ret = ssh.execute_command(
@@ -258,6 +411,10 @@ class SSHTestCase(TestCase):
         settings.server.ssh_password = 'test_password'
         settings.ssh_client.command_timeout = 300
         settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
 
         ret = ssh.command('ls -la')
         self.assertEqual(ret.stdout, [u'ls -la'])
@@ -272,6 +429,10 @@ class SSHTestCase(TestCase):
         settings.server.ssh_password = 'test_password'
         settings.ssh_client.command_timeout = 300
         settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
 
         ret = ssh.command('ls -la', output_format='plain')
         self.assertEqual(ret.stdout, u'ls -la')
@@ -286,6 +447,10 @@ class SSHTestCase(TestCase):
         settings.server.ssh_password = 'test_password'
         settings.ssh_client.command_timeout = 300
         settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
 
         ret = ssh.command('a,b,c\n1,2,3', output_format='csv')
         self.assertEqual(ret.stdout, [{u'a': u'1', u'b': u'2', u'c': u'3'}])
@@ -300,6 +465,10 @@ class SSHTestCase(TestCase):
         settings.server.ssh_password = 'test_password'
         settings.ssh_client.command_timeout = 300
         settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
 
         ret = ssh.command('{"a": 1, "b": true}', output_format='json')
         self.assertEqual(ret.stdout, {u'a': u'1', u'b': True})
@@ -310,3 +479,280 @@ class SSHTestCase(TestCase):
             ssh._call_paramiko_sshclient(),
             (paramiko.SSHClient, MockSSHClient)
         )
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_command_reuses_pooled_connection(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.command_timeout = 300
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
+
+        ssh.command('ls -la')
+        ssh.command('ls -la')
+        ssh.command('ls -la', hostname='other.example.com')
+        stats = ssh.get_connection_pool_stats()
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['reused'], 1)
+        self.assertEqual(stats['idle'], 2)
+        with ssh.get_pooled_connection() as connection:
+            self.assertEqual(connection.connect_, 1)
+            self.assertEqual(connection.close_, 0)
+            self.assertEqual(connection.transport.keepalive, 30)
+        ssh._connection_pool.close_all()
+        self.assertEqual(connection.close_, 1)
+        self.assertEqual(ssh.get_connection_pool_stats()['idle'], 0)
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_pool_discards_unhealthy_connection(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
+
+        with ssh.get_pooled_connection() as first:
+            pass
+        first.transport.active = False
+        with ssh.get_pooled_connection() as second:
+            self.assertIsNot(first, second)
+        self.assertEqual(first.close_, 1)
+        stats = ssh.get_connection_pool_stats()
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['reused'], 0)
+        self.assertEqual(stats['discarded'], 1)
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_pool_evicts_idle_connection(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 0
+        settings.ssh_client.keepalive_interval = 30
+
+        with ssh.get_pooled_connection() as first:
+            pass
+        with mock.patch('robottelo.ssh.time.time', return_value=2 ** 40):
+            with ssh.get_pooled_connection() as second:
+                self.assertIsNot(first, second)
+        self.assertEqual(first.close_, 1)
+        self.assertEqual(ssh.get_connection_pool_stats()['evicted'], 1)
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_pool_not_reused_on_error(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
+
+        with self.assertRaises(ValueError):
+            with ssh.get_pooled_connection() as connection:
+                raise ValueError()
+        self.assertEqual(connection.close_, 1)
+        self.assertEqual(ssh.get_connection_pool_stats()['idle'], 0)
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_pool_forgets_connections_after_fork(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
+
+        with ssh.get_pooled_connection() as parent_connection:
+            pass
+        with mock.patch('robottelo.ssh.os.getpid', return_value=-1):
+            with ssh.get_pooled_connection() as child_connection:
+                self.assertIsNot(parent_connection, child_connection)
+        # the inherited connection belongs to the parent and is not closed
+        self.assertEqual(parent_connection.close_, 0)
+
+    def test_iter_channel_output(self):
+        channel = MockChannel(0, stdout=b'out', stderr=b'err')
+        self.assertEqual(
+            list(ssh.iter_channel_output(channel, timeout=10)),
+            [('stdout', b'out'), ('stderr', b'err')]
+        )
+
+    def test_iter_channel_output_timeout(self):
+        channel = MockChannel(0, stdout=b'out', status_ready=False)
+        output = ssh.iter_channel_output(channel, timeout=0.1)
+        self.assertEqual(next(output), ('stdout', b'out'))
+        with self.assertRaises(ssh.SSHCommandTimeoutError):
+            next(output)
+        self.assertTrue(channel.closed)
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_execute_command_timeout(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.command_timeout = 300
+        settings.ssh_client.connection_timeout = 10
+
+        with ssh.get_connection() as connection:  # pylint:disable=W0212
+            connection.status_ready = False
+            with self.assertRaises(ssh.SSHCommandTimeoutError):
+                ssh.execute_command('sleep 10', connection, timeout=0.1)
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_run_many(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.command_timeout = 300
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
+
+        cmds = ['echo {0}'.format(i) for i in range(25)]
+        results = ssh.run_many(cmds, output_format='plain', concurrency=4)
+        self.assertEqual([result.stdout for result in results], cmds)
+        self.assertEqual(ssh.run_many([]), [])
+        self.assertEqual(ssh.get_connection_pool_stats()['created'], 1)
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_execute_many_timeout(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.command_timeout = 300
+        settings.ssh_client.connection_timeout = 10
+
+        with ssh.get_connection() as connection:  # pylint:disable=W0212
+            connection.status_ready = False
+            with self.assertRaises(ssh.SSHCommandTimeoutError):
+                ssh.execute_many(['sleep 10', 'sleep 10'], connection,
+                                 timeout=0.1)
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_stream_command(self, settings):
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.command_timeout = 300
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
+
+        with ssh.stream_command('ls -la') as stream:
+            self.assertIsNone(stream.return_code)
+            self.assertEqual(list(stream), [b'ls -la'])
+            self.assertEqual(stream.return_code, 0)
+            self.assertEqual(stream.stderr, b'')
+
+    def _configure_transfer(self, settings):
+        """Configure the settings and mock sftp client for transfers"""
+        ssh._call_paramiko_sshclient = MockSSHClient  # pylint:disable=W0212
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.command_timeout = 300
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.connection_pool = True
+        settings.ssh_client.pool_max_size = 4
+        settings.ssh_client.pool_max_idle_time = 300
+        settings.ssh_client.keepalive_interval = 30
+        MockSFTPClient.files = {
+            ('example.com', '/tmp/certs.tar'): b'certs' * 1000,
+            ('example.com', '/tmp/deploy.sh'): b'#!/bin/sh',
+        }
+        MockSFTPClient.modes = {}
+        MockSFTPClient.corrupt = False
+
+    @mock.patch('robottelo.ssh.TRANSFER_CHUNK_SIZE', 1024)
+    @mock.patch('robottelo.ssh.settings')
+    def test_transfer_files(self, settings):
+        """Check the files are streamed from the server to the other host,
+        with their permissions
+        """
+        self._configure_transfer(settings)
+        progress = mock.Mock()
+        digests = ssh.transfer_files(
+            ['/tmp/certs.tar', ('/tmp/deploy.sh', '/root/deploy.sh')],
+            destination_hostname='vm.example.com', progress=progress
+        )
+        files = MockSFTPClient.files
+        self.assertEqual(files['vm.example.com', '/tmp/certs.tar'],
+                         b'certs' * 1000)
+        self.assertEqual(files['vm.example.com', '/root/deploy.sh'],
+                         b'#!/bin/sh')
+        self.assertEqual(digests, [
+            hashlib.sha256(b'certs' * 1000).hexdigest(),
+            hashlib.sha256(b'#!/bin/sh').hexdigest(),
+        ])
+        self.assertEqual(
+            MockSFTPClient.modes['vm.example.com', '/root/deploy.sh'], 0o750)
+        self.assertEqual(progress.call_args_list, [
+            mock.call('/tmp/certs.tar', 1024, 5000),
+            mock.call('/tmp/certs.tar', 2048, 5000),
+            mock.call('/tmp/certs.tar', 3072, 5000),
+            mock.call('/tmp/certs.tar', 4096, 5000),
+            mock.call('/tmp/certs.tar', 5000, 5000),
+            mock.call('/root/deploy.sh', 9, 9),
+        ])
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_transfer_file(self, settings):
+        """Check a file keeps its path when no destination is given"""
+        self._configure_transfer(settings)
+        digest = ssh.transfer_file(
+            '/tmp/deploy.sh', source_hostname='example.com',
+            destination_hostname='vm.example.com'
+        )
+        self.assertEqual(digest, hashlib.sha256(b'#!/bin/sh').hexdigest())
+        self.assertEqual(
+            MockSFTPClient.files['vm.example.com', '/tmp/deploy.sh'],
+            b'#!/bin/sh')
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_transfer_file_verify(self, settings):
+        """Check an error is raised when the written file differs"""
+        self._configure_transfer(settings)
+        MockSFTPClient.corrupt = True
+        with self.assertRaises(ssh.SSHTransferError):
+            ssh.transfer_file(
+                '/tmp/deploy.sh', destination_hostname='vm.example.com')
+        # not verified
+        ssh.transfer_file('/tmp/deploy.sh', '/tmp/deploy2.sh',
+                          destination_hostname='vm.example.com', verify=False)
@@ -1,10 +1,20 @@
 """Tests for :mod:`robottelo.vm`."""
 import unittest2
+from collections import OrderedDict
 from robottelo import ssh
 from robottelo.config.base import DistroSettings
-from robottelo.vm import VirtualMachine, VirtualMachineError
+from robottelo.constants import DISTRO_RHEL7
+from robottelo.vm import (
+    _poll,
+    _record_boot_timings,
+    format_boot_stats,
+    get_boot_stats,
+    reset_boot_stats,
+    VirtualMachine,
+    VirtualMachineError,
+)
 
-from unittest.mock import call, patch
+from unittest.mock import call, Mock, patch
 
 
 class VirtualMachineTestCase(unittest2.TestCase):
@@ -30,13 +40,16 @@ class VirtualMachineTestCase(unittest2.TestCase):
         self.settings.clients.provisioning_server = self.provisioning_server
 
     @patch('time.sleep')
-    @patch('robottelo.ssh.command', side_effect=[
-        ssh.SSHCommandResult(),
-        ssh.SSHCommandResult(stdout=['(192.168.0.1)']),
+    @patch('robottelo.ssh.get_pooled_connection')
+    @patch('robottelo.ssh.execute_command', side_effect=[
+        ssh.SSHCommandResult(stdout=['running']),
+        ssh.SSHCommandResult(stdout=[
+            ' vnet0  52:54:00:8b:ac:8e  ipv4  192.168.0.1/24']),
         ssh.SSHCommandResult()
     ])
+    @patch('robottelo.ssh.command', return_value=ssh.SSHCommandResult())
     def test_dont_create_if_already_created(
-            self, ssh_command, sleep):
+            self, ssh_command, execute_command, get_pooled_connection, sleep):
         """Check if the creation steps are run more than once"""
         self.configure_provisoning_server()
         vm = VirtualMachine()
@@ -49,7 +62,78 @@ class VirtualMachineTestCase(unittest2.TestCase):
             vm.create()
             vm.create()
         self.assertEqual(vm.ip_addr, '192.168.0.1')
-        self.assertEqual(ssh_command.call_count, 3)
+        self.assertEqual(ssh_command.call_count, 1)
+        self.assertEqual(execute_command.call_count, 3)
+        get_pooled_connection.assert_called_once_with(
+            hostname='provisioning.example.com', timeout=30)
+        self.assertEqual(
+            list(vm.boot_timings), ['clone', 'boot', 'dhcp', 'sshd'])
+
+    @patch('time.sleep')
+    @patch('robottelo.ssh.get_pooled_connection')
+    @patch('robottelo.ssh.execute_command', side_effect=[
+        ssh.SSHCommandResult(stdout=['running']),
+        ssh.SSHCommandResult(return_code=1),
+        ssh.SSHCommandResult(return_code=1),
+        ssh.SSHCommandResult(stdout=['Address', '--------']),
+        ssh.SSHCommandResult(stdout=[
+            'PING host.local (192.168.0.2) 56(84) bytes of data.']),
+        ssh.SSHCommandResult(return_code=1),
+        ssh.SSHCommandResult()
+    ])
+    @patch('robottelo.ssh.command', return_value=ssh.SSHCommandResult())
+    def test_create_probes_with_backoff(
+            self, ssh_command, execute_command, get_pooled_connection, sleep):
+        """Check the IP address is read from ping when libvirt does not
+        know it, and the probes are retried with growing intervals
+        """
+        self.configure_provisoning_server()
+        vm = VirtualMachine(distro=DISTRO_RHEL7)
+        vm.create()
+        self.assertEqual(vm.ip_addr, '192.168.0.2')
+        self.assertEqual(
+            [args[0][0].split()[0] for args in
+             execute_command.call_args_list[1:5]],
+            ['virsh', 'ping', 'virsh', 'ping']
+        )
+        self.assertEqual(
+            [args[0][0] for args in sleep.call_args_list], [0.25, 0.25])
+
+    @patch('robottelo.ssh.command', return_value=ssh.SSHCommandResult(
+        stdout=['PING host.local (192.168.0.3) 56(84) bytes of data.']))
+    def test_probe_ip_addr_network(self, ssh_command):
+        """Check the IP address of a virtual machine on a libvirt network is
+        read from the DHCP leases, and pinged from the satellite when not
+        found
+        """
+        self.configure_provisoning_server()
+        self.settings.server.hostname = 'satellite.example.com'
+        vm = VirtualMachine(distro=DISTRO_RHEL7, network='vlan')
+        vm.nw_type = 'network'
+        run = Mock(return_value=ssh.SSHCommandResult(return_code=1))
+        self.assertEqual(vm._probe_ip_addr(run), '192.168.0.3')
+        run.assert_called_once_with(
+            u'virsh domifaddr {0} --source lease'.format(vm.target_image))
+        ssh_command.assert_called_once_with(
+            u'ping -c1 -W1 {0}.local'.format(vm._target_image),
+            'satellite.example.com', timeout=10, connection_timeout=30)
+
+    @patch('time.sleep')
+    @patch('robottelo.ssh.get_pooled_connection')
+    @patch('robottelo.ssh.execute_command',
+           return_value=ssh.SSHCommandResult(stdout=['shut off']))
+    @patch('robottelo.ssh.command', return_value=ssh.SSHCommandResult())
+    def test_create_not_ready(
+            self, ssh_command, execute_command, get_pooled_connection, sleep):
+        """Check the virtual machine is destroyed when not ready in time"""
+        self.configure_provisoning_server()
+        vm = VirtualMachine(distro=DISTRO_RHEL7)
+        with patch('robottelo.vm.READY_TIMEOUT', 0), \
+                patch.object(vm, 'destroy') as destroy:
+            with self.assertRaises(VirtualMachineError):
+                vm.create()
+        destroy.assert_called_once_with()
+        self.assertEqual(list(vm.boot_timings), ['clone', 'boot'])
 
     def test_invalid_distro(self):
         """Check if an exception is raised if an invalid distro is passed"""
@@ -126,3 +210,85 @@ class VirtualMachineTestCase(unittest2.TestCase):
         ]
 
         self.assertListEqual(ssh_command.call_args_list, ssh_command_args_list)
+
+    @patch('robottelo.ssh.command')
+    def test_destroy_pooled(self, ssh_command):
+        """Check destroy hands a pooled virtual machine back to its pool"""
+        self.configure_provisoning_server()
+        vm = VirtualMachine(distro=DISTRO_RHEL7)
+        vm._created = True
+        pool = vm._pool = Mock()
+        vm.destroy()
+        pool.release.assert_called_once_with(vm)
+        ssh_command.assert_not_called()
+
+    @patch('robottelo.ssh.command')
+    def test_create_adopts_warm_vm(self, ssh_command):
+        """Check create takes over a virtual machine of the default pool"""
+        self.configure_provisoning_server()
+        vm = VirtualMachine(distro=DISTRO_RHEL7)
+        warm_vm = VirtualMachine(distro=DISTRO_RHEL7)
+        warm_vm._created = True
+        warm_vm.ip_addr = '192.168.0.1'
+        warm_vm.bridge = 'br0'
+        warm_vm.nw_type = 'bridge'
+        pool = Mock()
+        pool.take.return_value = warm_vm
+        key = vm._get_pool_key()
+        with patch('robottelo.vm_pool._default_pool', pool):
+            vm.create()
+        pool.take.assert_called_once_with(key)
+        ssh_command.assert_not_called()
+        self.assertTrue(vm._created)
+        self.assertEqual(vm.ip_addr, '192.168.0.1')
+        self.assertEqual(vm.hostname, warm_vm.hostname)
+
+    def test_custom_name_not_pooled(self):
+        """Check virtual machines with custom names can not be replaced by
+        warm pool ones
+        """
+        self.configure_provisoning_server()
+        self.assertIsNotNone(VirtualMachine(distro=DISTRO_RHEL7)._get_pool_key())
+        self.assertIsNone(VirtualMachine(distro=DISTRO_RHEL7, tag='test')._get_pool_key())
+        self.assertIsNone(
+            VirtualMachine(
+                distro=DISTRO_RHEL7, hostname='host.example.com')._get_pool_key())
+
+
+class PollTestCase(unittest2.TestCase):
+    """Tests for the readiness polling of the virtual machines"""
+
+    @patch('time.sleep')
+    def test_poll_probe_timeout(self, sleep):
+        """Check a probe timing out does not stop the polling"""
+        probe = Mock(side_effect=[
+            ssh.SSHCommandTimeoutError('timed out'), None, 'ready'])
+        self.assertEqual(_poll(probe, timeout=60), 'ready')
+        self.assertEqual(probe.call_count, 3)
+
+    @patch('time.sleep')
+    def test_poll_timeout(self, sleep):
+        """Check None is returned when the probe keeps timing out"""
+        probe = Mock(side_effect=ssh.SSHCommandTimeoutError('timed out'))
+        self.assertIsNone(_poll(probe, timeout=0))
+        probe.assert_called_once_with()
+
+
+class BootStatsTestCase(unittest2.TestCase):
+    """Tests for the virtual machines boot stats"""
+
+    def setUp(self):
+        super(BootStatsTestCase, self).setUp()
+        reset_boot_stats()
+        self.addCleanup(reset_boot_stats)
+
+    def test_format_boot_stats(self):
+        """Check the boot timings are aggregated by phase"""
+        _record_boot_timings(OrderedDict([('clone', 2), ('boot', 1)]))
+        _record_boot_timings(OrderedDict([('clone', 4), ('boot', 3)]))
+        self.assertEqual(get_boot_stats()['clone'],
+                         {'count': 2, 'total_time': 6, 'max_time': 4})
+        self.assertEqual(format_boot_stats(), [
+            'clone: 2 vms, average 3.0s (max 4.0s)',
+            'boot: 2 vms, average 2.0s (max 3.0s)',
+        ])
@@ -0,0 +1,215 @@
+"""Tests for :mod:`robottelo.vm_capsule`."""
+import six
+import unittest2
+
+from robottelo import ssh
+from robottelo.config.base import DistroSettings
+from robottelo.vm import VirtualMachine
+from robottelo.vm_capsule import (
+    _get_satellite_ca_fingerprint,
+    CapsuleVirtualMachine,
+    CapsuleVirtualMachineError,
+    get_golden_image,
+    get_golden_image_name,
+)
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class GoldenImageTestCase(unittest2.TestCase):
+    """Tests for the capsule golden image functions"""
+
+    def setUp(self):
+        super(GoldenImageTestCase, self).setUp()
+        settings_patcher = mock.patch('robottelo.vm_capsule.settings')
+        self.settings = settings_patcher.start()
+        self.addCleanup(settings_patcher.stop)
+        self.settings.server.hostname = 'satellite.example.com'
+        self.settings.capsule_repo = 'http://repos.example.com/capsule'
+        self.settings.clients.provisioning_server = 'provisioning.example.com'
+        self.settings.clients.image_dir = None
+        fingerprint_patcher = mock.patch(
+            'robottelo.vm_capsule._get_satellite_ca_fingerprint',
+            return_value='SHA256 Fingerprint=AA:BB')
+        self.fingerprint = fingerprint_patcher.start()
+        self.addCleanup(fingerprint_patcher.stop)
+
+    def test_golden_image_name(self):
+        """Check the name depends on the distro, satellite, satellite CA and
+        capsule repository
+        """
+        name = get_golden_image_name('rhel76')
+        self.assertTrue(name.startswith('rhel76-capsule-'))
+        self.assertEqual(get_golden_image_name('rhel76'), name)
+        self.assertNotEqual(get_golden_image_name('rhel75'), name)
+        self.fingerprint.return_value = 'SHA256 Fingerprint=CC:DD'
+        new_ca_name = get_golden_image_name('rhel76')
+        self.assertNotEqual(new_ca_name, name)
+        self.settings.capsule_repo = 'http://repos.example.com/capsule-next'
+        self.assertNotIn(get_golden_image_name('rhel76'), (name, new_ca_name))
+
+    @mock.patch('robottelo.ssh.command')
+    def test_satellite_ca_fingerprint(self, ssh_command):
+        """Check the fingerprint of the satellite CA is read on the
+        satellite
+        """
+        # the function imported by the tests is not the patched one
+        ssh_command.return_value = ssh.SSHCommandResult(
+            stdout=['SHA256 Fingerprint=AA:BB', ''])
+        self.assertEqual(
+            _get_satellite_ca_fingerprint(), 'SHA256 Fingerprint=AA:BB')
+        ssh_command.assert_called_once_with(
+            'openssl x509 -noout -fingerprint -sha256 -in '
+            '/etc/pki/katello/certs/katello-default-ca.crt',
+            hostname='satellite.example.com'
+        )
+        ssh_command.return_value = ssh.SSHCommandResult(return_code=1)
+        with self.assertRaises(CapsuleVirtualMachineError):
+            _get_satellite_ca_fingerprint()
+
+    @mock.patch('robottelo.vm_capsule.CapsuleVirtualMachine')
+    @mock.patch('robottelo.ssh.command', return_value=ssh.SSHCommandResult())
+    def test_existing_golden_image(self, ssh_command, capsule_vm):
+        """Check an existing golden image is not built again"""
+        name = get_golden_image('rhel76')
+        self.assertEqual(name, get_golden_image_name('rhel76'))
+        ssh_command.assert_called_once_with(
+            'test -f /var/lib/libvirt/images/{0}.img'.format(name),
+            hostname='provisioning.example.com', timeout=None,
+            connection_timeout=30
+        )
+        capsule_vm.assert_not_called()
+
+    @mock.patch('time.sleep')
+    @mock.patch('robottelo.vm_capsule.CapsuleVirtualMachine')
+    @mock.patch('robottelo.ssh.command')
+    def test_build_golden_image(self, ssh_command, capsule_vm, sleep):
+        """Check the golden image is built from a capsule shut down and
+        flattened
+        """
+        builder = capsule_vm.return_value
+        builder.hostname = 'builder.example.com'
+        builder.target_image = 'builder'
+        ssh_command.side_effect = [
+            ssh.SSHCommandResult(return_code=1),
+            ssh.SSHCommandResult(),
+            ssh.SSHCommandResult(stdout=['running']),
+            ssh.SSHCommandResult(stdout=['shut off']),
+            ssh.SSHCommandResult(),
+        ]
+        name = get_golden_image('rhel76', image_dir='/opt/images')
+        capsule_vm.assert_called_once_with(
+            cpu=4, ram=16384, distro='rhel76',
+            provisioning_server='provisioning.example.com',
+            image_dir='/opt/images', golden_image=False
+        )
+        commands = [args[0][0] for args in ssh_command.call_args_list]
+        self.assertEqual(commands[1], 'virsh shutdown builder')
+        self.assertEqual(
+            commands[4],
+            'qemu-img convert -O qcow2 /opt/images/builder.img '
+            '/opt/images/{0}.img.tmp && mv /opt/images/{0}.img.tmp '
+            '/opt/images/{0}.img'.format(name)
+        )
+        builder._add_identity_scenario.assert_called_once_with()
+        capsule_vm.return_value.__exit__.assert_called_once_with(
+            None, None, None)
+
+    @mock.patch('robottelo.vm_capsule.CapsuleVirtualMachine')
+    @mock.patch('robottelo.ssh.command')
+    def test_build_golden_image_fails(self, ssh_command, capsule_vm):
+        """Check an error is raised when the image can not be saved"""
+        capsule_vm.return_value.target_image = 'vm'
+        ssh_command.side_effect = [
+            ssh.SSHCommandResult(return_code=1),
+            ssh.SSHCommandResult(),
+            ssh.SSHCommandResult(stdout=['shut off']),
+            ssh.SSHCommandResult(return_code=1, stderr='no space'),
+        ]
+        with self.assertRaises(CapsuleVirtualMachineError):
+            get_golden_image('rhel76')
+
+
+class CapsuleVirtualMachineTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.vm_capsule.CapsuleVirtualMachine`"""
+
+    def setUp(self):
+        super(CapsuleVirtualMachineTestCase, self).setUp()
+        for target in ('robottelo.vm.settings', 'robottelo.vm_capsule.settings'):
+            settings_patcher = mock.patch(target)
+            settings = settings_patcher.start()
+            self.addCleanup(settings_patcher.stop)
+            settings.server.hostname = 'satellite.example.com'
+            settings.clients.provisioning_server = 'provisioning.example.com'
+            settings.clients.image_dir = '/opt/images'
+            settings.capsule.instance_name = 'capsule'
+            settings.capsule.golden_image = False
+            settings.distro = DistroSettings()
+            settings.distro.image_el7 = 'rhel76'
+        setting_patcher = mock.patch(
+            'robottelo.vm_capsule.setting_is_set', return_value=True)
+        setting_patcher.start()
+        self.addCleanup(setting_patcher.stop)
+        self.vm = CapsuleVirtualMachine(distro='rhel76')
+
+    @mock.patch.object(VirtualMachine, 'destroy')
+    @mock.patch.object(CapsuleVirtualMachine, '_capsule_cleanup')
+    @mock.patch('robottelo.ssh.command', return_value=ssh.SSHCommandResult())
+    def test_destroy_removes_satellite_record(
+            self, ssh_command, cleanup, destroy):
+        """Check the capsule record added to the satellite hosts file is
+        removed, even when the capsule cleanup fails
+        """
+        self.vm._satellite_hosts_entry = True
+        cleanup.side_effect = CapsuleVirtualMachineError('cleanup failed')
+        with self.assertRaises(CapsuleVirtualMachineError):
+            self.vm.destroy()
+        ssh_command.assert_called_once_with(
+            "sed -i '/{0}/d' /etc/hosts".format(self.vm.hostname),
+            hostname='satellite.example.com'
+        )
+        self.assertFalse(self.vm._satellite_hosts_entry)
+        cleanup.side_effect = None
+        self.vm.destroy()
+        ssh_command.assert_called_once()
+        destroy.assert_called_once_with()
+
+    @mock.patch('robottelo.vm_capsule.bz_bug_is_open', return_value=False)
+    @mock.patch('robottelo.ssh.transfer_file')
+    @mock.patch('robottelo.ssh.command')
+    def test_configure_identity(self, ssh_command, transfer_file, bz_open):
+        """Check a cloned capsule gets its certificates and registration from
+        the identity installer scenario
+        """
+        ssh_command.return_value = ssh.SSHCommandResult(stdout=[
+            'satellite-installer --scenario capsule \\',
+            '    --certs-tar-file "/tmp/capsule-certs.tar"',
+        ])
+        with mock.patch.object(self.vm, 'run') as run:
+            run.return_value = ssh.SSHCommandResult(stdout=[])
+            self.vm._configure_capsule(scenario='capsule-identity')
+        self.assertEqual(run.call_args_list[0], mock.call(
+            'satellite-installer --scenario capsule-identity '
+            '--certs-tar-file "/tmp/capsule-certs.tar" --certs-update-all',
+            timeout=600
+        ))
+        transfer_file.assert_called_once_with(
+            '/tmp/{0}-certs.tar'.format(self.vm.hostname),
+            source_hostname='satellite.example.com',
+            destination_hostname=self.vm.ip_addr,
+            destination_key_filename=mock.ANY
+        )
+
+    def test_add_identity_scenario_fails(self):
+        """Check an error is raised when the identity scenario can not be
+        added
+        """
+        with mock.patch.object(self.vm, 'run') as run:
+            run.return_value = ssh.SSHCommandResult(return_code=1)
+            with self.assertRaises(CapsuleVirtualMachineError):
+                self.vm._add_identity_scenario()
+        self.assertIn(
+            '/etc/foreman-installer/scenarios.d', run.call_args[0][0])
@@ -0,0 +1,128 @@
+"""Tests for :mod:`robottelo.vm_fleet`."""
+import threading
+import time
+
+import six
+import unittest2
+
+from robottelo import ssh, vm_fleet
+from robottelo.vm import VirtualMachineError
+from robottelo.vm_fleet import VirtualMachineFleet, VirtualMachineFleetError
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+def make_vm(index, server='provisioning.example.com'):
+    """Return a mock virtual machine"""
+    vm = mock.Mock(name='vm{0}'.format(index))
+    vm.hostname = 'vm{0}.example.com'.format(index)
+    vm.provisioning_server = server
+    return vm
+
+
+class VirtualMachineFleetTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.vm_fleet.VirtualMachineFleet`."""
+
+    def test_invalid_arguments(self):
+        """Check either count or vms must be given"""
+        with self.assertRaises(ValueError):
+            VirtualMachineFleet()
+        with self.assertRaises(ValueError):
+            VirtualMachineFleet(count=1, vms=[make_vm(0)])
+        with self.assertRaises(ValueError):
+            VirtualMachineFleet(vms=[make_vm(0)], distro='rhel7')
+
+    @mock.patch.object(vm_fleet, 'VirtualMachine')
+    def test_count(self, vm_class):
+        """Check count virtual machines are instantiated"""
+        fleet = VirtualMachineFleet(3, distro='rhel7')
+        self.assertEqual(len(fleet), 3)
+        self.assertEqual(
+            vm_class.call_args_list, [mock.call(distro='rhel7')] * 3)
+
+    def test_context_manager(self):
+        """Check all the virtual machines are created and destroyed"""
+        vms = [make_vm(index) for index in range(4)]
+        with VirtualMachineFleet(vms=vms) as fleet:
+            self.assertEqual(list(fleet), vms)
+            for vm in vms:
+                vm.create.assert_called_once_with()
+                vm.destroy.assert_not_called()
+        for vm in vms:
+            vm.destroy.assert_called_once_with()
+
+    def test_max_parallel_per_server(self):
+        """Check at most max_parallel virtual machines are created at the
+        same time on each provisioning server
+        """
+        lock = threading.Lock()
+        running = {}
+        max_running = {}
+
+        def create(vm):
+            server = vm.provisioning_server
+            with lock:
+                running[server] = running.get(server, 0) + 1
+                max_running[server] = max(
+                    max_running.get(server, 0), running[server])
+            time.sleep(0.05)
+            with lock:
+                running[server] -= 1
+
+        vms = [make_vm(index, 'server{0}'.format(index % 2))
+               for index in range(8)]
+        for vm in vms:
+            vm.create.side_effect = lambda vm=vm: create(vm)
+        VirtualMachineFleet(vms=vms, max_parallel=2).create()
+        self.assertEqual(max_running, {'server0': 2, 'server1': 2})
+
+    def test_create_rollback(self):
+        """Check the fleet is destroyed when some virtual machines could
+        not be created
+        """
+        vms = [make_vm(index) for index in range(3)]
+        vms[1].create.side_effect = VirtualMachineError('no ip')
+        vms[2].destroy.side_effect = VirtualMachineError('gone')
+        fleet = VirtualMachineFleet(vms=vms)
+        with self.assertRaises(VirtualMachineFleetError) as context:
+            fleet.create()
+        self.assertEqual(list(context.exception.errors), [1])
+        self.assertIn('#1 vm1.example.com: no ip', str(context.exception))
+        for vm in vms:
+            vm.destroy.assert_called_once_with()
+
+    def test_destroy_errors(self):
+        """Check all the virtual machines are destroyed before raising"""
+        vms = [make_vm(index) for index in range(3)]
+        vms[0].destroy.side_effect = VirtualMachineError('failed')
+        with self.assertRaises(VirtualMachineFleetError) as context:
+            VirtualMachineFleet(vms=vms).destroy()
+        self.assertEqual(list(context.exception.errors), [0])
+        for vm in vms:
+            vm.destroy.assert_called_once_with()
+
+    def test_run(self):
+        """Check the command runs on all the virtual machines"""
+        vms = [make_vm(index) for index in range(3)]
+        for index, vm in enumerate(vms):
+            vm.run.return_value = ssh.SSHCommandResult(stdout=[str(index)])
+        results = VirtualMachineFleet(vms=vms).run('hostname', timeout=10)
+        self.assertEqual([result.stdout for result in results],
+                         [['0'], ['1'], ['2']])
+        for vm in vms:
+            vm.run.assert_called_once_with('hostname', timeout=10)
+
+    def test_run_errors(self):
+        """Check the results of the other virtual machines are kept when the
+        command could not run on some
+        """
+        vms = [make_vm(index) for index in range(2)]
+        vms[0].run.side_effect = VirtualMachineError('not created')
+        vms[1].run.return_value = ssh.SSHCommandResult(stdout=['ok'])
+        with self.assertRaises(VirtualMachineFleetError) as context:
+            VirtualMachineFleet(vms=vms).run('ls')
+        self.assertEqual(context.exception.results[0], None)
+        self.assertEqual(context.exception.results[1].stdout, ['ok'])
@@ -0,0 +1,240 @@
+"""Tests for :mod:`robottelo.vm_pool`."""
+import threading
+
+import six
+import unittest2
+
+from robottelo import ssh, vm_pool
+from robottelo.config.base import DistroSettings
+from robottelo.constants import DISTRO_RHEL7
+from robottelo.vm import VirtualMachine, VirtualMachineError
+from robottelo.vm_pool import VirtualMachinePool
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class FakeVirtualMachine(object):
+    """Stands for :class:`robottelo.vm.VirtualMachine`, without provisioning
+    server.
+    """
+    # set to make the creations fail
+    fail = False
+    # cleared to block the creations
+    can_create = None
+
+    def __init__(self, distro=None, **kwargs):
+        self.distro = distro
+        self.kwargs = kwargs
+        self.hostname = u'{0}.example.com'.format(id(self))
+        self._pool = None
+        self.created = False
+        self.destroyed = False
+
+    def _get_pool_key(self):
+        return (self.distro,)
+
+    def create(self):
+        if self.can_create is not None:
+            self.can_create.wait()
+        if self.fail:
+            raise VirtualMachineError('create failed')
+        self.created = True
+
+    def destroy(self):
+        self.destroyed = True
+
+
+class PoolTestMixin(object):
+    """Helpers for the pool tests"""
+
+    def wait_ready(self, pool, distro, count):
+        """Wait for ``count`` virtual machines of distro to be ready"""
+        with pool._condition:
+            while (len(pool._ready[distro]) < count and
+                   pool._pending[distro]):
+                pool._condition.wait(5)
+        self.assertEqual(len(pool._ready[distro]), count)
+
+
+class VirtualMachinePoolTestCase(PoolTestMixin, unittest2.TestCase):
+    """Tests for :class:`robottelo.vm_pool.VirtualMachinePool`."""
+
+    def setUp(self):
+        super(VirtualMachinePoolTestCase, self).setUp()
+        self.vm_patcher = mock.patch.object(
+            vm_pool, 'VirtualMachine', FakeVirtualMachine)
+        self.vm_patcher.start()
+        self.addCleanup(self.vm_patcher.stop)
+        FakeVirtualMachine.fail = False
+        FakeVirtualMachine.can_create = None
+
+    def get_pool(self, **kwargs):
+        """Return a started pool closed at the end of the test"""
+        pool = VirtualMachinePool(**kwargs)
+        self.addCleanup(pool.close)
+        pool.start()
+        return pool
+
+    def test_start_warms_vms(self):
+        """Check the pool creates size virtual machines by distro"""
+        prepare = mock.Mock()
+        pool = self.get_pool(
+            size=2, distros=['rhel6', 'rhel7'], prepare=prepare, ram=1024)
+        self.wait_ready(pool, 'rhel6', 2)
+        self.wait_ready(pool, 'rhel7', 2)
+        self.assertEqual(prepare.call_count, 4)
+        for distro in ('rhel6', 'rhel7'):
+            for _, vm in pool._ready[distro]:
+                self.assertTrue(vm.created)
+                self.assertEqual(vm.distro, distro)
+                self.assertEqual(vm.kwargs, {'ram': 1024})
+
+    def test_get(self):
+        """Check a ready virtual machine is handed out and replaced"""
+        pool = self.get_pool(size=1, distros=['rhel7'])
+        self.wait_ready(pool, 'rhel7', 1)
+        ready_vm = pool._ready['rhel7'][0][1]
+        vm = pool.get('rhel7')
+        self.assertIs(vm, ready_vm)
+        self.assertIs(vm._pool, pool)
+        self.wait_ready(pool, 'rhel7', 1)
+        self.assertIsNot(pool._ready['rhel7'][0][1], vm)
+
+    def test_get_waits_for_pending(self):
+        """Check get waits for the virtual machine being created"""
+        FakeVirtualMachine.can_create = threading.Event()
+        pool = self.get_pool(size=1, distros=['rhel7'])
+        threading.Timer(0.1, FakeVirtualMachine.can_create.set).start()
+        vm = pool.get('rhel7')
+        self.assertTrue(vm.created)
+
+    def test_get_invalid_distro(self):
+        """Check get raises an exception for a distro not in the pool"""
+        pool = self.get_pool(size=1, distros=['rhel7'])
+        with self.assertRaises(VirtualMachineError):
+            pool.get('rhel6')
+
+    def test_failures_stop_warming(self):
+        """Check the pool stops creating virtual machines failing to be
+        created, and get creates them itself.
+        """
+        FakeVirtualMachine.fail = True
+        pool = self.get_pool(size=1, distros=['rhel7'])
+        for _ in range(vm_pool.MAX_FAILURES):
+            with self.assertRaises(VirtualMachineError):
+                pool.get('rhel7')
+        self.assertEqual(pool._failures['rhel7'], vm_pool.MAX_FAILURES)
+        with pool._condition:
+            self.assertEqual(pool._pending['rhel7'], 0)
+        FakeVirtualMachine.fail = False
+        vm = pool.get('rhel7')
+        self.assertTrue(vm.created)
+        with pool._condition:
+            self.assertEqual(pool._pending['rhel7'], 0)
+
+    def test_take(self):
+        """Check a ready virtual machine is taken by its pool key"""
+        pool = self.get_pool(size=1, distros=['rhel7'])
+        self.wait_ready(pool, 'rhel7', 1)
+        self.assertIsNone(pool.take(('rhel6',)))
+        vm = pool.take(('rhel7',))
+        self.assertTrue(vm.created)
+        self.assertIsNone(vm._pool)
+
+    def test_release_and_close(self):
+        """Check the released and ready virtual machines are destroyed"""
+        pool = self.get_pool(size=1, distros=['rhel7'])
+        vm = pool.get('rhel7')
+        pool.release(vm)
+        self.assertIsNone(vm._pool)
+        self.wait_ready(pool, 'rhel7', 1)
+        ready_vm = pool._ready['rhel7'][0][1]
+        pool.close()
+        self.assertTrue(vm.destroyed)
+        self.assertTrue(ready_vm.destroyed)
+        self.assertEqual(pool._ready['rhel7'], [])
+        self.assertFalse(pool._threads)
+
+
+class DefaultPoolTestCase(unittest2.TestCase):
+    """Tests for the default pool functions"""
+
+    def setUp(self):
+        super(DefaultPoolTestCase, self).setUp()
+        settings_patcher = mock.patch.object(vm_pool, 'settings')
+        self.settings = settings_patcher.start()
+        self.addCleanup(settings_patcher.stop)
+        self.addCleanup(vm_pool.close_default_pool)
+
+    def test_disabled(self):
+        """Check no pool is started when its size is 0"""
+        self.settings.clients.pool_size = 0
+        self.assertIsNone(vm_pool.start_default_pool())
+        self.assertIsNone(vm_pool.get_default_pool())
+
+    @mock.patch.object(VirtualMachinePool, 'start')
+    def test_start_and_close(self, start):
+        """Check the default pool is started once and closed"""
+        self.settings.clients.pool_size = 2
+        self.settings.clients.pool_distros = ['rhel7']
+        pool = vm_pool.start_default_pool()
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.distros, ['rhel7'])
+        self.assertIs(vm_pool.start_default_pool(), pool)
+        self.assertIs(vm_pool.get_default_pool(), pool)
+        start.assert_called_once_with()
+        with mock.patch.object(pool, 'close') as close:
+            vm_pool.close_default_pool()
+        close.assert_called_once_with()
+        self.assertIsNone(vm_pool.get_default_pool())
+
+
+class DefaultPoolRefillTestCase(PoolTestMixin, unittest2.TestCase):
+    """Tests for the default pool refilling with real virtual machines"""
+
+    def setUp(self):
+        super(DefaultPoolRefillTestCase, self).setUp()
+        settings_patcher = mock.patch('robottelo.vm.settings', spec=True)
+        settings = settings_patcher.start()
+        self.addCleanup(settings_patcher.stop)
+        settings.clients.provisioning_server = 'provisioning.example.com'
+        settings.clients.image_dir = '/opt/robottelo/images'
+        settings.distro = DistroSettings()
+        command_patcher = mock.patch(
+            'robottelo.ssh.command', return_value=ssh.SSHCommandResult())
+        self.ssh_command = command_patcher.start()
+        self.addCleanup(command_patcher.stop)
+        wait_ready_patcher = mock.patch.object(
+            VirtualMachine, '_wait_ready', autospec=True)
+        wait_ready_patcher.start()
+        self.addCleanup(wait_ready_patcher.stop)
+
+    def snap_guest_count(self):
+        """Return the number of virtual machines provisioned"""
+        return len([
+            args for args in self.ssh_command.call_args_list
+            if args[0][0].startswith('snap-guest')
+        ])
+
+    def test_refill_does_not_adopt(self):
+        """Check the pool provisions the virtual machines replacing the
+        taken ones, instead of taking its other ready ones
+        """
+        pool = VirtualMachinePool(size=2, distros=[DISTRO_RHEL7])
+        pool_patcher = mock.patch.object(vm_pool, '_default_pool', pool)
+        pool_patcher.start()
+        self.addCleanup(pool_patcher.stop)
+        self.addCleanup(pool.close)
+        pool.start()
+        self.wait_ready(pool, DISTRO_RHEL7, 2)
+        ready_vms = [vm for _, vm in pool._ready[DISTRO_RHEL7]]
+
+        vm = VirtualMachine(distro=DISTRO_RHEL7)
+        vm.create()
+        self.assertEqual(vm.hostname, ready_vms[0].hostname)
+        self.wait_ready(pool, DISTRO_RHEL7, 2)
+        self.assertEqual(self.snap_guest_count(), 3)
+        self.assertIs(pool._ready[DISTRO_RHEL7][0][1], ready_vms[1])